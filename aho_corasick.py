@@ -0,0 +1,125 @@
+"""Aho-Corasick automaton for matching large keyword lexicons in one pass
+
+Patterns are compiled once into a dense transition table over the
+symbols that actually occur in them (every other byte shares one class),
+so scanning costs one table lookup per input byte however many patterns
+there are. Matching is ASCII case-insensitive and positions are byte
+offsets, which equal character offsets for ASCII domains.
+"""
+import hashlib
+from collections import deque
+from array import array
+import numpy as np
+
+
+class AhoCorasick:
+    """Compiled multi-pattern matcher
+
+    search() returns (term, start) for every occurrence, count() and
+    contains() the cheaper summaries, and count_rows() runs the automaton
+    column by column over a padded uint8 matrix for batch extraction.
+    """
+
+    def __init__(self, patterns):
+        patterns = list(dict.fromkeys(p.strip().lower() for p in patterns if p and p.strip()))
+        self.patterns = patterns
+        self.digest = hashlib.sha256('\n'.join(sorted(patterns)).encode('utf-8')).hexdigest()
+        encoded = [p.encode('utf-8') for p in patterns]
+
+        # Map bytes to symbol classes; class 0 is every byte not used by a pattern
+        symbols = sorted({byte for p in encoded for byte in p})
+        self._classes = np.zeros(256, dtype=np.int32)
+        self._classes[symbols] = np.arange(1, len(symbols) + 1)
+        for byte in symbols:
+            if ord('a') <= byte <= ord('z'):
+                self._classes[byte - 32] = self._classes[byte]
+        self.num_classes = len(symbols) + 1
+
+        # Trie of goto edges, then failure links in breadth-first order
+        goto = [{}]
+        outputs = [[]]
+        for index, pattern in enumerate(encoded):
+            state = 0
+            for byte in pattern:
+                symbol = int(self._classes[byte])
+                following = goto[state].get(symbol)
+                if following is None:
+                    following = len(goto)
+                    goto[state][symbol] = following
+                    goto.append({})
+                    outputs.append([])
+                state = following
+            outputs[state].append(index)
+
+        delta = np.zeros((len(goto), self.num_classes), dtype=np.int32)
+        fail = [0] * len(goto)
+        queue = deque()
+        for symbol, state in goto[0].items():
+            delta[0, symbol] = state
+            queue.append(state)
+        while queue:
+            state = queue.popleft()
+            delta[state] = delta[fail[state]]
+            for symbol, following in goto[state].items():
+                delta[state, symbol] = following
+                fail[following] = int(delta[fail[state], symbol]) if state else 0
+                outputs[following].extend(outputs[fail[following]])
+                queue.append(following)
+
+        self.num_states = len(goto)
+        self._delta = delta
+        self._flat = array('i', delta.ravel().tolist())
+        self._match_counts = np.array([len(out) for out in outputs], dtype=np.int32)
+        self._outputs = {state: tuple(out) for state, out in enumerate(outputs) if out}
+        self._lengths = [len(p) for p in encoded]
+
+    @classmethod
+    def from_file(cls, path):
+        """Build from a lexicon file: one term per line, # comments and blank lines ignored"""
+        from feed_stream import open_feed
+        with open_feed(path) as f:
+            return cls(line.split('#', 1)[0] for line in f)
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def search(self, text):
+        """List of (term, start offset) for every match, in order of their end"""
+        matches = []
+        flat, classes, outputs, k = self._flat, self._classes, self._outputs, self.num_classes
+        state = 0
+        for position, byte in enumerate(text.encode('utf-8')):
+            state = flat[state * k + classes[byte]]
+            found = outputs.get(state)
+            if found:
+                for index in found:
+                    matches.append((self.patterns[index], position - self._lengths[index] + 1))
+        return matches
+
+    def count(self, text):
+        """Number of (possibly overlapping) matches in text"""
+        flat, classes, counts, k = self._flat, self._classes, self._match_counts, self.num_classes
+        state = total = 0
+        for byte in text.encode('utf-8'):
+            state = flat[state * k + classes[byte]]
+            total += counts[state]
+        return int(total)
+
+    def contains(self, text):
+        flat, classes, outputs, k = self._flat, self._classes, self._outputs, self.num_classes
+        state = 0
+        for byte in text.encode('utf-8'):
+            state = flat[state * k + classes[byte]]
+            if state in outputs:
+                return True
+        return False
+
+    def count_rows(self, matrix):
+        """Match counts for each row of an (N, width) uint8 matrix (zero padding never matches)"""
+        symbols = self._classes[matrix]
+        state = np.zeros(len(matrix), dtype=np.int32)
+        total = np.zeros(len(matrix), dtype=np.int32)
+        for column in range(matrix.shape[1]):
+            state = self._delta[state, symbols[:, column]]
+            total += self._match_counts[state]
+        return total
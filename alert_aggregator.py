@@ -0,0 +1,179 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+
+SEVERITY_RANK = {'LOW': 0, 'MEDIUM': 1, 'HIGH': 2}
+
+# Popups allowed per severity: (burst size, tokens refilled per second)
+DEFAULT_RATE_LIMITS = {
+    'HIGH': (5, 1 / 10.0),
+    'MEDIUM': (3, 1 / 30.0),
+    'LOW': (1, 1 / 60.0),
+}
+
+DIGEST_ACTIONS = {
+    'HIGH': "Block and investigate immediately",
+    'MEDIUM': "Monitor closely and investigate",
+    'LOW': "Log for future reference",
+}
+
+
+def alert_target(alert):
+    """The IP or domain an alert is about"""
+    return alert.get('ip_address') or alert.get('domain')
+
+
+class TokenBucket:
+    """Classic token bucket: up to burst immediate passes, refilled at rate per second"""
+
+    def __init__(self, burst, rate, clock=time.monotonic):
+        self.burst = burst
+        self.rate = rate
+        self.clock = clock
+        self.tokens = float(burst)
+        self.updated = clock()
+
+    def try_take(self):
+        now = self.clock()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class _Held:
+    """Alerts held for one severity's digest: a count and only the top-scoring ones"""
+    __slots__ = ('first_held', 'count', 'top')
+
+    def __init__(self, first_held):
+        self.first_held = first_held
+        self.count = 0
+        self.top = []  # Min-heap of (score, -arrival, alert); earlier alerts win ties
+
+    def add(self, alert, limit):
+        self.count += 1
+        entry = (alert['threat_score'], -self.count, alert)
+        if len(self.top) < limit:
+            heapq.heappush(self.top, entry)
+        elif entry > self.top[0]:
+            heapq.heapreplace(self.top, entry)
+
+    def ranked(self):
+        return [alert for _, _, alert in sorted(self.top, reverse=True)]
+
+
+class AlertAggregator:
+    """Deduplicates, rate-limits and digests alerts in front of the display
+
+    Repeats of an indicator within dedupe_window seconds are dropped
+    unless their severity went up. The rest pass through a token bucket
+    per severity, so the first alerts of a burst are shown immediately;
+    once a bucket is empty, alerts are held and rolled into one digest
+    per severity every digest_interval seconds. Only a count and the
+    digest_top highest-scoring held alerts are kept, so a flood costs
+    bounded memory.
+    """
+
+    def __init__(self, dedupe_window=300, rate_limits=None, digest_interval=30, digest_top=10,
+                 max_tracked=100000, clock=time.monotonic):
+        self.dedupe_window = dedupe_window
+        self.digest_interval = digest_interval
+        self.digest_top = digest_top
+        self.max_tracked = max_tracked
+        self.clock = clock
+        limits = dict(DEFAULT_RATE_LIMITS, **(rate_limits or {}))
+        self._buckets = {severity: TokenBucket(burst, rate, clock)
+                         for severity, (burst, rate) in limits.items()}
+        self._seen = OrderedDict()  # indicator -> (last seen, severity rank)
+        self._pending = {}          # severity -> _Held
+        self._lock = threading.Lock()
+        self.received = 0
+        self.displayed = 0
+        self.suppressed = 0
+        self.merged = 0
+        self.digests = 0
+
+    def submit(self, alert):
+        """Return the alerts to display now for an incoming alert (zero or one)"""
+        with self._lock:
+            now = self.clock()
+            self.received += 1
+            if self._is_duplicate(alert, now):
+                self.suppressed += 1
+                return []
+            severity = alert['severity']
+            bucket = self._buckets.get(severity)
+            if bucket is None or bucket.try_take():
+                self.displayed += 1
+                return [alert]
+            held = self._pending.get(severity)
+            if held is None:
+                held = self._pending[severity] = _Held(now)
+            held.add(alert, self.digest_top)
+            return []
+
+    def flush(self, force=False):
+        """Return digest alerts for severities whose digest interval has elapsed"""
+        with self._lock:
+            now = self.clock()
+            digests = []
+            for severity in list(self._pending):
+                held = self._pending[severity]
+                if force or now - held.first_held >= self.digest_interval:
+                    del self._pending[severity]
+                    digests.append(self._digest(severity, held, now - held.first_held))
+            return digests
+
+    def stats(self):
+        """Counters for received, displayed, suppressed (duplicate) and merged (digested) alerts"""
+        with self._lock:
+            return {
+                'received': self.received,
+                'displayed': self.displayed,
+                'suppressed': self.suppressed,
+                'merged': self.merged,
+                'digests': self.digests,
+                'pending': sum(held.count for held in self._pending.values()),
+            }
+
+    def _is_duplicate(self, alert, now):
+        target = alert_target(alert)
+        if target is None:
+            return False
+        rank = SEVERITY_RANK.get(alert['severity'], 0)
+        seen = self._seen
+
+        # Entries are kept in last-seen order, so expired ones are at the front
+        while seen:
+            oldest, (seen_at, _) = next(iter(seen.items()))
+            if now - seen_at < self.dedupe_window and len(seen) < self.max_tracked:
+                break
+            seen.popitem(last=False)
+
+        previous = seen.get(target)
+        if previous is not None and rank <= previous[1]:
+            return True
+        seen[target] = (now, rank)
+        seen.move_to_end(target)
+        return False
+
+    def _digest(self, severity, held, window):
+        self.merged += held.count
+        self.digests += 1
+        self.displayed += 1
+        top = held.ranked()
+        listing = ', '.join(f"{alert_target(alert)} ({alert['threat_score']:.2f})" for alert in top)
+        return {
+            'type': 'digest',
+            'severity': severity,
+            'threat_score': top[0]['threat_score'],
+            'recommended_action': DIGEST_ACTIONS.get(severity, "Review"),
+            'count': held.count,
+            'window': window,
+            'top': top,
+            'summary': f"{held.count} {severity} threats in last {window:.0f}s, "
+                       f"top {len(top)}: {listing}",
+        }
@@ -0,0 +1,248 @@
+import json
+import os
+import queue
+import socket
+import threading
+import time
+from datetime import date, datetime
+from alert_aggregator import SEVERITY_RANK, alert_target
+
+
+def _json_default(value):
+    """Serialize the datetimes (and anything else odd) found in alerts"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+_encoder = json.JSONEncoder(default=_json_default, separators=(',', ':'), ensure_ascii=False)
+
+
+def encode_alert(alert):
+    """One compact JSON line for an alert"""
+    return _encoder.encode(alert)
+
+
+class AlertSink:
+    """Destination for alerts; subclasses implement emit()"""
+
+    def __init__(self, min_severity='LOW'):
+        self.min_severity = min_severity
+        self._min_rank = SEVERITY_RANK[min_severity]
+
+    def accepts(self, alert):
+        return SEVERITY_RANK.get(alert['severity'], 0) >= self._min_rank
+
+    def emit(self, alert):
+        raise NotImplementedError
+
+    def emit_many(self, alerts):
+        for alert in alerts:
+            if self.accepts(alert):
+                self.emit(alert)
+
+    def tick(self):
+        """Called periodically so sinks can flush on time thresholds"""
+        pass
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+
+class PopupSink(AlertSink):
+    """Hands alerts to an AlertSystem (tkinter popups or headless printing)"""
+
+    def __init__(self, alert_system, min_severity='MEDIUM'):
+        super(PopupSink, self).__init__(min_severity)
+        self.alert_system = alert_system
+
+    def emit(self, alert):
+        self.alert_system.show_alert(alert)
+
+
+class ConsoleSink(AlertSink):
+    """One console line per alert, written in batches"""
+
+    def emit_many(self, alerts):
+        lines = [f"{'IP' if 'ip_address' in alert else 'Domain'}: {alert_target(alert)} - "
+                 f"{alert['severity']} ({alert['threat_score']:.3f})"
+                 for alert in alerts if self.accepts(alert)]
+        if lines:
+            print('\n'.join(lines), flush=True)
+
+    def emit(self, alert):
+        self.emit_many([alert])
+
+
+class JsonlFileSink(AlertSink):
+    """Buffered JSON Lines alert log with size-based rotation
+
+    Encoded alerts are collected in memory and written in one call once
+    flush_bytes are pending or flush_interval seconds have passed. When a
+    write would push the file past max_bytes it is rotated to path.1,
+    path.2, ... keeping backup_count old files.
+    """
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024, backup_count=5,
+                 flush_bytes=64 * 1024, flush_interval=1.0, min_severity='LOW'):
+        super(JsonlFileSink, self).__init__(min_severity)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+        self.rotations = 0
+        self._pending = []
+        self._pending_bytes = 0
+        self._last_flush = time.monotonic()
+        self._file = open(path, 'ab')
+        self._size = self._file.tell()
+
+    def emit(self, alert):
+        line = (encode_alert(alert) + '\n').encode('utf-8')
+        self._pending.append(line)
+        self._pending_bytes += len(line)
+        if self._pending_bytes >= self.flush_bytes:
+            self.flush()
+
+    def tick(self):
+        if self._pending and time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        data = b''.join(self._pending)
+        self._pending = []
+        self._pending_bytes = 0
+        if self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def close(self):
+        self.flush()
+        self._file.close()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, 'ab')
+        self._size = 0
+        self.rotations += 1
+
+
+class SyslogSink(AlertSink):
+    """Sends alerts as syslog datagrams to a local UDP port or unix socket (e.g. /dev/log)"""
+
+    # Syslog severities: 2 = critical, 4 = warning, 6 = informational
+    SYSLOG_SEVERITY = {'HIGH': 2, 'MEDIUM': 4, 'LOW': 6}
+
+    def __init__(self, address=('127.0.0.1', 514), facility=1, tag='threat-detection',
+                 min_severity='MEDIUM'):
+        super(SyslogSink, self).__init__(min_severity)
+        self.address = address
+        self.facility = facility
+        self.tag = tag
+        self.errors = 0
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self._socket = socket.socket(family, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def emit(self, alert):
+        priority = self.facility * 8 + self.SYSLOG_SEVERITY.get(alert['severity'], 6)
+        message = f"<{priority}>{self.tag}: {encode_alert(alert)}".encode('utf-8')
+        try:
+            self._socket.sendto(message, self.address)
+        except OSError:
+            self.errors += 1
+
+    def close(self):
+        self._socket.close()
+
+
+class BackgroundSink(AlertSink):
+    """Runs another sink on its own thread behind a bounded queue
+
+    emit() never blocks: when the queue is full the alert is dropped and
+    counted, so a slow disk or socket cannot stall scoring.
+    """
+
+    def __init__(self, sink, queue_size=10000, batch_size=500, tick_interval=0.5):
+        super(BackgroundSink, self).__init__(sink.min_severity)
+        self.sink = sink
+        self.batch_size = batch_size
+        self.tick_interval = tick_interval
+        self.dropped = 0
+        self.errors = 0
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f'alert-sink-{type(sink).__name__}',
+                                        daemon=True)
+        self._thread.start()
+
+    def accepts(self, alert):
+        return self.sink.accepts(alert)
+
+    def emit(self, alert):
+        try:
+            self._queue.put_nowait(alert)
+        except queue.Full:
+            self.dropped += 1
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def close(self, timeout=5):
+        """Deliver everything already queued, then close the wrapped sink"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            try:
+                alert = self._queue.get(timeout=self.tick_interval)
+            except queue.Empty:
+                self._call(self.sink.tick)
+                continue
+            batch = []
+            stop = alert is None
+            if not stop:
+                batch.append(alert)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    alert = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if alert is None:
+                    stop = True
+                else:
+                    batch.append(alert)
+            if batch:
+                self._call(self.sink.emit_many, batch)
+                self._call(self.sink.tick)
+            if stop:
+                self._call(self.sink.close)
+                return
+
+    def _call(self, method, *args):
+        try:
+            method(*args)
+        except Exception as e:
+            self.errors += 1
+            print(f"Error in alert sink {type(self.sink).__name__}: {str(e)}")
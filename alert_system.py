@@ -1,6 +1,5 @@
-import tkinter as tk
-from tkinter import messagebox
 from datetime import datetime
+from alert_aggregator import AlertAggregator
 import queue
 import os
 
@@ -14,14 +13,18 @@ except ImportError:
     WINDOWS = False
 
 class AlertSystem:
-    def __init__(self):
+    def __init__(self, aggregator=None):
+        import tkinter as tk  # Deferred so headless processes never load tkinter
         self.root = tk.Tk()
         self.root.withdraw()  # Hide the main window
         self.alert_queue = queue.Queue()
+        self.aggregator = aggregator or AlertAggregator()
         
     def process_alerts(self):
         """Process any pending alerts"""
         try:
+            for digest in self.aggregator.flush():
+                self.alert_queue.put(digest)
             while True:
                 alert = self.alert_queue.get_nowait()
                 self.show_popup(alert)
@@ -33,6 +36,7 @@ class AlertSystem:
         
     def show_popup(self, alert):
         """Show a popup notification for a threat"""
+        import tkinter as tk
         severity = alert['severity']
         
         # Set icon and color based on severity
@@ -76,7 +80,10 @@ class AlertSystem:
         header.pack(pady=10)
         
         # Details
-        if 'ip_address' in alert:
+        if alert.get('type') == 'digest':
+            target = alert['summary']
+            target_type = "Digest"
+        elif 'ip_address' in alert:
             target = alert['ip_address']
             target_type = "IP"
         else:
@@ -88,6 +95,7 @@ class AlertSystem:
             text=f"Target {target_type}: {target}\n" +
                  f"Threat Score: {alert['threat_score']:.3f}\n" +
                  f"Action: {alert['recommended_action']}\n" +
+                 ("New since last cycle\n" if alert.get('new_since_last_cycle') else "") +
                  f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
             font=("Arial", 10),
             bg=bg_color,
@@ -118,5 +126,32 @@ class AlertSystem:
         popup.after(10000, popup.destroy)
         
     def show_alert(self, alert):
-        """Queue an alert to be shown"""
-        self.alert_queue.put(alert) 
\ No newline at end of file
+        """Queue an alert to be shown, after deduplication and rate limiting"""
+        for shown in self.aggregator.submit(alert):
+            self.alert_queue.put(shown)
+
+class HeadlessAlertSystem:
+    """Alert system for servers without a display: prints instead of showing popups"""
+
+    def __init__(self, aggregator=None):
+        self.alert_queue = queue.Queue()
+        self.aggregator = aggregator or AlertAggregator()
+
+    def process_alerts(self):
+        """Print any digests that are due"""
+        for digest in self.aggregator.flush():
+            self._print(digest)
+
+    def show_alert(self, alert):
+        """Print a one-line alert, after deduplication and rate limiting"""
+        for shown in self.aggregator.submit(alert):
+            self._print(shown)
+        self.process_alerts()
+
+    def _print(self, alert):
+        if alert.get('type') == 'digest':
+            print(f"[{alert['severity']}] {alert['summary']}")
+            return
+        target = alert.get('ip_address') or alert.get('domain')
+        print(f"[{alert['severity']}] {target} - score {alert['threat_score']:.3f} - "
+              f"{alert['recommended_action']}") 
\ No newline at end of file
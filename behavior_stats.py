@@ -0,0 +1,214 @@
+"""Sliding-window traffic statistics per source IP
+
+Each source keeps a ring of time buckets (bucket_seconds wide, n_buckets
+of them make the window). A bucket holds packet and byte counts, a
+protocol mix and two small HyperLogLog sketches for distinct destination
+IPs and distinct destination endpoints (IP and port). Updates touch one
+bucket, so they are O(1); a bucket is zeroed lazily the first time it is
+reused. Sources idle for longer than the window, or beyond max_sources,
+are evicted least recently seen first, which bounds memory.
+"""
+import math
+from collections import OrderedDict
+import numpy as np
+
+MASK64 = (1 << 64) - 1
+
+PROTOCOL_SLOTS = {'TCP': 0, 'UDP': 1, 'ICMP': 2, 'ICMPv6': 2}
+PROTOCOL_LABELS = ('TCP', 'UDP', 'ICMP', 'other')
+
+# Verdict scores for the built-in rules
+SCAN_SCORE = 0.9
+FLOOD_SCORE = 0.85
+
+
+def hash64(value):
+    """Well-mixed 64-bit hash (splitmix64 finalizer over Python's hash)"""
+    x = hash(value) & MASK64
+    x = ((x ^ (x >> 30)) * 0xbf58476d1ce4e5b9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94d049bb133111eb) & MASK64
+    return x ^ (x >> 31)
+
+
+def hll_estimate(registers):
+    """Cardinality estimate from a 1-D array of HyperLogLog registers"""
+    m = len(registers)
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    estimate = alpha * m * m / float(np.sum(np.ldexp(1.0, -registers.astype(np.int32))))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        return m * math.log(m / zeros)  # Linear counting for small cardinalities
+    return estimate
+
+
+class _SourceWindow:
+    __slots__ = ('first_seen', 'last_seen', 'buckets', 'packets', 'bytes', 'protocols',
+                 'destinations', 'endpoints')
+
+    def __init__(self, n_buckets, registers, timestamp):
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.buckets = [-1] * n_buckets
+        self.packets = [0] * n_buckets
+        self.bytes = [0] * n_buckets
+        self.protocols = [0] * (n_buckets * 4)
+        self.destinations = bytearray(n_buckets * registers)
+        self.endpoints = bytearray(n_buckets * registers)
+
+
+class BehaviorStats:
+    """Windowed per-source packet/byte rates, distinct destinations and protocol mix
+
+    Timestamps are epoch nanoseconds; "now" is the newest timestamp seen,
+    so replayed captures are judged in capture time. verdict() applies
+    the port-scan and flood rules used by ThreatMonitor.
+    """
+
+    def __init__(self, bucket_seconds=10, n_buckets=6, precision=6, max_sources=100000,
+                 scan_endpoints=100, scan_packets_per_endpoint=3.0,
+                 flood_packets_per_second=5000, flood_bytes_per_second=50e6):
+        self.bucket_ns = int(bucket_seconds * 1e9)
+        self.n_buckets = n_buckets
+        self.window_ns = self.bucket_ns * n_buckets
+        self.precision = precision
+        self.registers = 1 << precision
+        self.max_sources = max_sources
+        self.scan_endpoints = scan_endpoints
+        self.scan_packets_per_endpoint = scan_packets_per_endpoint
+        self.flood_packets_per_second = flood_packets_per_second
+        self.flood_bytes_per_second = flood_bytes_per_second
+        self.now = 0
+        self.evicted = 0
+        self.late = 0  # Records dropped for predating their bucket or the window
+        self._sources = OrderedDict()
+        self._updates = 0
+
+    def __len__(self):
+        return len(self._sources)
+
+    def __contains__(self, source):
+        return source in self._sources
+
+    def update(self, source, dest, dest_port, protocol, size, timestamp, packets=1):
+        """Account packets (default one) of size total bytes from source to dest:dest_port
+
+        Records older than the window, or older than the bucket now held in
+        their ring slot, are dropped: applying them would wipe newer data.
+        """
+        if timestamp > self.now:
+            self.now = timestamp
+        bucket = timestamp // self.bucket_ns
+        if bucket <= self.now // self.bucket_ns - self.n_buckets:
+            self.late += 1
+            return
+        sources = self._sources
+        state = sources.get(source)
+        if state is None:
+            if len(sources) >= self.max_sources:
+                sources.popitem(last=False)
+                self.evicted += 1
+            state = sources[source] = _SourceWindow(self.n_buckets, self.registers, timestamp)
+        else:
+            sources.move_to_end(source)
+
+        slot = bucket % self.n_buckets
+        current = state.buckets[slot]
+        if current != bucket:
+            if bucket < current:
+                self.late += 1
+                return
+            self._reset_slot(state, slot, bucket)
+        if timestamp > state.last_seen:
+            state.last_seen = timestamp
+        state.packets[slot] += packets
+        state.bytes[slot] += size
+        state.protocols[slot * 4 + PROTOCOL_SLOTS.get(protocol, 3)] += packets
+
+        base = slot * self.registers
+        self._add(state.destinations, base, hash64(dest))
+        self._add(state.endpoints, base, hash64((dest, dest_port)))
+
+        self._updates += 1
+        if self._updates & 0xfff == 0:
+            self.evict_idle()
+
+    def update_flows(self, flows):
+        """Account aggregated flows (network_monitor.Flow), each at its last packet time"""
+        update = self.update
+        for flow in flows:
+            update(flow.source_ip, flow.dest_ip, flow.dest_port, flow.protocol, flow.bytes,
+                   flow.last_seen, flow.packets)
+
+    def evict_idle(self):
+        """Drop sources with no traffic inside the window"""
+        cutoff = self.now - self.window_ns
+        sources = self._sources
+        while sources:
+            source, state = next(iter(sources.items()))
+            if state.last_seen >= cutoff:
+                break
+            sources.popitem(last=False)
+            self.evicted += 1
+
+    def summary(self, source):
+        """Window statistics for a source, or None if it has no traffic in the window"""
+        state = self._sources.get(source)
+        if state is None:
+            return None
+        oldest = self.now // self.bucket_ns - self.n_buckets + 1
+        live = [slot for slot, bucket in enumerate(state.buckets) if bucket >= oldest]
+        if not live:
+            return None
+        packets = sum(state.packets[slot] for slot in live)
+        total_bytes = sum(state.bytes[slot] for slot in live)
+        protocols = [sum(state.protocols[slot * 4 + i] for slot in live) for i in range(4)]
+        seconds = max(self.bucket_ns, min(self.window_ns, self.now - state.first_seen)) / 1e9
+        return {
+            'packets': packets,
+            'bytes': total_bytes,
+            'packets_per_second': packets / seconds,
+            'bytes_per_second': total_bytes / seconds,
+            'distinct_destinations': round(self._merged_estimate(state.destinations, live)),
+            'distinct_endpoints': round(self._merged_estimate(state.endpoints, live)),
+            'protocol_mix': {label: count / packets if packets else 0.0
+                             for label, count in zip(PROTOCOL_LABELS, protocols)},
+            'window_seconds': seconds,
+        }
+
+    def verdict(self, source):
+        """(score, reason) when a source's window looks like a port scan or flood, else None"""
+        if source not in self._sources:
+            return None
+        stats = self.summary(source)
+        if stats is None:
+            return None
+        endpoints = stats['distinct_endpoints']
+        if endpoints >= self.scan_endpoints and \
+                stats['packets'] / endpoints <= self.scan_packets_per_endpoint:
+            return SCAN_SCORE, f"port scan: {endpoints} destinations in {stats['window_seconds']:.0f}s"
+        if stats['packets_per_second'] >= self.flood_packets_per_second or \
+                stats['bytes_per_second'] >= self.flood_bytes_per_second:
+            return FLOOD_SCORE, (f"flood: {stats['packets_per_second']:.0f} packets/s, "
+                                 f"{stats['bytes_per_second'] / 1e6:.1f} MB/s")
+        return None
+
+    def _reset_slot(self, state, slot, bucket):
+        state.buckets[slot] = bucket
+        state.packets[slot] = 0
+        state.bytes[slot] = 0
+        state.protocols[slot * 4:slot * 4 + 4] = [0, 0, 0, 0]
+        start = slot * self.registers
+        empty = bytes(self.registers)
+        state.destinations[start:start + self.registers] = empty
+        state.endpoints[start:start + self.registers] = empty
+
+    def _add(self, registers, base, h):
+        index = base + (h >> (64 - self.precision))
+        rest = h & ((1 << (64 - self.precision)) - 1)
+        rank = 64 - self.precision - rest.bit_length() + 1
+        if rank > registers[index]:
+            registers[index] = rank
+
+    def _merged_estimate(self, registers, live):
+        matrix = np.frombuffer(registers, dtype=np.uint8).reshape(self.n_buckets, self.registers)
+        return hll_estimate(matrix[live].max(axis=0))
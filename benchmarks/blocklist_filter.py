@@ -0,0 +1,89 @@
+"""Blocklist Bloom filter: build rate, size, false-positive rate and lookup throughput
+
+Run from the repository root:
+
+    python -m benchmarks.blocklist_filter [--count 1000000] [--fpr 0.01,0.001,0.0001]
+
+Writes a text blocklist of synthetic indicators, builds a filter file
+from it at each target false-positive rate with bloom_filter.build_filter,
+then maps it back in and reports open time, single and batched lookups
+per second and the measured false-positive rate. For scale, the memory
+of a Python set holding the same entries is measured with tracemalloc,
+and both are extrapolated to 100M entries.
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+from benchmarks.synthetic import synthetic_indicators
+from bloom_filter import BloomFilter, build_filter, measure_false_positive_rate
+
+
+def set_bytes(entries):
+    """Memory of a set of fresh copies of entries, as if read from the blocklist file"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = set(entry.encode().decode() for entry in entries)
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del held
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=1000000, help='blocklist entries')
+    parser.add_argument('--fpr', default='0.01,0.001,0.0001', help='target false-positive rates')
+    parser.add_argument('--lookups', type=int, default=1000000, help='batched lookups to time')
+    parser.add_argument('--single', type=int, default=100000, help='one-at-a-time lookups to time')
+    parser.add_argument('--probes', type=int, default=1000000, help='absent indicators for the FPR')
+    args = parser.parse_args()
+
+    entries = list(dict.fromkeys(synthetic_indicators(args.count, seed=1)))
+    absent = synthetic_indicators(args.lookups // 2, seed=2)
+    listed = set(entries)
+    absent = [indicator for indicator in absent if indicator not in listed]
+    queries = entries[:args.lookups // 2] + absent
+
+    python_set = set_bytes(entries)
+    print(f"{len(entries)} entries; Python set {python_set / 1e6:.0f} MB, "
+          f"~{python_set / len(entries) * 1e8 / 1e9:.1f} GB at 100M")
+    print(f"{'target':>8} {'build s':>8} {'MB':>7} {'@100M GB':>9} {'bits/e':>7} {'k':>3} {'open us':>8} "
+          f"{'in /s':>10} {'batch /s':>10} {'measured':>9}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        source = os.path.join(directory, 'blocklist.txt')
+        with open(source, 'w') as f:
+            f.writelines(entry + '\n' for entry in entries)
+        for fpr in (float(value) for value in args.fpr.split(',')):
+            path = os.path.join(directory, f'blocklist-{fpr}.bloom')
+            start = time.perf_counter()
+            build_filter([source], path, fpr, capacity=len(entries))
+            build_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            bloom = BloomFilter.open(path)
+            open_seconds = time.perf_counter() - start
+
+            sample = queries[:args.single]
+            start = time.perf_counter()
+            single_hits = sum(1 for indicator in sample if indicator in bloom)
+            single_rate = len(sample) / (time.perf_counter() - start)
+
+            start = time.perf_counter()
+            batch_hits = bloom.contains_many(queries)
+            batch_rate = len(queries) / (time.perf_counter() - start)
+            assert batch_hits[:len(sample)].sum() == single_hits, "single and batched lookups disagree"
+            assert batch_hits[:args.lookups // 2].all(), "a listed entry was missed"
+
+            measured = measure_false_positive_rate(bloom, args.probes)
+            print(f"{fpr:>8.4%} {build_seconds:>8.2f} {bloom.size_bytes / 1e6:>7.1f} "
+                  f"{bloom.size_bytes / len(entries) * 1e8 / 1e9:>9.2f} {bloom.bits / len(entries):>7.1f} "
+                  f"{bloom.hashes:>3} {open_seconds * 1e6:>8.0f} {single_rate:>10.0f} {batch_rate:>10.0f} "
+                  f"{measured:>9.4%}")
+            bloom.close()
+
+
+if __name__ == '__main__':
+    main()
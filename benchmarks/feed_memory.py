@@ -0,0 +1,95 @@
+"""Peak memory of streaming feed scoring versus loading the whole feed
+
+Run from the repository root:
+
+    python -m benchmarks.feed_memory --sizes 100000,1000000
+
+Each measurement runs in a fresh subprocess so ru_maxrss reflects only
+that feed. With streaming, peak RSS should stay flat as the feed grows.
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def write_feed(path, count, seed=0):
+    """Write a synthetic gzipped plain-text feed of random IPs and domains"""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz0123456789-'
+    with gzip.open(path, 'wt', compresslevel=1) as f:
+        for _ in range(count):
+            if rng.random() < 0.5:
+                f.write('.'.join(str(rng.randint(0, 255)) for _ in range(4)))
+            else:
+                f.write(''.join(rng.choice(letters) for _ in range(rng.randint(5, 30))) + '.com')
+            f.write('\n')
+
+
+def run_child(path, mode, chunk_size):
+    """Score a feed in this process and print peak RSS as JSON"""
+    from feed_stream import iter_chunks, iter_feed_events
+    from model import ThreatDetectionModel
+
+    model = ThreatDetectionModel()
+    model.eval()
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    events = iter_feed_events(path)
+    if mode == 'list':
+        events = list(events)
+    scored = 0
+    for chunk in iter_chunks(events, chunk_size):
+        indicators = [event.get('ip_address') or event.get('domain') for event in chunk]
+        scored += len(model.predict_threat_batch(indicators, batch_size=chunk_size))
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({
+        'scored': scored,
+        'seconds': elapsed,
+        'baseline_mb': baseline_kb / 1024,
+        'peak_mb': peak_kb / 1024
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='100000,1000000',
+                        help='comma-separated feed sizes in lines')
+    parser.add_argument('--chunk-size', type=int, default=4096)
+    parser.add_argument('--modes', default='stream,list',
+                        help="'stream' scores lazily, 'list' loads the feed first")
+    parser.add_argument('--child', nargs=2, metavar=('PATH', 'MODE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child[0], args.child[1], args.chunk_size)
+        return
+
+    print(f"{'lines':>10} {'mode':>7} {'seconds':>8} {'ind/s':>10} {'peak MB':>8} {'growth MB':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in [int(s) for s in args.sizes.split(',')]:
+            path = os.path.join(tmpdir, f'feed_{size}.txt.gz')
+            write_feed(path, size)
+            for mode in args.modes.split(','):
+                output = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.feed_memory', '--chunk-size',
+                     str(args.chunk_size), '--child', path, mode],
+                    check=True, capture_output=True, text=True
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                print(f"{size:>10} {mode:>7} {result['seconds']:>8.2f} "
+                      f"{result['scored'] / result['seconds']:>10.0f} "
+                      f"{result['peak_mb']:>8.1f} {result['peak_mb'] - result['baseline_mb']:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
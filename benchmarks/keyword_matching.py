@@ -0,0 +1,77 @@
+"""Lexicon matching: Aho-Corasick automaton against the per-word substring scan
+
+Run from the repository root:
+
+    python -m benchmarks.keyword_matching --patterns 20000 --count 20000
+
+Builds a synthetic lexicon of brand-like terms, then matches the same
+domains with the naive `word in domain` loop, the automaton one domain
+at a time, and the automaton over the padded byte matrix used by batch
+feature extraction. Match decisions are checked to agree.
+"""
+import argparse
+import random
+import time
+import numpy as np
+from aho_corasick import AhoCorasick
+from benchmarks.parallel_scaling import synthetic_indicators
+
+
+def synthetic_lexicon(count, seed=0):
+    """count distinct lowercase terms of 4-12 letters"""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz'
+    terms = set()
+    while len(terms) < count:
+        terms.add(''.join(rng.choice(letters) for _ in range(rng.randint(4, 12))))
+    return sorted(terms)
+
+
+def timed(work):
+    start = time.perf_counter()
+    result = work()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--patterns', type=int, default=20000)
+    parser.add_argument('--count', type=int, default=20000, help='domains to match')
+    parser.add_argument('--naive-count', type=int, default=500, help='domains for the slow naive scan')
+    args = parser.parse_args()
+
+    terms = synthetic_lexicon(args.patterns)
+    rng = random.Random(1)
+    domains = [d for d in synthetic_indicators(args.count * 3) if not d[0].isdigit()][:args.count]
+    # Plant a lexicon term in a tenth of the domains
+    domains = [d[:3] + rng.choice(terms) + d[3:] if i % 10 == 0 else d for i, d in enumerate(domains)]
+
+    matcher, build_seconds = timed(lambda: AhoCorasick(terms))
+    sample = domains[:args.naive_count]
+    naive, naive_seconds = timed(lambda: [any(t in d for t in terms) for d in sample])
+    scalar, scalar_seconds = timed(lambda: [matcher.contains(d) for d in domains])
+    found, search_seconds = timed(lambda: [matcher.search(d) for d in domains])
+
+    width = max(len(d) for d in domains)
+    matrix = np.zeros((len(domains), width), dtype=np.uint8)
+    for row, domain in enumerate(domains):
+        matrix[row, :len(domain)] = np.frombuffer(domain.encode(), dtype=np.uint8)
+    counts, batch_seconds = timed(lambda: matcher.count_rows(matrix))
+
+    assert naive == scalar[:len(sample)]
+    assert scalar == list(counts > 0) == [bool(f) for f in found]
+
+    print(f"{len(terms)} patterns -> {matcher.num_states} states x {matcher.num_classes} symbols "
+          f"({matcher._delta.nbytes / 1e6:.1f} MB), built in {build_seconds:.2f}s")
+    print(f"{len(domains)} domains, {sum(scalar)} with a match, "
+          f"{sum(len(f) for f in found)} matches in total")
+    print(f"{'method':>16} {'us/domain':>10} {'domains/s':>11}")
+    for name, seconds, n in (('naive scan', naive_seconds, len(sample)),
+                             ('contains', scalar_seconds, len(domains)),
+                             ('search', search_seconds, len(domains)),
+                             ('count_rows', batch_seconds, len(domains))):
+        print(f"{name:>16} {seconds / n * 1e6:>10.1f} {n / seconds:>11.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""Cost of the metrics instrumentation on the scoring path
+
+Run from the repository root:
+
+    python -m benchmarks.metrics_overhead [--count 200000] [--repeat 5]
+
+Scores the same events with ThreatMonitor.process_events (cold verdict
+cache) and ThreatMonitor.process_event, once with the real metrics and
+once with every counter, gauge and histogram update replaced by a no-op,
+and reports the difference as a share of scoring time.
+"""
+import argparse
+import contextlib
+import io
+import time
+from unittest import mock
+import metrics
+from benchmarks.synthetic import synthetic_events
+from monitor import ThreatMonitor
+
+
+def best_seconds(work, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+@contextlib.contextmanager
+def metrics_disabled():
+    noop = lambda self, *args: None
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(metrics._CounterChild, 'inc', noop))
+        stack.enter_context(mock.patch.object(metrics._GaugeChild, 'set', noop))
+        stack.enter_context(mock.patch.object(metrics._HistogramChild, 'observe', noop))
+        # Unlabelled metrics hold bound methods of their child
+        for metric in metrics.REGISTRY._metrics.values():
+            for method in ('inc', 'set', 'observe'):
+                if method in vars(metric):
+                    stack.enter_context(mock.patch.object(metric, method, lambda *args: None))
+        yield
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=200000)
+    parser.add_argument('--single', type=int, default=5000, help='events for the one-at-a-time path')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        monitor = ThreatMonitor(headless=True)
+    events = synthetic_events(args.count)
+    single_events = events[:args.single]
+
+    def batched():
+        monitor.verdict_cache.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            monitor.process_events(events)
+
+    def one_at_a_time():
+        monitor.verdict_cache.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for event in single_events:
+                monitor.process_event(event)
+
+    batched()  # Warm up
+    print(f"{'path':>16} {'with s':>9} {'without s':>10} {'overhead':>9}")
+    for name, work, n in (('process_events', batched, args.count),
+                          ('process_event', one_at_a_time, args.single)):
+        # Interleave the two variants so drift affects both alike
+        with_metrics, without = float('inf'), float('inf')
+        for _ in range(args.repeat):
+            with_metrics = min(with_metrics, best_seconds(work, 1))
+            with metrics_disabled():
+                without = min(without, best_seconds(work, 1))
+        overhead = (with_metrics - without) / without * 100
+        print(f"{name:>16} {with_metrics:>9.3f} {without:>10.3f} {overhead:>8.2f}%  ({n} events)")
+    monitor.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""Latency and throughput of the NumPy inference engine against torch
+
+Run from the repository root:
+
+    python -m benchmarks.numpy_inference --count 200000 --batch-size 4096
+
+Both engines score the same precomputed features with the same weights;
+feature extraction is excluded. Also reports the largest score
+difference between the two and the cost of importing torch itself.
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+import numpy as np
+import features
+from benchmarks.parallel_scaling import synthetic_indicators
+
+
+def import_seconds(module):
+    """Wall-clock seconds for a fresh interpreter to import module"""
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    return float(subprocess.run([sys.executable, '-c', code], check=True,
+                                capture_output=True, text=True).stdout)
+
+
+def single_latency(score_one, rows, repeat):
+    """Median and p99 microseconds to score one feature row"""
+    timings = []
+    for i in range(repeat):
+        row = rows[i % len(rows)]
+        start = time.perf_counter()
+        score_one(row)
+        timings.append((time.perf_counter() - start) * 1e6)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.99) - 1]
+
+
+def best_seconds(work, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        work()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=4096)
+    parser.add_argument('--single', type=int, default=5000, help='single-row calls to time')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    numpy_import = import_seconds('numpy_model')
+    torch_import = import_seconds('model')
+    import torch
+    from model import ThreatDetectionModel
+    from numpy_model import NumpyThreatModel
+
+    torch_model = ThreatDetectionModel()
+    torch_model.eval()
+    numpy_model = NumpyThreatModel(torch_model.state_dict())
+    matrix = features.extract_features_batch(synthetic_indicators(args.count))
+    tensor = torch.from_numpy(matrix)
+
+    def torch_one(row):
+        with torch.inference_mode():
+            return torch_model(row).item()
+
+    rows = [tensor[i:i + 1] for i in range(min(len(tensor), 1000))]
+    torch_p50, torch_p99 = single_latency(torch_one, rows, args.single)
+    rows = [matrix[i:i + 1] for i in range(min(len(matrix), 1000))]
+    numpy_p50, numpy_p99 = single_latency(numpy_model.forward, rows, args.single)
+
+    torch_seconds = best_seconds(lambda: torch_model.predict_features(tensor, args.batch_size), args.repeat)
+    numpy_seconds = best_seconds(lambda: numpy_model.predict_features(matrix, args.batch_size), args.repeat)
+
+    deviation = np.abs(np.array(torch_model.predict_features(tensor, args.batch_size)) -
+                       np.array(numpy_model.predict_features(matrix, args.batch_size))).max()
+
+    print(f"{args.count} feature rows, batch size {args.batch_size}, torch threads {torch.get_num_threads()}")
+    print(f"{'engine':>8} {'import s':>9} {'p50 us':>8} {'p99 us':>8} {'rows/s':>11}")
+    print(f"{'torch':>8} {torch_import:>9.3f} {torch_p50:>8.1f} {torch_p99:>8.1f} "
+          f"{args.count / torch_seconds:>11.0f}")
+    print(f"{'numpy':>8} {numpy_import:>9.3f} {numpy_p50:>8.1f} {numpy_p99:>8.1f} "
+          f"{args.count / numpy_seconds:>11.0f}")
+    print(f"max |torch - numpy| score difference: {deviation:.2e}")
+
+
+if __name__ == '__main__':
+    main()
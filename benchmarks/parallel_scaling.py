@@ -0,0 +1,61 @@
+"""Throughput of ParallelScorer from 1 to N worker processes
+
+Run from the repository root:
+
+    python -m benchmarks.parallel_scaling --count 200000 --max-workers 8
+"""
+import argparse
+import multiprocessing
+import random
+import time
+from model import ThreatDetectionModel
+from parallel_scoring import ParallelScorer
+
+
+def synthetic_indicators(count, seed=0):
+    """Half random IPs, half random domain names"""
+    rng = random.Random(seed)
+    letters = 'abcdefghijklmnopqrstuvwxyz0123456789-'
+    indicators = []
+    for i in range(count):
+        if i % 2:
+            indicators.append('.'.join(str(rng.randint(0, 255)) for _ in range(4)))
+        else:
+            indicators.append(''.join(rng.choice(letters) for _ in range(rng.randint(5, 30))) + '.com')
+    return indicators
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=200000)
+    parser.add_argument('--max-workers', type=int, default=multiprocessing.cpu_count())
+    parser.add_argument('--chunk-size', type=int, default=4096)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    indicators = synthetic_indicators(args.count)
+    model = ThreatDetectionModel()
+    model.eval()
+
+    start = time.perf_counter()
+    model.predict_threat_batch(indicators, batch_size=args.chunk_size)
+    serial = time.perf_counter() - start
+    print(f"{args.count} indicators, {multiprocessing.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'seconds':>8} {'ind/s':>10} {'speedup':>8}")
+    print(f"{'inline':>8} {serial:>8.2f} {args.count / serial:>10.0f} {1.0:>8.2f}")
+
+    workers = 1
+    while workers <= args.max_workers:
+        with ParallelScorer(model.state_dict(), workers=workers, chunk_size=args.chunk_size) as scorer:
+            scorer.score(indicators[:workers * 256])  # Warm up every worker
+            best = float('inf')
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                scorer.score(indicators)
+                best = min(best, time.perf_counter() - start)
+        print(f"{workers:>8} {best:>8.2f} {args.count / best:>10.0f} {serial / best:>8.2f}")
+        workers *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""Packet throughput of NetworkMonitor.replay over a synthetic capture
+
+Run from the repository root:
+
+    python -m benchmarks.pcap_replay --packets 2000000 --flows 50000 [--format pcapng]
+
+Writes a capture of Ethernet TCP/UDP packets (a share of them IPv6)
+truncated to their headers, as tcpdump -s 128 would, then replays it
+into a DataCollector and reports packets per second and per minute.
+"""
+import argparse
+import os
+import random
+import struct
+import tempfile
+from data_collector import DataCollector
+from network_monitor import NetworkMonitor
+
+
+def _frame(rng, ipv6):
+    """Ethernet + IP + TCP/UDP headers for one random flow"""
+    protocol = rng.choice((6, 17))
+    ports = struct.pack('!HH', rng.randint(1024, 65535), rng.choice((22, 53, 80, 443, 3389, 8080)))
+    transport = ports + (b'\0' * 16 if protocol == 6 else b'\0\x08\0\0')
+    if ipv6:
+        addresses = bytes([0x20, 0x01, 0x0d, 0xb8]) + os.urandom(12) + \
+            bytes([0x20, 0x01, 0x0d, 0xb8]) + os.urandom(12)
+        ip = struct.pack('!IHBB', 6 << 28, len(transport), protocol, 64) + addresses
+        ethertype = 0x86dd
+    else:
+        addresses = struct.pack('!II', rng.getrandbits(32), rng.getrandbits(32))
+        ip = struct.pack('!BBHHHBBH', 0x45, 0, 20 + len(transport), 0, 0, 64, protocol, 0) + addresses
+        ethertype = 0x0800
+    return b'\x02' * 6 + b'\x04' * 6 + struct.pack('!H', ethertype) + ip + transport
+
+
+def write_synthetic_capture(path, packets=1000000, flows=10000, format='pcap', ipv6_fraction=0.1,
+                            seed=0, start=1700000000):
+    """Write packets spread over flows at 10 kpps of capture time"""
+    rng = random.Random(seed)
+    frames = [_frame(rng, rng.random() < ipv6_fraction) for _ in range(flows)]
+    with open(path, 'wb') as f:
+        if format == 'pcap':
+            f.write(struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1))
+            record = struct.Struct('<IIII').pack
+        else:
+            f.write(struct.pack('<IIIHHq', 0x0a0d0d0a, 28, 0x1a2b3c4d, 1, 0, -1) + struct.pack('<I', 28))
+            f.write(struct.pack('<IIHHI', 1, 20, 1, 0, 65535) + struct.pack('<I', 20))
+            block = struct.Struct('<IIIIIII').pack
+        chunk = []
+        for i in range(packets):
+            frame = frames[rng.randrange(flows)]
+            micros = start * 1000000 + i * 100
+            wire_length = len(frame) + rng.randint(0, 1400)
+            if format == 'pcap':
+                chunk.append(record(micros // 1000000, micros % 1000000, len(frame), wire_length))
+                chunk.append(frame)
+            else:
+                padded = frame + b'\0' * (-len(frame) % 4)
+                total = 32 + len(padded)
+                chunk.append(block(6, total, 0, micros >> 32, micros & 0xffffffff, len(frame), wire_length))
+                chunk.append(padded + struct.pack('<I', total))
+            if len(chunk) >= 200000:
+                f.write(b''.join(chunk))
+                chunk = []
+        f.write(b''.join(chunk))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--packets', type=int, default=2000000)
+    parser.add_argument('--flows', type=int, default=50000)
+    parser.add_argument('--format', choices=('pcap', 'pcapng'), default='pcap')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        path = os.path.join(tmpdir, f'synthetic.{args.format}')
+        write_synthetic_capture(path, args.packets, args.flows, args.format)
+        size_mb = os.path.getsize(path) / 1e6
+        monitor = NetworkMonitor(DataCollector(capacity=max(args.flows * 2, 1000)))
+        stats = monitor.replay(path)
+
+    rate = stats['packets'] / stats['seconds']
+    print(f"{args.format}: {stats['packets']} packets ({size_mb:.0f} MB) into {stats['flows']} flows, "
+          f"{stats['skipped']} skipped")
+    print(f"{stats['seconds']:.2f}s: {rate:,.0f} packets/s = {rate * 60 / 1e6:.1f}M packets/min, "
+          f"{size_mb / stats['seconds']:.0f} MB/s")
+
+
+if __name__ == '__main__':
+    main()
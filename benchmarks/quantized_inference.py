@@ -0,0 +1,62 @@
+"""Speed and accuracy of the int8 and traced inference modes against float
+
+Run from the repository root:
+
+    python -m benchmarks.quantized_inference --count 200000 [--model model.pth]
+
+Scores the same precomputed features in every mode and reports rows per
+second, the largest score difference from the float model and how many
+indicators land in a different severity band at the HIGH/MEDIUM
+thresholds used by ThreatMonitor._generate_alert. Without --model the
+weights are random, which puts most scores near the MEDIUM threshold.
+"""
+import argparse
+import time
+import numpy as np
+import torch
+import features
+from benchmarks.parallel_scaling import synthetic_indicators
+from model import INFERENCE_MODES, ThreatDetectionModel
+from monitor import HIGH_THRESHOLD, MEDIUM_THRESHOLD
+
+
+def severity_bands(scores):
+    """0 for LOW, 1 for MEDIUM, 2 for HIGH"""
+    return np.digitize(scores, [MEDIUM_THRESHOLD, HIGH_THRESHOLD])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--count', type=int, default=200000)
+    parser.add_argument('--batch-size', type=int, default=4096)
+    parser.add_argument('--model', default=None, help='trained weights to load')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    model = ThreatDetectionModel()
+    if args.model:
+        model.load_state_dict(torch.load(args.model, map_location='cpu'))
+    model.eval()
+    matrix = torch.from_numpy(features.extract_features_batch(synthetic_indicators(args.count)))
+
+    print(f"{args.count} feature rows, batch size {args.batch_size}, torch threads {torch.get_num_threads()}")
+    print(f"{'mode':>8} {'rows/s':>11} {'speedup':>8} {'max dev':>10} {'band changes':>13}")
+    reference = None
+    for mode in INFERENCE_MODES:
+        model.set_inference_mode(mode)
+        model.predict_features(matrix[:args.batch_size], args.batch_size)  # Warm up
+        best = float('inf')
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            scores = np.array(model.predict_features(matrix, args.batch_size))
+            best = min(best, time.perf_counter() - start)
+        if reference is None:
+            reference = (scores, severity_bands(scores), best)
+        deviation = np.abs(scores - reference[0]).max()
+        changed = int((severity_bands(scores) != reference[1]).sum())
+        print(f"{mode:>8} {args.count / best:>11.0f} {reference[2] / best:>8.2f} "
+              f"{deviation:>10.2e} {changed:>13}")
+
+
+if __name__ == '__main__':
+    main()
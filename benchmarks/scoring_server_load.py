@@ -0,0 +1,118 @@
+"""Requests per second and latency of scoring_server at several concurrency levels
+
+Run from the repository root:
+
+    python -m benchmarks.scoring_server_load [--concurrency 1,8,32,128] [--seconds 5] [--bulk 0]
+
+Starts the server in a subprocess twice, once with micro-batching and
+once with --max-batch 1 (every request scored on its own), then runs
+closed-loop clients on keep-alive connections, each sending single
+lookups (or bulk requests of --bulk indicators) back to back. Reports
+requests/s, client-side p50/p99 and the server's mean batch size.
+"""
+import argparse
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from benchmarks.synthetic import synthetic_indicators
+from urllib.parse import quote
+
+
+def start_server(extra_args):
+    process = subprocess.Popen(
+        [sys.executable, 'scoring_server.py', '--port', '0'] + extra_args,
+        stdout=subprocess.PIPE, text=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    for line in process.stdout:
+        if line.startswith('Scoring on '):
+            return process, int(line.rsplit(':', 1)[1].split('/')[0])
+    raise RuntimeError("scoring server did not start")
+
+
+def get_json(port, path):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request('GET', path)
+    return json.loads(connection.getresponse().read())
+
+
+def client(port, indicators, bulk, stop_at, latencies, offset):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    i = offset
+    while time.perf_counter() < stop_at:
+        start = time.perf_counter()
+        if bulk:
+            body = json.dumps({'indicators': indicators[i % len(indicators):][:bulk]})
+            connection.request('POST', '/score', body, {'Content-Type': 'application/json'})
+            i += bulk
+        else:
+            connection.request('GET', '/score?indicator=' + quote(indicators[i % len(indicators)]))
+            i += 1
+        response = connection.getresponse()
+        response.read()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP {response.status}")
+        latencies.append(time.perf_counter() - start)
+    connection.close()
+
+
+def run_level(port, indicators, concurrency, seconds, bulk):
+    latencies = []
+    stop_at = time.perf_counter() + seconds
+    threads = [threading.Thread(target=client, args=(port, indicators, bulk, stop_at, latencies,
+                                                     n * len(indicators) // concurrency))
+               for n in range(concurrency)]
+    before = get_json(port, '/stats')
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    after = get_json(port, '/stats')
+    latencies.sort()
+    batches = after['batches'] - before['batches']
+    return {
+        'rps': len(latencies) / elapsed,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'p99_ms': latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+        'batch': (after['indicators'] - before['indicators']) / batches if batches else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--concurrency', default='1,8,32,128')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--bulk', type=int, default=0, help='indicators per POST; 0 sends single GETs')
+    parser.add_argument('--max-delay-ms', type=float, default=2.0)
+    parser.add_argument('--max-batch', type=int, default=256)
+    parser.add_argument('--engine', choices=('torch', 'numpy'), default='torch')
+    args = parser.parse_args()
+
+    # Unique indicators so every lookup reaches the model rather than the verdict cache
+    indicators = synthetic_indicators(500000)
+    levels = [int(n) for n in args.concurrency.split(',')]
+    modes = (
+        ('batched', ['--max-delay-ms', str(args.max_delay_ms), '--max-batch', str(args.max_batch)]),
+        ('unbatched', ['--max-delay-ms', '0', '--max-batch', '1']),
+    )
+    print(f"{'mode':>10} {'clients':>8} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'batch':>7}")
+    for mode, extra in modes:
+        process, port = start_server(extra + ['--engine', args.engine])
+        try:
+            for concurrency in levels:
+                result = run_level(port, indicators, concurrency, args.seconds, args.bulk)
+                print(f"{mode:>10} {concurrency:>8} {result['rps']:>9.0f} {result['p50_ms']:>8.2f} "
+                      f"{result['p99_ms']:>8.2f} {result['batch']:>7.1f}")
+        finally:
+            process.send_signal(signal.SIGINT)
+            process.wait(10)
+
+
+if __name__ == '__main__':
+    main()
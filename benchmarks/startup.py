@@ -0,0 +1,98 @@
+"""Cold-start cost of the headless daemon
+
+Run from the repository root:
+
+    python -m benchmarks.startup [--repeat 5] [--max-seconds 5] [--engine numpy]
+
+Prints a `python -X importtime` breakdown of `import headless` grouped by
+top-level package, then the wall-clock time from process spawn to the
+first verdict. Exits non-zero if GUI/pandas/sklearn modules load on the
+headless path (plus torch with --engine numpy) or the median time to
+first verdict exceeds --max-seconds.
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+# Modules the headless path must not import before the first verdict
+DEFERRED_MODULES = ('tkinter', 'pystray', 'PIL', 'pandas', 'sklearn')
+
+FIRST_VERDICT = """
+import json, sys
+from monitor import ThreatMonitor
+monitor = ThreatMonitor(headless=True, engine=%r)
+alert = monitor.process_event({'type': 'domain_check', 'domain': 'example.org'})
+loaded = sorted({name.split('.')[0] for name in sys.modules} & set(%r))
+print(json.dumps({'severity': alert['severity'], 'loaded': loaded}), flush=True)
+"""
+
+
+def import_breakdown(module='headless'):
+    """Self import time in ms summed per top-level package for `import module`"""
+    stderr = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        check=True, capture_output=True, text=True
+    ).stderr
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        totals[name.strip().split('.')[0]] += int(self_us) / 1000.0
+    return totals
+
+
+def time_to_first_verdict(engine='torch'):
+    """Seconds from spawning the interpreter to reading its first verdict"""
+    deferred = DEFERRED_MODULES + (('torch',) if engine == 'numpy' else ())
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', FIRST_VERDICT % (engine, deferred)],
+                               stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    while line and not line.startswith('{'):
+        line = process.stdout.readline()  # Skip printed alerts
+    elapsed = time.perf_counter() - start
+    process.wait()
+    return elapsed, json.loads(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--top', type=int, default=12)
+    parser.add_argument('--max-seconds', type=float, default=None,
+                        help='fail if the median time to first verdict exceeds this')
+    parser.add_argument('--engine', choices=('torch', 'numpy'), default='torch')
+    args = parser.parse_args()
+
+    totals = import_breakdown()
+    print("import headless: self time in ms by top-level package")
+    for name, ms in sorted(totals.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<24} {ms:>9.1f}")
+
+    timings = []
+    loaded = set()
+    for _ in range(args.repeat):
+        elapsed, result = time_to_first_verdict(args.engine)
+        timings.append(elapsed)
+        loaded.update(result['loaded'])
+    median = statistics.median(timings)
+    print(f"\nspawn to first verdict: median {median:.3f}s, best {min(timings):.3f}s "
+          f"over {args.repeat} runs")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: deferred modules imported on the headless path: {', '.join(sorted(loaded))}")
+        failed = True
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"FAIL: median time to first verdict above {args.max_seconds:.3f}s")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,297 @@
+"""Benchmark suite for the scoring path with JSON regression baselines
+
+Run from the repository root:
+
+    python -m benchmarks.suite [--scales 1000,100000,1000000] [--cases extract_features,...]
+    python -m benchmarks.suite --update-baseline     # record this machine's numbers
+
+Every case runs at every scale on seeded synthetic data and reports:
+
+- throughput: items/s of the batch path, best of --repeat runs
+- p50/p99 latency: one item at a time over up to --samples items (the
+  feed case times whole loads instead, since a load is its unit of work)
+- peak memory: tracemalloc peak during one batch run, which covers
+  Python objects and NumPy arrays but not torch's own allocator
+
+Results are compared with the baseline file: throughput more than
+--tolerance below, peak memory more than --tolerance above or p99 more
+than --latency-tolerance above the baseline fails the run with exit
+status 1. Baselines are machine specific; record them on the machine
+that runs the comparison.
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import queue
+import sys
+import tempfile
+import time
+import tracemalloc
+from types import SimpleNamespace
+from benchmarks.synthetic import synthetic_alerts, synthetic_events, synthetic_indicators, write_threat_intel
+
+DEFAULT_SCALES = (1000, 100000, 1000000)
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+class ExtractFeatures:
+    """features.extract_features per indicator, extract_features_batch for throughput"""
+    per_item = True
+
+    def __init__(self, n):
+        import features
+        self.features = features
+        self.indicators = synthetic_indicators(n)
+
+    def batch(self):
+        self.features.extract_features_batch(self.indicators)
+
+    def single(self, i):
+        self.features.extract_features(self.indicators[i])
+
+
+class PredictThreat:
+    """ThreatDetectionModel.predict_threat per indicator, predict_threat_batch for throughput"""
+    per_item = True
+
+    def __init__(self, n):
+        from model import ThreatDetectionModel
+        self.model = ThreatDetectionModel()
+        self.model.eval()
+        self.indicators = synthetic_indicators(n)
+
+    def batch(self):
+        self.model.predict_threat_batch(self.indicators)
+
+    def single(self, i):
+        self.model.predict_threat(self.indicators[i])
+
+
+class ProcessEvent:
+    """ThreatMonitor.process_event per event, process_events for throughput (cold verdict cache)"""
+    per_item = True
+
+    def __init__(self, n):
+        from monitor import ThreatMonitor
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.monitor = ThreatMonitor(headless=True)
+        self.events = synthetic_events(n)
+
+    def batch(self):
+        self.monitor.verdict_cache.clear()
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.monitor.process_events(self.events)
+        self.monitor.verdict_cache.clear()
+
+    def single(self, i):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.monitor.process_event(self.events[i])
+
+    def close(self):
+        self.monitor.close()
+
+
+class LoadThreatFeeds:
+    """ThreatFeedLoader.load of a threat_intel.json with n indicators"""
+    per_item = False
+
+    def __init__(self, n):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'threat_intel.json')
+        write_threat_intel(self.path, n)
+
+    def batch(self):
+        from threat_feeds import ThreatFeedLoader
+        update = ThreatFeedLoader(self.path).load()
+        assert update.ips or update.domains
+
+    def close(self):
+        self.tmpdir.cleanup()
+
+
+class AlertQueueing:
+    """AlertSystem.show_alert: aggregation and queueing of popups, without a display"""
+    per_item = True
+
+    def __init__(self, n):
+        from alert_aggregator import AlertAggregator
+        from alert_system import AlertSystem
+        self.show_alert = AlertSystem.show_alert
+        self.aggregator = AlertAggregator
+        self.alerts = synthetic_alerts(n)
+        self.single_target = self._target()
+
+    def _target(self):
+        # show_alert only touches these attributes; no Tk root is needed
+        return SimpleNamespace(alert_queue=queue.Queue(), aggregator=self.aggregator())
+
+    def batch(self):
+        target = self._target()
+        for alert in self.alerts:
+            self.show_alert(target, alert)
+
+    def single(self, i):
+        self.show_alert(self.single_target, self.alerts[i])
+
+
+CASES = {
+    'extract_features': ExtractFeatures,
+    'predict_threat': PredictThreat,
+    'process_event': ProcessEvent,
+    'load_threat_feeds': LoadThreatFeeds,
+    'alert_queueing': AlertQueueing,
+}
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def measure(case_class, n, samples=2000, repeat=3):
+    """Throughput, p50/p99 latency (microseconds) and peak MB for one case at one scale"""
+    case = case_class(n)
+    try:
+        case.batch()  # Warm up imports, caches and lazily built state
+        batch_timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            case.batch()
+            batch_timings.append(time.perf_counter() - start)
+
+        if case.per_item:
+            timings = []
+            for i in range(min(n, samples)):
+                start = time.perf_counter()
+                case.single(i)
+                timings.append(time.perf_counter() - start)
+        else:
+            timings = batch_timings
+        timings.sort()
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            case.batch()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    finally:
+        if hasattr(case, 'close'):
+            case.close()
+
+    return {
+        'items': n,
+        'throughput': round(n / min(batch_timings), 1),
+        'p50_us': round(percentile(timings, 0.5) * 1e6, 1),
+        'p99_us': round(percentile(timings, 0.99) * 1e6, 1),
+        'peak_mb': round(peak / 1e6, 2),
+    }
+
+
+def run_suite(scales=DEFAULT_SCALES, cases=None, samples=2000, repeat=3, log=print):
+    """{case: {scale: measurements}} for the selected cases"""
+    results = {}
+    for name in cases or CASES:
+        results[name] = {}
+        for n in scales:
+            results[name][str(n)] = result = measure(CASES[name], n, samples, repeat)
+            gc.collect()
+            if log:
+                log(format_row(name, n, result))
+    return results
+
+
+def format_row(name, n, result):
+    return (f"{name:>18} {n:>9} {result['throughput']:>12,.0f} {result['p50_us']:>10.1f} "
+            f"{result['p99_us']:>10.1f} {result['peak_mb']:>9.1f}")
+
+
+def machine_info():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def compare(results, baseline, tolerance=0.25, latency_tolerance=1.0):
+    """Regression messages for results worse than the baseline beyond the tolerances"""
+    regressions = []
+    for name, scales in results.items():
+        for n, result in scales.items():
+            base = baseline.get('results', {}).get(name, {}).get(n)
+            if base is None:
+                continue
+            checks = (
+                ('throughput', result['throughput'] < base['throughput'] * (1 - tolerance)),
+                ('p99_us', result['p99_us'] > base['p99_us'] * (1 + latency_tolerance)),
+                ('peak_mb', result['peak_mb'] > base['peak_mb'] * (1 + tolerance)),
+            )
+            for metric, regressed in checks:
+                if regressed:
+                    regressions.append(f"{name} @ {n}: {metric} {result[metric]:.1f} "
+                                       f"vs baseline {base[metric]:.1f}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)))
+    parser.add_argument('--cases', default=','.join(CASES), help='comma-separated: ' + ', '.join(CASES))
+    parser.add_argument('--samples', type=int, default=2000, help='single-item calls timed per case')
+    parser.add_argument('--repeat', type=int, default=3, help='batch runs per case, best one counts')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true', help='write results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed throughput drop / peak memory growth (fraction)')
+    parser.add_argument('--latency-tolerance', type=float, default=1.0, help='allowed p99 growth (fraction)')
+    parser.add_argument('--output', default=None, help='also write results to this JSON file')
+    args = parser.parse_args(argv)
+
+    scales = [int(n) for n in args.scales.split(',')]
+    cases = [name for name in args.cases.split(',') if name]
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}")
+
+    print(f"{'case':>18} {'items':>9} {'items/s':>12} {'p50 us':>10} {'p99 us':>10} {'peak MB':>9}")
+    report = {'machine': machine_info(), 'results': run_suite(scales, cases, args.samples, args.repeat)}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.update_baseline:
+        baseline = {'results': {}}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline['machine'] = report['machine']
+        for name, scales in report['results'].items():
+            baseline['results'].setdefault(name, {}).update(scales)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if baseline.get('machine') != report['machine']:
+        print("Warning: baseline was recorded on a different machine or Python version")
+    regressions = compare(report['results'], baseline, args.tolerance, args.latency_tolerance)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    if not regressions:
+        print("No regressions against the baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,93 @@
+"""Reproducible synthetic indicators, events, feeds and alerts for benchmarks
+
+Everything is generated from a seed, so two runs of a benchmark see the
+same inputs. Domains mix plain names, subdomains, digits, hyphens and
+the odd suspicious word across common TLDs, closer to real feeds than
+uniformly random strings.
+"""
+import json
+import random
+from features import is_ip
+
+TLDS = ('com', 'net', 'org', 'io', 'ru', 'cn', 'info', 'xyz', 'top', 'co.uk')
+SUBDOMAINS = ('www', 'mail', 'login', 'cdn', 'api', 'secure', 'update', 'static')
+WORDS = ('cloud', 'shop', 'news', 'pay', 'free', 'win', 'bank', 'crypto', 'data', 'soft',
+         'game', 'web', 'prize', 'online', 'service', 'account', 'verify', 'portal')
+LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+ALNUM = LETTERS + '0123456789'
+SEVERITIES = ('LOW', 'MEDIUM', 'HIGH')
+
+
+def synthetic_ips(count, seed=0):
+    """Public-looking IPv4 addresses with a sprinkling of private ranges"""
+    rng = random.Random(seed)
+    ips = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.05:
+            ips.append(f'192.168.{rng.randint(0, 255)}.{rng.randint(1, 254)}')
+        elif roll < 0.1:
+            ips.append(f'10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}')
+        else:
+            ips.append('.'.join(str(rng.randint(1, 255)) for _ in range(4)))
+    return ips
+
+
+def synthetic_domains(count, seed=0):
+    """Domain names built from words, random labels, digits and subdomains"""
+    rng = random.Random(seed)
+    domains = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < 0.4:
+            label = rng.choice(WORDS) + rng.choice(('', '-', '')) + rng.choice(WORDS)
+        elif roll < 0.8:
+            label = ''.join(rng.choice(LETTERS) for _ in range(rng.randint(4, 14)))
+        else:
+            label = ''.join(rng.choice(ALNUM) for _ in range(rng.randint(8, 24)))
+        if rng.random() < 0.3:
+            label = rng.choice(SUBDOMAINS) + '.' + label
+        domains.append(f'{label}.{rng.choice(TLDS)}')
+    return domains
+
+
+def synthetic_indicators(count, ip_fraction=0.5, seed=0):
+    """count IPs and domains interleaved in a seeded random order"""
+    ip_count = int(count * ip_fraction)
+    indicators = synthetic_ips(ip_count, seed) + synthetic_domains(count - ip_count, seed + 1)
+    random.Random(seed + 2).shuffle(indicators)
+    return indicators
+
+
+def synthetic_events(count, ip_fraction=0.5, seed=0):
+    """ip_check and domain_check events as produced by the feed pipeline"""
+    return [{'type': 'ip_check', 'ip_address': indicator} if is_ip(indicator)
+            else {'type': 'domain_check', 'domain': indicator}
+            for indicator in synthetic_indicators(count, ip_fraction, seed)]
+
+
+def write_threat_intel(path, count, seed=0):
+    """Write a threat_intel.json style feed with count indicators"""
+    ip_count = count // 2
+    with open(path, 'w') as f:
+        json.dump({
+            'malicious_ips': synthetic_ips(ip_count, seed),
+            'malicious_domains': synthetic_domains(count - ip_count, seed + 1)
+        }, f)
+
+
+def synthetic_alerts(count, distinct=1000, seed=0):
+    """Alerts over distinct indicators, so repeats exercise deduplication"""
+    rng = random.Random(seed)
+    indicators = synthetic_ips(distinct, seed)
+    alerts = []
+    for _ in range(count):
+        score = rng.random()
+        alerts.append({
+            'severity': SEVERITIES[min(int(score * 3), 2)],
+            'threat_score': score,
+            'recommended_action': 'Log for future reference',
+            'type': 'ip_check',
+            'ip_address': rng.choice(indicators)
+        })
+    return alerts
@@ -0,0 +1,315 @@
+"""Memory-mapped Bloom filters for pre-screening very large blocklists
+
+Third-party blocklists with tens of millions of entries are too big to
+hold in IndicatorIndex or a Python set. A Bloom filter answers "is this
+indicator listed?" in about 14.4 bits per entry at a 0.1% false-positive
+rate and never misses a listed indicator. Filters are built offline into
+a file and opened with mmap, so startup costs nothing whatever their
+size and the pages are shared by every process that opens them:
+
+    python bloom_filter.py build blocklist.txt.gz more.csv -o blocklist.bloom --fpr 0.001
+    python bloom_filter.py verify blocklist.bloom --source blocklist.txt.gz
+    python bloom_filter.py info blocklist.bloom
+
+Entries are matched exactly after normalize_indicator (no CIDR blocks
+and no subdomains; those belong in IndicatorIndex). A hit only means
+"probably listed": ThreatMonitor still scores the indicator with the
+model and raises the score to the filter's hit score, so a false
+positive costs a MEDIUM alert, not a block.
+"""
+import argparse
+import hashlib
+import math
+import mmap
+import os
+import random
+import struct
+import tempfile
+import time
+import numpy as np
+from feed_stream import iter_chunks, iter_text_indicators, open_feed
+from verdict_cache import normalize_indicator
+
+MAGIC = b'TDBLOOM1'
+
+# Magic, hash count, bits, entries added, target false-positive rate, score for hits
+_HEADER = struct.Struct('<8sIQQdd')
+HEADER_SIZE = 64  # The bit array starts on a cache line
+
+DEFAULT_FPR = 0.001
+
+# A probable listing is worth investigating (MEDIUM), not blocking
+DEFAULT_HIT_SCORE = 0.5
+
+# Indicators hashed and looked up per numpy pass, bounding temporary arrays
+CHUNK_SIZE = 65536
+
+_MASK64 = (1 << 64) - 1
+
+
+def optimal_parameters(capacity, fpr=DEFAULT_FPR):
+    """(bits, hashes) for a filter holding capacity entries at false-positive rate fpr"""
+    if not 0 < fpr < 1:
+        raise ValueError(f"False-positive rate must be between 0 and 1, got {fpr}")
+    capacity = max(1, capacity)
+    bits = math.ceil(-capacity * math.log(fpr) / math.log(2) ** 2)
+    bits = max(64, (bits + 63) // 64 * 64)
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+def _hash_pair(indicator):
+    digest = hashlib.blake2b(indicator.encode('utf-8'), digest_size=16).digest()
+    # An odd step makes the k positions distinct whenever bits is even
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+def _hash_pairs(indicators):
+    blake2b = hashlib.blake2b
+    digests = b''.join([blake2b(i.encode('utf-8'), digest_size=16).digest() for i in indicators])
+    pairs = np.frombuffer(digests, dtype='<u8').reshape(-1, 2)
+    return pairs[:, 0], pairs[:, 1] | np.uint64(1)
+
+
+class BloomFilter:
+    """Bloom filter over normalized indicators, stored as a flat bit array
+
+    Each indicator is hashed once (128-bit BLAKE2b); its k bit positions
+    are h1 + i*h2 mod bits (double hashing). contains_many checks a whole
+    batch with a few numpy operations.
+    """
+
+    def __init__(self, bits, hashes, data, count=0, fpr=DEFAULT_FPR, score=DEFAULT_HIT_SCORE, path=None):
+        self.bits = bits
+        self.hashes = hashes
+        self.count = count
+        self.fpr = fpr
+        self.score = score
+        self.path = path
+        self.name = os.path.basename(path) if path else 'blocklist'
+        self._data = data
+        self._steps = np.arange(hashes, dtype=np.uint64)
+        self._mmap = None
+
+    @classmethod
+    def create(cls, capacity, fpr=DEFAULT_FPR, score=DEFAULT_HIT_SCORE):
+        """An empty in-memory filter sized for capacity entries"""
+        bits, hashes = optimal_parameters(capacity, fpr)
+        return cls(bits, hashes, np.zeros(bits // 8, dtype=np.uint8), fpr=fpr, score=score)
+
+    @classmethod
+    def open(cls, path):
+        """Map a saved filter read-only; nothing is read until lookups touch it"""
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, hashes, bits, count, fpr, score = _HEADER.unpack_from(mapped)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a Bloom filter file")
+            if len(mapped) < HEADER_SIZE + bits // 8:
+                raise ValueError(f"{path} is truncated")
+        except (ValueError, struct.error):
+            mapped.close()
+            raise
+        data = np.frombuffer(mapped, dtype=np.uint8, count=bits // 8, offset=HEADER_SIZE)
+        bloom = cls(bits, hashes, data, count, fpr, score, path)
+        bloom._mmap = mapped
+        return bloom
+
+    def close(self):
+        if self._mmap is not None:
+            self._data = None
+            self._mmap.close()
+            self._mmap = None
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def size_bytes(self):
+        return HEADER_SIZE + self.bits // 8
+
+    def expected_fpr(self, count=None):
+        """Theoretical false-positive rate with count (default: the entries added) entries"""
+        count = self.count if count is None else count
+        return (1 - math.exp(-self.hashes * count / self.bits)) ** self.hashes
+
+    def __contains__(self, indicator):
+        h1, h2 = _hash_pair(normalize_indicator(indicator))
+        data, bits = self._data, self.bits
+        for i in range(self.hashes):
+            position = ((h1 + i * h2) & _MASK64) % bits
+            if not (data[position >> 3] >> (position & 7)) & 1:
+                return False
+        return True
+
+    def contains_many(self, indicators):
+        """Boolean array: True where an indicator is probably listed"""
+        result = np.empty(len(indicators), dtype=bool)
+        start = 0
+        for chunk in iter_chunks(indicators, CHUNK_SIZE):
+            positions = self._positions([normalize_indicator(i) for i in chunk])
+            found = (self._data[positions >> 3] >> (positions & 7)) & 1
+            result[start:start + len(chunk)] = found.all(axis=1)
+            start += len(chunk)
+        return result
+
+    def add(self, indicator):
+        self.add_many([indicator])
+
+    def add_many(self, indicators):
+        """Add an iterable of indicators; returns how many were added"""
+        if not self._data.flags.writeable:
+            # ufunc.at does not check and would crash on the read-only mapping
+            raise ValueError(f"{self.name} is mapped read-only; rebuild it with build_filter")
+        added = 0
+        for chunk in iter_chunks(indicators, CHUNK_SIZE):
+            positions = self._positions([normalize_indicator(i) for i in chunk]).ravel()
+            np.bitwise_or.at(self._data, (positions >> 3).astype(np.intp),
+                             np.left_shift(1, positions & 7).astype(np.uint8))
+            added += len(chunk)
+        self.count += added
+        return added
+
+    def save(self, path):
+        """Write the filter atomically (temp file + rename)"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.bloom-', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                header = _HEADER.pack(MAGIC, self.hashes, self.bits, self.count, self.fpr, self.score)
+                f.write(header.ljust(HEADER_SIZE, b'\0'))
+                f.write(memoryview(self._data))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.path = path
+        self.name = os.path.basename(path)
+
+    def _positions(self, indicators):
+        """(len(indicators), hashes) array of bit positions"""
+        h1, h2 = _hash_pairs(indicators)
+        # uint64 arithmetic wraps like the & _MASK64 in __contains__
+        return (h1[:, None] + self._steps * h2[:, None]) % np.uint64(self.bits)
+
+
+def iter_blocklist(paths):
+    """Normalized entries of text blocklists: one indicator per line, optional score, # comments"""
+    for path in paths:
+        with open_feed(path) as f:
+            for line in iter_text_indicators(f):
+                yield normalize_indicator(line.split()[0])
+
+
+def build_filter(sources, output, fpr=DEFAULT_FPR, capacity=None, score=DEFAULT_HIT_SCORE):
+    """Build a filter file from text blocklists (optionally gzipped)
+
+    Without a capacity the sources are read twice: once to count
+    entries, once to add them. CIDR blocks cannot be matched exactly and
+    are skipped with a count.
+    """
+    if capacity is None:
+        capacity = sum(1 for entry in iter_blocklist(sources) if '/' not in entry)
+    bloom = BloomFilter.create(capacity, fpr, score)
+    skipped = 0
+
+    def entries():
+        nonlocal skipped
+        for entry in iter_blocklist(sources):
+            if '/' in entry:
+                skipped += 1
+            else:
+                yield entry
+
+    bloom.add_many(entries())
+    if skipped:
+        print(f"Skipped {skipped} CIDR entries; load those into IndicatorIndex instead")
+    if bloom.count > capacity:
+        print(f"Warning: {bloom.count} entries exceed capacity {capacity}; "
+              f"expected false-positive rate {bloom.expected_fpr():.4%}")
+    bloom.save(output)
+    return bloom
+
+
+def measure_false_positive_rate(bloom, probes=1000000, seed=0):
+    """Share of random *.invalid names, which no blocklist can contain, reported as listed"""
+    rng = random.Random(seed)
+    hits = 0
+    for start in range(0, probes, CHUNK_SIZE):
+        chunk = [f'{rng.getrandbits(64):016x}.probe.invalid' for _ in range(min(CHUNK_SIZE, probes - start))]
+        hits += int(bloom.contains_many(chunk).sum())
+    return hits / probes if probes else 0.0
+
+
+def count_missing(bloom, sources):
+    """Entries of the sources the filter does not report as listed; always 0 for a correct build"""
+    missing = 0
+    entries = (entry for entry in iter_blocklist(sources) if '/' not in entry)
+    for chunk in iter_chunks(entries, CHUNK_SIZE):
+        missing += len(chunk) - int(bloom.contains_many(chunk).sum())
+    return missing
+
+
+def _describe(bloom):
+    return (f"{bloom.name}: {bloom.count} entries, {bloom.size_bytes / 1e6:.1f} MB "
+            f"({bloom.bits / max(1, bloom.count):.1f} bits/entry), {bloom.hashes} hashes, "
+            f"target FPR {bloom.fpr:.4%}, expected {bloom.expected_fpr():.4%}, hit score {bloom.score}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build and check memory-mapped blocklist Bloom filters")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='build a filter file from text blocklists')
+    build.add_argument('sources', nargs='+', help="text blocklists ('indicator' per line, optionally gzipped)")
+    build.add_argument('-o', '--output', required=True)
+    build.add_argument('--fpr', type=float, default=DEFAULT_FPR, help='target false-positive rate')
+    build.add_argument('--capacity', type=int, default=None,
+                       help='entries to size for (default: count the sources first)')
+    build.add_argument('--score', type=float, default=DEFAULT_HIT_SCORE,
+                       help='minimum threat score for indicators the filter matches')
+
+    verify = commands.add_parser('verify', help='measure the false-positive rate and check for misses')
+    verify.add_argument('filter')
+    verify.add_argument('--probes', type=int, default=1000000, help='random absent indicators to test')
+    verify.add_argument('--source', action='append', default=[],
+                        help='blocklist the filter was built from; every entry must match')
+
+    info = commands.add_parser('info', help='print a filter header')
+    info.add_argument('filter')
+    args = parser.parse_args(argv)
+
+    if args.command == 'build':
+        started = time.perf_counter()
+        bloom = build_filter(args.sources, args.output, args.fpr, args.capacity, args.score)
+        print(f"Built {args.output} in {time.perf_counter() - started:.1f}s")
+        print(_describe(bloom))
+        return 0
+
+    bloom = BloomFilter.open(args.filter)
+    try:
+        print(_describe(bloom))
+        if args.command == 'info':
+            return 0
+        ok = True
+        if args.probes:
+            measured = measure_false_positive_rate(bloom, args.probes)
+            # Allow four standard deviations of sampling noise above the larger of target and expected
+            target = max(bloom.fpr, bloom.expected_fpr())
+            limit = target + 4 * math.sqrt(target * (1 - target) / args.probes)
+            ok = measured <= limit
+            print(f"Measured FPR {measured:.4%} over {args.probes} probes (limit {limit:.4%}): "
+                  f"{'ok' if ok else 'TOO HIGH'}")
+        if args.source:
+            missing = count_missing(bloom, args.source)
+            print(f"Missing source entries: {missing}")
+            ok = ok and missing == 0
+        return 0 if ok else 1
+    finally:
+        bloom.close()
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
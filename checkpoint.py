@@ -0,0 +1,176 @@
+"""Versioned model checkpoints and hot reload
+
+A checkpoint bundles everything needed to reproduce verdicts: the network
+weights, the fitted scaler's mean/scale, the feature schema version the
+weights were trained against and the alert thresholds. Checkpoints are
+torch zip files loaded on the CPU with memory mapping; .npz exports from
+numpy_model.py load the same way without torch.
+"""
+import os
+import tempfile
+import threading
+import numpy as np
+from features import FEATURE_VERSION
+
+CHECKPOINT_VERSION = 1
+
+# Threat score cut-offs for HIGH and MEDIUM alerts
+DEFAULT_THRESHOLDS = {'HIGH': 0.8, 'MEDIUM': 0.5}
+
+
+class Checkpoint:
+    """Weights plus the metadata needed to score with them"""
+
+    def __init__(self, state_dict, feature_scaling=None, thresholds=None,
+                 feature_version=FEATURE_VERSION, version=CHECKPOINT_VERSION):
+        self.state_dict = state_dict
+        self.feature_scaling = feature_scaling  # (mean, scale) or None
+        self.thresholds = dict(DEFAULT_THRESHOLDS, **(thresholds or {}))
+        self.feature_version = feature_version
+        self.version = version
+
+    def build_model(self, engine='torch', inference='float'):
+        """A fresh eval-mode model holding these weights"""
+        if engine == 'numpy':
+            from numpy_model import NumpyThreatModel
+            if inference != 'float':
+                raise ValueError("The numpy engine only supports float inference")
+            model = NumpyThreatModel(self.state_dict)
+        else:
+            from model import ThreatDetectionModel
+            model = ThreatDetectionModel()
+            model.load_state_dict(self.state_dict)
+            model.eval()
+            model.set_inference_mode(inference)
+        if self.feature_scaling is not None:
+            model.set_feature_scaling(*self.feature_scaling)
+        return model
+
+
+def model_scaling(model):
+    """(mean, scale) the model standardizes features with, or from its fitted scaler"""
+    scaling = model.feature_scaling()
+    if scaling is None and getattr(model, '_scaler', None) is not None \
+            and hasattr(model._scaler, 'mean_'):
+        scaling = (model._scaler.mean_, model._scaler.scale_)
+    return scaling
+
+
+def save_checkpoint(model, path, thresholds=None):
+    """Write a checkpoint for a ThreatDetectionModel atomically (temp file + rename)"""
+    import torch
+
+    scaling = model_scaling(model)
+    data = {
+        'format': CHECKPOINT_VERSION,
+        'feature_version': FEATURE_VERSION,
+        'state_dict': {key: value.detach().cpu() for key, value in model.state_dict().items()},
+        'scaler_mean': None if scaling is None else torch.as_tensor(scaling[0], dtype=torch.float32),
+        'scaler_scale': None if scaling is None else torch.as_tensor(scaling[1], dtype=torch.float32),
+        'thresholds': dict(DEFAULT_THRESHOLDS, **(thresholds or {})),
+    }
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.checkpoint-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            torch.save(data, f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_checkpoint(path):
+    """Load a checkpoint, a plain state dict saved by older versions, or an .npz export"""
+    if path.endswith('.npz'):
+        return _load_npz(path)
+
+    import torch
+    try:
+        data = torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+    except RuntimeError:
+        # Files written with the legacy (non-zip) serializer can't be memory mapped
+        data = torch.load(path, map_location='cpu', weights_only=True)
+
+    if 'format' not in data:
+        return Checkpoint(data, feature_version=FEATURE_VERSION, version=0)
+    if data['format'] > CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint format {data['format']} is newer than supported ({CHECKPOINT_VERSION})")
+    _check_feature_version(data['feature_version'])
+    scaling = None
+    if data.get('scaler_mean') is not None:
+        scaling = (data['scaler_mean'].numpy(), data['scaler_scale'].numpy())
+    return Checkpoint(data['state_dict'], scaling, data.get('thresholds'),
+                      data['feature_version'], data['format'])
+
+
+def _load_npz(path):
+    with np.load(path) as data:
+        arrays = {key: data[key] for key in data.files}
+    scaling = None
+    if 'scaler_mean' in arrays:
+        scaling = (arrays.pop('scaler_mean'), arrays.pop('scaler_scale'))
+    thresholds = None
+    if 'thresholds' in arrays:
+        high, medium = arrays.pop('thresholds').tolist()
+        thresholds = {'HIGH': high, 'MEDIUM': medium}
+    feature_version = int(arrays.pop('feature_version', FEATURE_VERSION))
+    _check_feature_version(feature_version)
+    return Checkpoint(arrays, scaling, thresholds, feature_version)
+
+
+def _check_feature_version(feature_version):
+    if feature_version != FEATURE_VERSION:
+        raise ValueError(f"Checkpoint was trained on feature schema v{feature_version}, "
+                         f"this build extracts v{FEATURE_VERSION}")
+
+
+def _file_signature(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+
+class CheckpointWatcher:
+    """Polls a checkpoint file and calls on_change(path) when it is replaced
+
+    Runs on a daemon thread; checkpoints should be written with
+    save_checkpoint (or any temp file + rename) so a half-written file is
+    never seen.
+    """
+
+    def __init__(self, path, on_change, interval=2.0):
+        self.path = path
+        self.on_change = on_change
+        self.interval = interval
+        self._signature = _file_signature(path)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='checkpoint-watcher', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def poll(self):
+        """Check the file once; True if on_change was called"""
+        signature = _file_signature(self.path)
+        if signature is None or signature == self._signature:
+            return False
+        self._signature = signature
+        try:
+            self.on_change(self.path)
+        except Exception as e:
+            print(f"Error reloading model checkpoint: {str(e)}")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.poll()
@@ -1,35 +1,166 @@
-import pandas as pd
+import numpy as np
+import threading
+import time
 from datetime import datetime
+from ring_buffer import RingBuffer, StringTable
+
+TYPE_NETWORK = 1
+TYPE_LOG = 2
+TYPE_NAMES = {TYPE_NETWORK: 'network', TYPE_LOG: 'log'}
+
+# One fixed-width row per data point; strings are interned ids (-1 = absent)
+RECORD_DTYPE = np.dtype([
+    ('timestamp', 'i8'),    # Epoch nanoseconds
+    ('type', 'u1'),
+    ('source_ip', 'i4'),
+    ('dest_ip', 'i4'),
+    ('packet_size', 'i8'),
+    ('protocol', 'i4'),
+    ('user', 'i4'),
+    ('action', 'i4'),
+    ('resource', 'i4'),
+    ('source_port', 'i4'),  # -1 when unknown
+    ('dest_port', 'i4'),
+    ('packets', 'i8'),      # Packets summarised by the record (flows); 1 for single packets
+])
+
+NETWORK_COLUMNS = ['timestamp', 'source_ip', 'dest_ip', 'packet_size', 'protocol', 'type']
+LOG_COLUMNS = ['timestamp', 'user', 'action', 'resource', 'type']
+STRING_FIELDS = ['source_ip', 'dest_ip', 'protocol', 'user', 'action', 'resource']
+
+# A record references at most three strings, so a buffer can hold at most
+# 3 * capacity live ones; the table is compacted once it doubles that
+STRINGS_PER_RECORD = 3
 
 class DataCollector:
-    def __init__(self):
-        self.data_buffer = []
+    def __init__(self, capacity=100000, overflow='overwrite', behavior=None):
+        self.buffer = RingBuffer(capacity, RECORD_DTYPE, overflow=overflow)
+        self.strings = StringTable()
+        self.string_limit = 2 * STRINGS_PER_RECORD * capacity
+        self.compactions = 0
+        self.behavior = behavior  # Optional BehaviorStats fed with every network record
+        self._lock = threading.Lock()
 
     def collect_network_data(self, source_ip, dest_ip, packet_size, protocol):
         """Collect network traffic data point"""
-        data_point = {
-            'timestamp': datetime.now(),
+        timestamp_ns = time.time_ns()
+        with self._lock:
+            intern = self.strings.intern
+            self.buffer.append((
+                timestamp_ns, TYPE_NETWORK, intern(source_ip), intern(dest_ip),
+                packet_size, intern(protocol), -1, -1, -1, -1, -1, 1
+            ))
+            self._bound_strings()
+            if self.behavior is not None:
+                self.behavior.update(source_ip, dest_ip, None, protocol, packet_size, timestamp_ns)
+        return {
+            'timestamp': datetime.fromtimestamp(timestamp_ns / 1e9),
             'source_ip': source_ip,
             'dest_ip': dest_ip,
             'packet_size': packet_size,
             'protocol': protocol,
             'type': 'network'
         }
-        self.data_buffer.append(data_point)
-        return data_point
 
     def collect_log_data(self, user, action, resource):
         """Collect system log data point"""
-        data_point = {
-            'timestamp': datetime.now(),
+        timestamp_ns = time.time_ns()
+        with self._lock:
+            intern = self.strings.intern
+            self.buffer.append((
+                timestamp_ns, TYPE_LOG, -1, -1, 0, -1,
+                intern(user), intern(action), intern(resource), -1, -1, 0
+            ))
+            self._bound_strings()
+        return {
+            'timestamp': datetime.fromtimestamp(timestamp_ns / 1e9),
             'user': user,
             'action': action,
             'resource': resource,
             'type': 'log'
         }
-        self.data_buffer.append(data_point)
-        return data_point
+
+    def collect_flows(self, flows):
+        """Store aggregated flows (network_monitor.Flow) as network records in one buffer write
+
+        Each record is stamped with the flow's last packet time; packet_size
+        holds the flow's total bytes and packets its packet count.
+        """
+        records = np.empty(len(flows), dtype=RECORD_DTYPE)
+        records['timestamp'] = [flow.last_seen for flow in flows]
+        records['type'] = TYPE_NETWORK
+        records['packet_size'] = [flow.bytes for flow in flows]
+        records['source_port'] = [flow.source_port for flow in flows]
+        records['dest_port'] = [flow.dest_port for flow in flows]
+        records['packets'] = [flow.packets for flow in flows]
+        records['user'] = records['action'] = records['resource'] = -1
+        with self._lock:
+            intern = self.strings.intern
+            records['source_ip'] = [intern(flow.source_ip) for flow in flows]
+            records['dest_ip'] = [intern(flow.dest_ip) for flow in flows]
+            records['protocol'] = [intern(flow.protocol) for flow in flows]
+            if self.behavior is not None:
+                self.behavior.update_flows(flows)
+            kept = self.buffer.extend(records)
+            self._bound_strings()
+            return kept
+
+    def _bound_strings(self):
+        """Drop strings no buffered record refers to once the table passes string_limit
+
+        Called with self._lock held. Ids of the records still buffered are
+        rewritten in place, so every string the buffer holds stays resolvable.
+        """
+        if len(self.strings) <= self.string_limit:
+            return
+        parts = self.buffer.views()
+        live = np.concatenate([part[field] for part in parts for field in STRING_FIELDS]) \
+            if parts else np.zeros(0, dtype=np.int32)
+        remap = self.strings.compact(live)
+        for part in parts:
+            for field in STRING_FIELDS:
+                part[field] = remap[part[field]]
+        self.compactions += 1
+
+    def get_recent_records(self, n_samples=100):
+        """Return the n most recent data points as a structured array (a view unless wrapped)
+
+        String fields are ids into self.strings, valid until the next write
+        compacts the table.
+        """
+        return self.buffer.latest(n_samples)
 
     def get_recent_data(self, n_samples=100):
         """Return the n most recent data points"""
-        return pd.DataFrame(self.data_buffer[-n_samples:]) 
\ No newline at end of file
+        import pandas as pd  # Deferred: only needed when a DataFrame is requested
+
+        with self._lock:
+            # A copy, resolved under the lock: a concurrent write may renumber string ids
+            records = self.get_recent_records(n_samples).copy()
+            strings = {column: self.strings.resolve(records[column]) for column in STRING_FIELDS}
+        types = records['type']
+        has_network = bool((types == TYPE_NETWORK).any())
+        has_log = bool((types == TYPE_LOG).any())
+
+        columns = []
+        if has_network:
+            columns += NETWORK_COLUMNS
+        if has_log:
+            columns += [c for c in LOG_COLUMNS if c not in columns]
+
+        data = {}
+        for column in columns:
+            if column == 'timestamp':
+                data[column] = (pd.to_datetime(records['timestamp'], unit='ns', utc=True)
+                                .tz_convert(_local_timezone()).tz_localize(None))
+            elif column == 'type':
+                data[column] = np.where(types == TYPE_NETWORK, 'network', 'log')
+            elif column == 'packet_size':
+                sizes = records['packet_size']
+                data[column] = sizes if not has_log else np.where(types == TYPE_NETWORK, sizes, np.nan)
+            else:
+                data[column] = strings[column]
+        return pd.DataFrame(data, columns=columns)
+
+def _local_timezone():
+    return datetime.now().astimezone().tzinfo
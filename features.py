@@ -0,0 +1,284 @@
+import math
+import os
+import re
+from collections import Counter
+import numpy as np
+from aho_corasick import AhoCorasick
+
+# Number of features produced for every IP or domain
+NUM_FEATURES = 10
+
+# Bump whenever a feature's definition changes; checkpoints record it
+FEATURE_VERSION = 1
+
+SUSPICIOUS_WORDS = ['free', 'win', 'prize', 'crypto', 'bank', 'secure', 'login']
+CONSONANTS = 'bcdfghjklmnpqrstvwxyz'
+VOWELS = 'aeiou'
+SPECIAL_CHARS = '-_'
+
+_CONSONANT_RUN = re.compile(f'[{CONSONANTS}]+')
+
+# Byte lookup tables used by the columnar extractor
+_LOWER = np.arange(256, dtype=np.uint8)
+_LOWER[ord('A'):ord('Z') + 1] += 32
+_IS_CONSONANT = np.zeros(256, dtype=bool)
+_IS_CONSONANT[np.frombuffer(CONSONANTS.encode(), dtype=np.uint8)] = True
+_IS_VOWEL = np.zeros(256, dtype=bool)
+_IS_VOWEL[np.frombuffer(VOWELS.encode(), dtype=np.uint8)] = True
+_IS_SPECIAL = np.zeros(256, dtype=bool)
+_IS_SPECIAL[np.frombuffer(SPECIAL_CHARS.encode(), dtype=np.uint8)] = True
+_IS_DIGIT = np.zeros(256, dtype=bool)
+_IS_DIGIT[ord('0'):ord('9') + 1] = True
+_DOT = ord('.')
+
+# Longest dotted quad without leading zeros
+_MAX_IP_LENGTH = 15
+
+# Compiled suspicious-term lexicon, replaced by load_lexicon()
+_lexicon = AhoCorasick(SUSPICIOUS_WORDS)
+
+
+def is_ip(string):
+    """Check if string is an IP address"""
+    parts = string.split('.')
+    if len(parts) != 4:
+        return False
+    try:
+        return all(0 <= int(part) <= 255 for part in parts)
+    except ValueError:
+        return False
+
+
+def entropy(string):
+    """Calculate Shannon entropy of string"""
+    length = len(string)
+    return -sum((n / length) * math.log2(n / length) for n in Counter(string).values())
+
+
+def load_lexicon(source=None):
+    """Install the suspicious-term lexicon from a file path or an iterable of terms
+
+    None restores SUSPICIOUS_WORDS. The lexicon defines the suspicious-words
+    feature, so models should be trained and served with the same one.
+    """
+    global _lexicon
+    if source is None:
+        source = SUSPICIOUS_WORDS
+    if isinstance(source, (str, os.PathLike)):
+        _lexicon = AhoCorasick.from_file(source)
+    else:
+        _lexicon = AhoCorasick(source)
+    return _lexicon
+
+
+def lexicon():
+    """The active suspicious-term matcher"""
+    return _lexicon
+
+
+def suspicious_matches(domain):
+    """(term, position) for every lexicon term found in domain"""
+    return _lexicon.search(domain.lower())
+
+
+def contains_suspicious_words(domain):
+    """Check for suspicious words in domain"""
+    return _lexicon.contains(domain.lower())
+
+
+def longest_consonant_sequence(string):
+    """Get length of longest consonant sequence"""
+    return max(map(len, _CONSONANT_RUN.findall(string.lower())), default=0)
+
+
+def domain_length_score(domain):
+    """Score domain length (longer domains more suspicious)"""
+    return min(len(domain) / 50.0, 1.0)
+
+
+def special_char_ratio(string):
+    """Calculate ratio of special characters"""
+    return sum(string.count(c) for c in SPECIAL_CHARS) / len(string)
+
+
+def vowel_consonant_ratio(string):
+    """Calculate vowel to consonant ratio"""
+    if len(string) == 0:
+        return 0
+    lowered = string.lower()
+    return sum(lowered.count(c) for c in VOWELS) / len(string)
+
+
+def extract_features(ip_or_domain):
+    """Extract the ten model features for a single IP or domain"""
+    if is_ip(ip_or_domain):
+        octets = [int(x) for x in ip_or_domain.split('.')]
+        total = sum(octets)
+        mean = total / 4.0
+        return [
+            mean,                                            # Mean of octets
+            math.sqrt(sum((o - mean) ** 2 for o in octets) / 4.0),  # Standard deviation
+            max(octets),                                     # Maximum value
+            min(octets),                                     # Minimum value
+            len(set(octets)),                                # Unique octets
+            entropy(ip_or_domain),                           # String entropy
+            1 if ip_or_domain.startswith('192.168') else 0,  # Internal IP
+            1 if ip_or_domain.startswith('10.') else 0,      # Internal IP
+            octets[0] / 255.0,                               # First octet normalized
+            total / 1020.0                                   # Sum of octets normalized
+        ]
+
+    length = len(ip_or_domain)
+    return [
+        length,                                              # Length
+        ip_or_domain.count('.'),                             # Number of dots
+        entropy(ip_or_domain),                               # String entropy
+        sum(c.isdigit() for c in ip_or_domain) / length,     # Digit ratio
+        len(set(ip_or_domain)) / length,                     # Unique char ratio
+        contains_suspicious_words(ip_or_domain),             # Suspicious words
+        longest_consonant_sequence(ip_or_domain),            # Consonant sequence
+        domain_length_score(ip_or_domain),                   # Length score
+        special_char_ratio(ip_or_domain),                    # Special chars
+        vowel_consonant_ratio(ip_or_domain)                  # Vowel ratio
+    ]
+
+
+def extract_features_batch(indicators, chunk_size=4096):
+    """Extract features for many IPs/domains into an (N, 10) float32 matrix
+
+    Strings are encoded into a padded uint8 matrix and every feature is
+    computed column-wise with lookup tables, so the cost per indicator is
+    a handful of vectorized NumPy operations instead of Python loops.
+    Results agree with extract_features() within float tolerance.
+    """
+    indicators = list(indicators)
+    features = np.empty((len(indicators), NUM_FEATURES), dtype=np.float32)
+    for start in range(0, len(indicators), chunk_size):
+        chunk = indicators[start:start + chunk_size]
+        features[start:start + len(chunk)] = _extract_chunk(chunk)
+    return features
+
+
+def _extract_chunk(indicators):
+    """Vectorized feature extraction for one chunk of indicators"""
+    n = len(indicators)
+    features = np.zeros((n, NUM_FEATURES), dtype=np.float64)
+    lengths = np.fromiter(map(len, indicators), dtype=np.int64, count=n)
+
+    # Fixed-width UTF-32 view: one column per character, zero padded
+    codes = np.array(indicators, dtype=str)
+    codes = codes.view(np.uint32).reshape(n, -1) if codes.itemsize else np.zeros((n, 0), np.uint32)
+    width = codes.shape[1]
+    valid = np.arange(width) < lengths[:, None]
+
+    # Empty, non-ASCII or NUL-containing strings take the scalar path so
+    # edge cases (and errors) behave exactly like extract_features()
+    simple = (lengths > 0) & (codes < 128).all(axis=1) & ((codes != 0).sum(axis=1) == lengths)
+    chars = codes.astype(np.uint8)
+
+    is_digit = _IS_DIGIT[chars] & valid
+    is_dot = (chars == _DOT) & valid
+    dot_count = is_dot.sum(axis=1)
+    dotted_quad = simple & (dot_count == 3) & ((is_digit | is_dot).sum(axis=1) == lengths)
+
+    # Dotted quads with leading zeros can be longer than 15 characters
+    scalar = ~simple | (dotted_quad & (lengths > _MAX_IP_LENGTH))
+    candidates = np.flatnonzero(dotted_quad & ~scalar)
+    ip_rows = candidates[:0]
+    octets = np.zeros((0, 4), dtype=np.int64)
+    if len(candidates):
+        octets, parsed = _parse_octets(chars[candidates, :_MAX_IP_LENGTH])
+        ip_rows = candidates[parsed]
+        octets = octets[parsed]
+
+    # Other strings with three dots may still parse via int(), e.g. ' 1.2.3.4'
+    odd_quads = np.flatnonzero(simple & (dot_count == 3) & ~dotted_quad)
+    for row in odd_quads:
+        if is_ip(indicators[row]):
+            scalar[row] = True
+
+    is_ip_row = np.zeros(n, dtype=bool)
+    is_ip_row[ip_rows] = True
+    domain_rows = np.flatnonzero(simple & ~scalar & ~is_ip_row)
+
+    rows = np.flatnonzero(simple & ~scalar)
+    row_entropy = np.zeros(n)
+    unique_chars = np.zeros(n)
+    if len(rows):
+        row_entropy[rows], unique_chars[rows] = _entropy_rows(chars[rows], valid[rows], lengths[rows])
+
+    if len(ip_rows):
+        octets = octets.astype(np.float64)
+        ip_chars = chars[ip_rows]
+        sorted_octets = np.sort(octets, axis=1)
+        features[ip_rows] = np.column_stack([
+            octets.mean(axis=1),
+            octets.std(axis=1),
+            sorted_octets[:, 3],
+            sorted_octets[:, 0],
+            1 + (np.diff(sorted_octets, axis=1) != 0).sum(axis=1),
+            row_entropy[ip_rows],
+            (ip_chars[:, :7] == np.frombuffer(b'192.168', dtype=np.uint8)).all(axis=1),
+            (ip_chars[:, :3] == np.frombuffer(b'10.', dtype=np.uint8)).all(axis=1),
+            octets[:, 0] / 255.0,
+            octets.sum(axis=1) / 1020.0
+        ])
+
+    if len(domain_rows):
+        lowered = _LOWER[chars[domain_rows]]
+        domain_valid = valid[domain_rows]
+        length = lengths[domain_rows].astype(np.float64)
+        features[domain_rows] = np.column_stack([
+            length,
+            dot_count[domain_rows],
+            row_entropy[domain_rows],
+            is_digit[domain_rows].sum(axis=1) / length,
+            unique_chars[domain_rows] / length,
+            _lexicon.count_rows(lowered) > 0,
+            _longest_runs(_IS_CONSONANT[lowered] & domain_valid),
+            np.minimum(length / 50.0, 1.0),
+            (_IS_SPECIAL[lowered] & domain_valid).sum(axis=1) / length,
+            (_IS_VOWEL[lowered] & domain_valid).sum(axis=1) / length
+        ])
+
+    for row in np.flatnonzero(scalar):
+        features[row] = extract_features(indicators[row])
+
+    return features
+
+
+def _parse_octets(chars):
+    """Parse dotted-quad byte rows into (M, 4) octets and a validity mask"""
+    m = len(chars)
+    rows = np.arange(m)
+    octets = np.zeros((m, 4), dtype=np.int64)
+    digits = np.zeros((m, 4), dtype=np.int64)
+    segment = np.zeros(m, dtype=np.int64)
+    for column in chars.T:
+        is_digit = _IS_DIGIT[column]
+        value = octets[rows, segment] * 10 + column.astype(np.int64) - ord('0')
+        octets[rows, segment] = np.where(is_digit, value, octets[rows, segment])
+        digits[rows, segment] += is_digit
+        segment = segment + (column == _DOT)
+    parsed = (digits > 0).all(axis=1) & (octets <= 255).all(axis=1)
+    return octets, parsed
+
+
+def _entropy_rows(chars, valid, lengths):
+    """Per-row Shannon entropy and distinct character count via one bincount"""
+    m = len(chars)
+    row_ids = np.broadcast_to(np.arange(m)[:, None], chars.shape)[valid]
+    counts = np.bincount(row_ids * 256 + chars[valid], minlength=m * 256).reshape(m, 256)
+    p = counts / lengths[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(counts > 0, p * np.log2(p), 0.0)
+    return -terms.sum(axis=1), (counts > 0).sum(axis=1)
+
+
+def _longest_runs(mask):
+    """Length of the longest run of True values in each row"""
+    if mask.shape[1] == 0:
+        return np.zeros(len(mask), dtype=np.int64)
+    running = np.cumsum(mask, axis=1)
+    last_reset = np.maximum.accumulate(np.where(mask, 0, running), axis=1)
+    return (running - last_reset).max(axis=1)
@@ -0,0 +1,118 @@
+import gzip
+import io
+import json
+from itertools import islice
+from features import is_ip
+from verdict_cache import normalize_indicator
+
+# Recognised feed formats by file suffix (after an optional .gz)
+JSONL_SUFFIXES = ('.jsonl', '.ndjson')
+TEXT_SUFFIXES = ('.txt', '.list', '.csv')
+
+GZIP_MAGIC = b'\x1f\x8b'
+
+
+def open_feed(path):
+    """Open a feed file as text, transparently decompressing gzip"""
+    with open(path, 'rb') as f:
+        magic = f.read(2)
+    if magic == GZIP_MAGIC:
+        return io.TextIOWrapper(gzip.open(path, 'rb'), encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def feed_format(path):
+    """Guess a feed's format ('jsonl' or 'text') from its file name"""
+    name = path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    if name.endswith(JSONL_SUFFIXES):
+        return 'jsonl'
+    if name.endswith(TEXT_SUFFIXES):
+        return 'text'
+    raise ValueError(f"Unknown feed format: {path}")
+
+
+def is_indicator(value):
+    """True for a string that is still non-empty once normalized for scoring"""
+    return isinstance(value, str) and bool(normalize_indicator(value))
+
+
+def iter_text_indicators(lines):
+    """Yield one indicator per non-blank line, skipping # comments"""
+    for line in lines:
+        line = line.split('#', 1)[0].split(',', 1)[0].strip()
+        if not line:
+            continue
+        if not is_indicator(line):
+            print(f"Skipping feed line without an indicator: {line!r}")
+            continue
+        yield line
+
+
+def iter_jsonl_events(lines):
+    """Yield check events from JSON Lines records
+
+    A record may be a bare string, or an object with an "ip", "domain"
+    or "indicator" key. Records whose value is not a non-empty string
+    are skipped.
+    """
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            print(f"Skipping malformed feed line: {str(e)}")
+            continue
+        if isinstance(record, dict):
+            key = next((key for key in ('ip', 'domain', 'indicator') if key in record), None)
+            if key is None:
+                continue
+            value = record[key]
+        else:
+            key, value = 'indicator', record
+        if not is_indicator(value):
+            print(f"Skipping feed record without a valid indicator: {line[:200]}")
+            continue
+        if key == 'ip':
+            yield {'type': 'ip_check', 'ip_address': value}
+        elif key == 'domain':
+            yield {'type': 'domain_check', 'domain': value}
+        else:
+            yield make_event(value)
+
+
+def make_event(indicator):
+    """Build an ip_check or domain_check event for a bare indicator"""
+    if not is_indicator(indicator):
+        raise ValueError(f"Not an indicator: {indicator!r}")
+    if is_ip(indicator):
+        return {'type': 'ip_check', 'ip_address': indicator}
+    return {'type': 'domain_check', 'domain': indicator}
+
+
+def iter_feed_events(path, format=None):
+    """Lazily yield check events from a JSONL or plain-text feed, gzipped or not
+
+    Only the current line is held in memory, so feeds of any size can be
+    streamed straight into ThreatMonitor.iter_process_events.
+    """
+    format = format or feed_format(path)
+    with open_feed(path) as f:
+        if format == 'jsonl':
+            yield from iter_jsonl_events(f)
+        else:
+            for indicator in iter_text_indicators(f):
+                yield make_event(indicator)
+
+
+def iter_chunks(iterable, size):
+    """Yield lists of up to size items from any iterable"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
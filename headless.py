@@ -0,0 +1,113 @@
+"""Headless threat detection daemon for servers without a display
+
+Runs the scoring pipeline in the foreground with no tkinter, system tray
+or popup dependencies; MEDIUM and HIGH alerts are printed instead and can
+also be written to a rotating JSONL log or sent to a local syslog.
+
+    python headless.py [--feed threat_intel.json] [--interval 60] [--once]
+                       [--alert-log alerts.jsonl] [--syslog 127.0.0.1:514]
+"""
+import argparse
+import asyncio
+import signal
+from alert_sinks import BackgroundSink, JsonlFileSink, SyslogSink
+from features import load_lexicon
+from metrics import MetricsServer
+from monitor import ThreatMonitor
+from pipeline import ScoringPipeline, print_cycle
+from profiling import CycleProfiler, install_signal_handlers
+from threat_feeds import DEFAULT_FEED_PATH, ThreatFeedLoader
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Headless AI-powered threat detection daemon")
+    parser.add_argument('--feed', default=DEFAULT_FEED_PATH, help='threat intel JSON feed to poll')
+    parser.add_argument('--interval', type=float, default=60, help='seconds between feed checks')
+    parser.add_argument('--model', default=None, help='model checkpoint (or .npz export for --engine numpy)')
+    parser.add_argument('--reload-interval', type=float, default=None,
+                        help='hot-reload the --model checkpoint when it changes, polling every N seconds')
+    parser.add_argument('--workers', type=int, default=1, help='scoring worker processes')
+    parser.add_argument('--engine', choices=('torch', 'numpy'), default='torch',
+                        help='inference engine; numpy runs without torch and needs .npz weights')
+    parser.add_argument('--inference', choices=('float', 'int8', 'traced'), default='float',
+                        help='torch engine only: int8 dynamic quantization or a fused traced graph')
+    parser.add_argument('--lexicon', default=None,
+                        help='suspicious-term lexicon file, one term per line (must match the model)')
+    parser.add_argument('--blocklist', action='append', default=[],
+                        help='Bloom filter built with bloom_filter.py; matches get at least its hit score')
+    parser.add_argument('--verdict-db', default=None,
+                        help='SQLite verdict store; verdicts from the current model are not rescored after a restart')
+    parser.add_argument('--once', action='store_true', help='run a single check cycle and exit')
+    parser.add_argument('--alert-log', default=None, help='append every alert to this JSONL file')
+    parser.add_argument('--alert-log-max-mb', type=float, default=50,
+                        help='rotate the alert log once it reaches this size')
+    parser.add_argument('--syslog', default=None,
+                        help='send MEDIUM/HIGH alerts to syslog at HOST:PORT or a unix socket path')
+    parser.add_argument('--metrics-port', type=int, default=None,
+                        help='serve Prometheus metrics on 127.0.0.1:PORT/metrics')
+    parser.add_argument('--profile-dir', default='profiles',
+                        help='where SIGUSR1 (cProfile) and SIGUSR2 (tracemalloc) captures are written')
+    parser.add_argument('--profile-cycles', type=int, default=1, help='cycles profiled per SIGUSR1')
+    return parser
+
+
+def build_sinks(args):
+    """Alert sinks requested on the command line, each on its own background thread"""
+    sinks = []
+    if args.alert_log:
+        sinks.append(JsonlFileSink(args.alert_log, max_bytes=int(args.alert_log_max_mb * 1024 * 1024)))
+    if args.syslog:
+        host, sep, port = args.syslog.rpartition(':')
+        address = (host, int(port)) if sep and port.isdigit() else args.syslog
+        sinks.append(SyslogSink(address))
+    return [BackgroundSink(sink) for sink in sinks]
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    print("\n=== AI-Powered Threat Detection System (headless) ===")
+    if args.lexicon:
+        print(f"Loaded {len(load_lexicon(args.lexicon))} lexicon terms")
+    monitor = ThreatMonitor(model_path=args.model, workers=args.workers, headless=True,
+                            sinks=build_sinks(args), engine=args.engine,
+                            inference=args.inference, reload_interval=args.reload_interval,
+                            blocklists=args.blocklist, verdict_store=args.verdict_db)
+    print("Monitor initialized successfully")
+    pipeline = ScoringPipeline(monitor, ThreatFeedLoader(args.feed), interval=args.interval,
+                               on_alert=None, max_cycles=1 if args.once else None,
+                               profiler=CycleProfiler(args.profile_dir, args.profile_cycles))
+
+    def report_cycle(cycle, stats):
+        print_cycle(cycle, stats)
+        monitor.alert_system.process_alerts()  # Print any digests that are due
+    pipeline.on_cycle = report_cycle
+    metrics_server = None
+    if args.metrics_port is not None:
+        metrics_server = MetricsServer(port=args.metrics_port).start()
+        print(f"Serving metrics on http://127.0.0.1:{metrics_server.port}/metrics")
+    try:
+        asyncio.run(run(pipeline))
+    finally:
+        if metrics_server is not None:
+            metrics_server.stop()
+        monitor.close()
+
+
+async def run(pipeline):
+    """Run the pipeline until it finishes, stopping gracefully on SIGINT/SIGTERM"""
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, pipeline.stop)
+        except (NotImplementedError, RuntimeError):
+            pass  # Not supported on Windows event loops
+    try:
+        if install_signal_handlers(pipeline.profiler, loop):
+            print("Send SIGUSR1 to profile the next cycle, SIGUSR2 for a memory snapshot")
+    except (NotImplementedError, RuntimeError):
+        pass
+    await pipeline.run()
+
+
+if __name__ == '__main__':
+    main()
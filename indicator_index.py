@@ -0,0 +1,238 @@
+import ipaddress
+import json
+import math
+import socket
+from array import array
+from feed_stream import open_feed
+from verdict_cache import normalize_indicator
+
+# Score given to known-bad entries listed without one
+DEFAULT_KNOWN_SCORE = 0.9
+
+_NO_VALUE = float('nan')
+
+
+class CidrTrie:
+    """Path-compressed binary radix trie for longest-prefix CIDR matching
+
+    Nodes live in parallel flat arrays (child indices, prefix lengths,
+    network keys and scores) instead of Python objects, so millions of
+    prefixes cost a few dozen bytes each. A lookup visits at most one
+    node per bit of the matched prefix.
+    """
+
+    def __init__(self, bits):
+        self.bits = bits
+        self._left = array('i', [0])
+        self._right = array('i', [0])
+        self._length = array('B', [0])
+        # Keys wider than 64 bits (IPv6) are split into high and low words
+        self._wide = bits > 64
+        self._key_hi = array('Q', [0])
+        self._key_lo = array('Q', [0])
+        self._score = array('d', [_NO_VALUE])
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def insert(self, network, prefix_length, score):
+        """Add network/prefix_length (network as an int) with a threat score"""
+        network = self._mask(network, prefix_length)
+        node = 0
+        while True:
+            if self._length[node] == prefix_length:
+                self._set_score(node, score)
+                return
+            children = self._right if self._bit(network, self._length[node]) else self._left
+            child = children[node]
+            if child == 0:
+                children[node] = self._new_node(network, prefix_length, score)
+                return
+
+            child_key = self._key(child)
+            child_length = self._length[child]
+            common = min(prefix_length, child_length, self._common_prefix(network, child_key))
+            if common == child_length:
+                node = child
+                continue
+
+            if common == prefix_length:
+                # The new prefix sits between node and child
+                middle = self._new_node(network, prefix_length, score)
+            else:
+                # Split: a valueless branch node covering both prefixes
+                middle = self._new_node(self._mask(network, common), common, _NO_VALUE)
+                leaf = self._new_node(network, prefix_length, score)
+                if self._bit(network, common):
+                    self._right[middle] = leaf
+                else:
+                    self._left[middle] = leaf
+            if self._bit(child_key, self._length[middle]):
+                self._right[middle] = child
+            else:
+                self._left[middle] = child
+            children[node] = middle
+            return
+
+    def lookup(self, address):
+        """Return the score of the longest prefix containing address, or None"""
+        bits = self.bits
+        left, right, lengths, scores = self._left, self._right, self._length, self._score
+        key = self._key if self._wide else self._key_lo.__getitem__
+        best = scores[0]
+        node = 0
+        length = lengths[0]
+        while length < bits:
+            node = right[node] if (address >> (bits - 1 - length)) & 1 else left[node]
+            if node == 0:
+                break
+            length = lengths[node]
+            # Children always have a non-zero prefix length
+            if (address ^ key(node)) >> (bits - length):
+                break
+            score = scores[node]
+            if score == score:  # Not NaN
+                best = score
+        return None if best != best else best
+
+    def _new_node(self, network, prefix_length, score):
+        self._left.append(0)
+        self._right.append(0)
+        self._length.append(prefix_length)
+        if self._wide:
+            self._key_hi.append(network >> 64)
+        self._key_lo.append(network & 0xFFFFFFFFFFFFFFFF)
+        self._score.append(_NO_VALUE)
+        node = len(self._length) - 1
+        self._set_score(node, score)
+        return node
+
+    def _set_score(self, node, score):
+        if math.isnan(score):
+            return
+        if math.isnan(self._score[node]):
+            self._count += 1
+        self._score[node] = score
+
+    def _key(self, node):
+        if self._wide:
+            return (self._key_hi[node] << 64) | self._key_lo[node]
+        return self._key_lo[node]
+
+    def _bit(self, value, position):
+        return (value >> (self.bits - 1 - position)) & 1
+
+    def _mask(self, value, prefix_length):
+        shift = self.bits - prefix_length
+        return (value >> shift) << shift
+
+    def _common_prefix(self, a, b):
+        return self.bits - (a ^ b).bit_length()
+
+
+class DomainSuffixTrie:
+    """Trie over reversed domain labels so entries also match subdomains
+
+    Edges are stored in a single dict keyed by (parent node, label) and
+    scores in a flat array, avoiding a Python object per node.
+    """
+
+    def __init__(self):
+        self._edges = {}
+        self._score = array('d', [_NO_VALUE])
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def insert(self, domain, score):
+        """Add a domain; it will match itself and every subdomain"""
+        node = 0
+        for label in reversed(normalize_indicator(domain).split('.')):
+            child = self._edges.get((node, label))
+            if child is None:
+                self._score.append(_NO_VALUE)
+                child = len(self._score) - 1
+                self._edges[(node, label)] = child
+            node = child
+        if math.isnan(self._score[node]):
+            self._count += 1
+        self._score[node] = score
+
+    def lookup(self, domain):
+        """Return the score of the most specific matching suffix, or None"""
+        best = None
+        node = 0
+        edges = self._edges
+        for label in reversed(domain.split('.')):
+            node = edges.get((node, label))
+            if node is None:
+                break
+            score = self._score[node]
+            if score == score:  # Not NaN
+                best = score
+        return best
+
+
+class IndicatorIndex:
+    """Known-bad IPs, CIDR blocks and domains with their threat scores"""
+
+    def __init__(self):
+        self.ipv4 = CidrTrie(32)
+        self.ipv6 = CidrTrie(128)
+        self.domains = DomainSuffixTrie()
+
+    def __len__(self):
+        return len(self.ipv4) + len(self.ipv6) + len(self.domains)
+
+    def add(self, indicator, score=DEFAULT_KNOWN_SCORE):
+        """Add an IP, CIDR block or domain"""
+        indicator = normalize_indicator(indicator)
+        try:
+            network = ipaddress.ip_network(indicator, strict=False)
+        except ValueError:
+            self.domains.insert(indicator, score)
+            return
+        trie = self.ipv4 if network.version == 4 else self.ipv6
+        trie.insert(int(network.network_address), network.prefixlen, score)
+
+    def update(self, indicators, score=DEFAULT_KNOWN_SCORE):
+        """Add a {indicator: score} mapping or an iterable of indicators"""
+        if isinstance(indicators, dict):
+            for indicator, indicator_score in indicators.items():
+                self.add(indicator, indicator_score)
+        else:
+            for indicator in indicators:
+                self.add(indicator, score)
+
+    def lookup(self, indicator):
+        """Return the stored score for an IP or domain, or None if unknown"""
+        try:
+            packed = socket.inet_pton(socket.AF_INET, indicator)
+            return self.ipv4.lookup(int.from_bytes(packed, 'big'))
+        except OSError:
+            pass
+        if ':' in indicator:
+            try:
+                packed = socket.inet_pton(socket.AF_INET6, indicator)
+                return self.ipv6.lookup(int.from_bytes(packed, 'big'))
+            except OSError:
+                pass
+        return self.domains.lookup(normalize_indicator(indicator))
+
+    def load_threat_intel(self, path):
+        """Add the known_malicious_ips/known_malicious_domains sections of a threat intel JSON file"""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        self.update(data.get('known_malicious_ips', {}))
+        self.update(data.get('known_malicious_domains', {}))
+
+    def load_text(self, path, score=DEFAULT_KNOWN_SCORE):
+        """Add entries from a text file (optionally gzipped) of 'indicator [score]' lines"""
+        with open_feed(path) as f:
+            for line in f:
+                fields = line.split('#', 1)[0].split()
+                if not fields:
+                    continue
+                self.add(fields[0], float(fields[1]) if len(fields) > 1 else score)
@@ -1,77 +1,29 @@
 from monitor import ThreatMonitor
-from datetime import datetime
-import json
-import os
-import tkinter as tk
-import threading
-import time
-from system_tray import SystemTray
+from alert_sinks import BackgroundSink, ConsoleSink
+from pipeline import ScoringPipeline
+from profiling import CycleProfiler, install_signal_handlers
+from threat_feeds import ThreatFeedLoader
+from verdict_store import DEFAULT_PATH as VERDICT_DB
+import sys
+
+feed_loader = ThreatFeedLoader()
 
 def load_threat_feeds():
     """Load threat feeds from various sources"""
-    try:
-        # Load from local threat intel file
-        if os.path.exists('threat_intel.json'):
-            with open('threat_intel.json', 'r') as f:
-                data = json.load(f)
-                return data.get('malicious_ips', []), data.get('malicious_domains', [])
-    except Exception as e:
-        print(f"Error loading threat feeds: {str(e)}")
-    
-    # Return default data if loading fails
-    return [
-        "45.227.253.214",
-        "192.168.1.100",
-        "31.192.45.78"
-    ], [
-        "malware-site.com",
-        "phishing-attempt.net",
-        "suspicious-domain.org"
-    ]
-
-def check_threats_periodically(monitor, root):
-    """Run threat checks in a separate thread"""
-    check_count = 0
-    while True:
-        try:
-            check_count += 1
-            print(f"\n=== Threat Check #{check_count} ===")
-            print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            
-            # Get IPs and domains to check
-            suspicious_ips, suspicious_domains = load_threat_feeds()
-            
-            # Check IP addresses
-            print(f"\nChecking {len(suspicious_ips)} IP addresses...")
-            for ip in suspicious_ips:
-                event = {
-                    'type': 'ip_check',
-                    'timestamp': datetime.now(),
-                    'ip_address': ip
-                }
-                alert = monitor.process_event(event)
-                print(f"IP: {ip} - {alert['severity']} ({alert['threat_score']:.3f})")
-            
-            # Check domains
-            print(f"\nChecking {len(suspicious_domains)} domains...")
-            for domain in suspicious_domains:
-                event = {
-                    'type': 'domain_check',
-                    'timestamp': datetime.now(),
-                    'domain': domain
-                }
-                alert = monitor.process_event(event)
-                print(f"Domain: {domain} - {alert['severity']} ({alert['threat_score']:.3f})")
-            
-            print("\nWaiting 60 seconds until next check...")
-            time.sleep(60)  # Check every minute
-            
-        except Exception as e:
-            print(f"Error during threat check: {str(e)}")
-            time.sleep(5)
+    update = feed_loader.load()
+    return update.ips, update.domains
 
 def main():
+    if '--headless' in sys.argv[1:]:
+        # Servers without a display: never import tkinter, pystray or PIL
+        import headless
+        headless.main([arg for arg in sys.argv[1:] if arg != '--headless'])
+        return
+
     try:
+        import tkinter as tk
+        from system_tray import SystemTray
+
         print("\n=== AI-Powered Threat Detection System ===")
         print("Initializing...")
         
@@ -80,25 +32,27 @@ def main():
         root.withdraw()
         
         # Initialize the monitor
-        monitor = ThreatMonitor()
+        # Console lines are written off the scoring path; verdicts persist across restarts
+        monitor = ThreatMonitor(sinks=[BackgroundSink(ConsoleSink())], verdict_store=VERDICT_DB)
         print("Monitor initialized successfully")
         
+        # Profiling on demand from the tray menu or SIGUSR1/SIGUSR2
+        profiler = CycleProfiler()
+        install_signal_handlers(profiler)
+
         # Create system tray icon
-        tray = SystemTray(root)
+        tray = SystemTray(root, profiler)
         print("System tray icon created")
         
         # Start alert processing
         monitor.alert_system.process_alerts()
         print("Alert system initialized")
         
-        # Start threat checking in a separate thread
-        thread = threading.Thread(
-            target=check_threats_periodically,
-            args=(monitor, root),
-            daemon=True
-        )
-        thread.start()
-        print("Threat checking thread started")
+        # Start the scoring pipeline on its own event loop thread
+        pipeline = ScoringPipeline(monitor, ThreatFeedLoader(), interval=60, on_alert=None,
+                                   profiler=profiler)
+        pipeline.start()
+        print("Threat checking pipeline started")
         
         print("\nSystem is now running!")
         print("- Checking threats every 60 seconds")
@@ -108,6 +62,8 @@ def main():
         
         # Run the system tray icon
         root.mainloop()
+        pipeline.stop(timeout=5)
+        monitor.close()
         
     except Exception as e:
         print(f"\nFatal Error: {str(e)}")
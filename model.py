@@ -1,8 +1,16 @@
+import copy
+import hashlib
+import warnings
 import torch
 import torch.nn as nn
 import torch.optim as optim
 import numpy as np
-from sklearn.preprocessing import StandardScaler
+import features
+from numpy_model import export_npz
+
+# float: the network as is; int8: dynamically quantized Linear layers;
+# traced: a frozen TorchScript graph with fused ops
+INFERENCE_MODES = ('float', 'int8', 'traced')
 
 class ThreatDetectionModel(nn.Module):
     def __init__(self, input_size=10):
@@ -22,97 +30,151 @@ class ThreatDetectionModel(nn.Module):
             nn.Sigmoid()
         )
         
-        self.scaler = StandardScaler()
+        self._scaler = None
+        self.input_size = input_size
+        self.inference_mode = 'float'
+        self.feature_mean = None
+        self.feature_scale = None
+        self.__dict__['_inference_network'] = None
+        self.register_load_state_dict_post_hook(ThreatDetectionModel._rebuild_inference_network)
         
+    @property
+    def scaler(self):
+        """Feature scaler, created on first use so sklearn stays out of startup"""
+        if self._scaler is None:
+            from sklearn.preprocessing import StandardScaler
+            self._scaler = StandardScaler()
+        return self._scaler
+
+    @scaler.setter
+    def scaler(self, scaler):
+        self._scaler = scaler
+
     def forward(self, x):
         return self.network(x)
+
+    def fingerprint(self):
+        """Short hash of the current weights (plus inference mode), used as the model version"""
+        digest = hashlib.sha1()
+        for name, tensor in self.state_dict().items():
+            digest.update(name.encode())
+            digest.update(tensor.detach().cpu().numpy().tobytes())
+        if self.feature_mean is not None:
+            digest.update(b'scaler')
+            digest.update(self.feature_mean.numpy().tobytes())
+            digest.update(self.feature_scale.numpy().tobytes())
+        if self.inference_mode != 'float':
+            return f"{digest.hexdigest()[:12]}-{self.inference_mode}"
+        return digest.hexdigest()[:12]
+
+    def set_feature_scaling(self, mean, scale):
+        """Standardize features with a fitted scaler's mean_/scale_ before prediction (None to disable)"""
+        if mean is None:
+            self.feature_mean = self.feature_scale = None
+            return
+        self.feature_mean = torch.as_tensor(mean, dtype=torch.float32).clone()
+        self.feature_scale = torch.as_tensor(scale, dtype=torch.float32).clone()
+
+    def feature_scaling(self):
+        """(mean, scale) as float32 NumPy arrays, or None"""
+        if self.feature_mean is None:
+            return None
+        return self.feature_mean.numpy(), self.feature_scale.numpy()
+
+    def set_inference_mode(self, mode):
+        """Score with the float network, int8-quantized Linear layers or a fused traced graph
+
+        Only the predict_* methods use the optimized copy; forward() and
+        training keep the float network. The copy is rebuilt whenever new
+        weights are loaded.
+        """
+        if mode not in INFERENCE_MODES:
+            raise ValueError(f"inference mode must be one of {INFERENCE_MODES}")
+        self.inference_mode = mode
+        self._rebuild_inference_network()
+
+    def _rebuild_inference_network(self, incompatible_keys=None):
+        network = None
+        if self.inference_mode != 'float':
+            network = copy.deepcopy(self.network).eval()
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')  # Both APIs warn about future deprecation
+                if self.inference_mode == 'int8':
+                    network = torch.ao.quantization.quantize_dynamic(
+                        network, {nn.Linear}, dtype=torch.qint8
+                    )
+                else:
+                    traced = torch.jit.trace(network, torch.zeros(1, self.input_size))
+                    network = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+        # Kept out of _modules so it never shows up in state_dict()
+        self.__dict__['_inference_network'] = network
+
+    def _score(self, x):
+        if self.feature_mean is not None:
+            x = (x - self.feature_mean) / self.feature_scale
+        network = self._inference_network
+        return self(x) if network is None else network(x)
+
+    def export_numpy(self, path):
+        """Save the weights to .npz for the torch-free NumpyThreatModel"""
+        export_npz(self.state_dict(), path, self.feature_scaling())
     
     def extract_features(self, ip_or_domain):
         """Extract AI features from IP or domain"""
-        features = []
-        
-        if self._is_ip(ip_or_domain):
-            # IP-based features
-            octets = [int(x) for x in ip_or_domain.split('.')]
-            features.extend([
-                np.mean(octets),                    # Mean of octets
-                np.std(octets),                     # Standard deviation
-                max(octets),                        # Maximum value
-                min(octets),                        # Minimum value
-                len(set(octets)),                   # Unique octets
-                self._entropy(ip_or_domain),        # String entropy
-                1 if ip_or_domain.startswith('192.168') else 0,  # Internal IP
-                1 if ip_or_domain.startswith('10.') else 0,      # Internal IP
-                octets[0] / 255.0,                 # First octet normalized
-                sum(octets) / 1020.0               # Sum of octets normalized
-            ])
-        else:
-            # Domain-based features
-            features.extend([
-                len(ip_or_domain),                 # Length
-                ip_or_domain.count('.'),           # Number of dots
-                self._entropy(ip_or_domain),       # String entropy
-                sum(c.isdigit() for c in ip_or_domain) / len(ip_or_domain),  # Digit ratio
-                len(set(ip_or_domain)) / len(ip_or_domain),                  # Unique char ratio
-                self._contains_suspicious_words(ip_or_domain),               # Suspicious words
-                self._longest_consonant_sequence(ip_or_domain),             # Consonant sequence
-                self._domain_length_score(ip_or_domain),                    # Length score
-                self._special_char_ratio(ip_or_domain),                     # Special chars
-                self._vowel_consonant_ratio(ip_or_domain)                   # Vowel ratio
-            ])
-            
-        return torch.FloatTensor(features)
+        return torch.FloatTensor(features.extract_features(ip_or_domain))
+
+    def extract_features_batch(self, indicators):
+        """Extract features for many IPs/domains as one (N, 10) matrix"""
+        return torch.from_numpy(features.extract_features_batch(indicators))
     
     def _is_ip(self, string):
         """Check if string is an IP address"""
-        parts = string.split('.')
-        if len(parts) != 4:
-            return False
-        try:
-            return all(0 <= int(part) <= 255 for part in parts)
-        except ValueError:
-            return False
+        return features.is_ip(string)
     
     def _entropy(self, string):
         """Calculate Shannon entropy of string"""
-        prob = [string.count(c) / len(string) for c in set(string)]
-        return -sum(p * np.log2(p) for p in prob)
+        return features.entropy(string)
     
     def _contains_suspicious_words(self, domain):
         """Check for suspicious words in domain"""
-        suspicious = ['free', 'win', 'prize', 'crypto', 'bank', 'secure', 'login']
-        return any(word in domain.lower() for word in suspicious)
+        return features.contains_suspicious_words(domain)
     
     def _longest_consonant_sequence(self, string):
         """Get length of longest consonant sequence"""
-        consonants = 'bcdfghjklmnpqrstvwxyz'
-        current = max_len = 0
-        for c in string.lower():
-            if c in consonants:
-                current += 1
-                max_len = max(max_len, current)
-            else:
-                current = 0
-        return max_len
+        return features.longest_consonant_sequence(string)
     
     def _domain_length_score(self, domain):
         """Score domain length (longer domains more suspicious)"""
-        return min(len(domain) / 50.0, 1.0)
+        return features.domain_length_score(domain)
     
     def _special_char_ratio(self, string):
         """Calculate ratio of special characters"""
-        special = '-_'
-        return sum(c in special for c in string) / len(string)
+        return features.special_char_ratio(string)
     
     def _vowel_consonant_ratio(self, string):
         """Calculate vowel to consonant ratio"""
-        vowels = 'aeiou'
-        v_count = sum(c in vowels for c in string.lower())
-        return v_count / len(string) if len(string) > 0 else 0
+        return features.vowel_consonant_ratio(string)
 
     def predict_threat(self, ip_or_domain):
         """Predict threat level for IP or domain"""
         features = self.extract_features(ip_or_domain)
         with torch.no_grad():
-            prediction = self(features)
-            return prediction.item() 
\ No newline at end of file
+            prediction = self._score(features.unsqueeze(0))
+            return prediction.item()
+
+    def predict_threat_batch(self, indicators, batch_size=4096):
+        """Predict threat levels for many IPs/domains, one forward pass per chunk"""
+        indicators = list(indicators)
+        scores = []
+        for start in range(0, len(indicators), batch_size):
+            features = self.extract_features_batch(indicators[start:start + batch_size])
+            scores.extend(self.predict_features(features, batch_size=batch_size))
+        return scores
+
+    def predict_features(self, features, batch_size=4096):
+        """Score a precomputed (N, 10) feature matrix in chunks"""
+        scores = []
+        with torch.inference_mode():
+            for start in range(0, len(features), batch_size):
+                scores.extend(self._score(features[start:start + batch_size]).view(-1).tolist())
+        return scores 
\ No newline at end of file
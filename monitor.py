@@ -1,17 +1,91 @@
 from data_collector import DataCollector
-from model import ThreatDetectionModel
-from alert_system import AlertSystem
+from behavior_stats import BehaviorStats
+from alert_system import AlertSystem, HeadlessAlertSystem
+from alert_sinks import PopupSink
+from verdict_cache import VerdictCache, normalize_indicator
 import numpy as np
-import torch
+from feed_stream import iter_chunks, iter_feed_events
+from indicator_index import IndicatorIndex
+from bloom_filter import BloomFilter
+from features import lexicon
+from verdict_store import VerdictStore
+from checkpoint import DEFAULT_THRESHOLDS, CheckpointWatcher, load_checkpoint
+from metrics import ALERTS, ERRORS, EVENTS, QUEUE_DEPTH, STAGE_SECONDS
+import os
+import threading
+import time
+
+# Threat score cut-offs for HIGH and MEDIUM alerts
+HIGH_THRESHOLD = DEFAULT_THRESHOLDS['HIGH']
+MEDIUM_THRESHOLD = DEFAULT_THRESHOLDS['MEDIUM']
+
+# Metric children resolved once, off the scoring path
+_EXTRACT_SECONDS = STAGE_SECONDS.labels('feature_extraction')
+_INFER_SECONDS = STAGE_SECONDS.labels('inference')
+_ALERT_SECONDS = STAGE_SECONDS.labels('alert_generation')
+_DISPLAY_SECONDS = STAGE_SECONDS.labels('alert_display')
+_SEVERITY_ALERTS = {severity: ALERTS.labels(severity) for severity in ('HIGH', 'MEDIUM', 'LOW')}
+
+class ActiveModel:
+    """The scoring model with its version and alert thresholds, swapped in as one unit"""
+
+    def __init__(self, model, version, thresholds):
+        self.model = model
+        self.version = version
+        self.thresholds = thresholds
+
+class ScoringBatch:
+    """One chunk of events moving through feature extraction, inference and alerting"""
+
+    def __init__(self, events, indicators, scores, missing, active):
+        self.events = events
+        self.indicators = indicators
+        self.scores = scores      # None wherever the model still has to run
+        self.missing = missing    # Unique indicators that need inference
+        self.active = active      # Model the whole batch is scored with
+        self.version = active.version
+        self.features = None
+        self.listed = {}          # Event position -> blocklist filter that probably lists it
 
 class ThreatMonitor:
-    def __init__(self, model_path=None):
-        self.collector = DataCollector()
-        self.model = ThreatDetectionModel()
-        self.alert_system = AlertSystem()
-        if model_path and torch.cuda.is_available():
-            self.model.load_state_dict(torch.load(model_path))
-        self.model.eval()
+    def __init__(self, model_path=None, batch_size=4096, cache_size=100000, cache_ttl=3600,
+                 threat_intel_path='threat_intel.json', workers=1, headless=False, sinks=None,
+                 engine='torch', inference='float', reload_interval=None, blocklists=None,
+                 verdict_store=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self._parallel_scorer = None
+        self._parallel_version = None
+        self._scorer_lock = threading.Lock()
+        self._watcher = None
+        self.engine = engine
+        self.inference = inference
+        self.model_path = model_path
+        # Per-source traffic windows; scans and floods raise an IP's verdict
+        self.behavior = BehaviorStats()
+        self.collector = DataCollector(behavior=self.behavior)
+        self.alert_system = HeadlessAlertSystem() if headless else AlertSystem()
+
+        # Every alert goes to each sink; popups are just the default sink
+        self.sinks = [PopupSink(self.alert_system)]
+        self.sinks.extend(sinks or [])
+
+        # Queue depths are only sampled when the metrics endpoint is scraped
+        QUEUE_DEPTH.labels('alerts').set_function(self.alert_system.alert_queue.qsize)
+        for sink in self.sinks:
+            if hasattr(sink, 'queue_depth'):
+                name = type(getattr(sink, 'sink', sink)).__name__
+                QUEUE_DEPTH.labels(f'sink_{name}').set_function(sink.queue_depth)
+
+        # Verdicts are cached per model version; reloading weights invalidates them
+        self.verdict_cache = VerdictCache(max_size=cache_size, ttl=cache_ttl)
+        if model_path:
+            checkpoint = load_checkpoint(model_path)
+            self._activate(checkpoint.build_model(engine, inference), checkpoint.thresholds)
+        else:
+            self._activate(self._build_model(engine, inference), DEFAULT_THRESHOLDS)
+        if model_path and reload_interval:
+            self.watch_model(reload_interval)
 
         # Known malicious IPs and their threat scores
         self.known_malicious_ips = {
@@ -30,30 +104,325 @@ class ThreatMonitor:
             "botnet-cc.net": 0.90,
         }
 
+        # Known-bad IPs, CIDR blocks and domains short-circuit the model
+        self.indicator_index = IndicatorIndex()
+        self.indicator_index.update(self.known_malicious_ips)
+        self.indicator_index.update(self.known_malicious_domains)
+        if threat_intel_path and os.path.exists(threat_intel_path):
+            try:
+                self.indicator_index.load_threat_intel(threat_intel_path)
+            except Exception as e:
+                print(f"Error loading known indicators: {str(e)}")
+
+        # Memory-mapped filters over blocklists too large to index exactly
+        self.blocklists = []
+        for path in blocklists or ():
+            try:
+                self.blocklists.append(BloomFilter.open(path))
+            except Exception as e:
+                print(f"Error opening blocklist filter {path}: {str(e)}")
+
+        # Verdicts persist across restarts; those from the current model skip rescoring
+        self.verdict_store = VerdictStore(verdict_store) if isinstance(verdict_store, str) else verdict_store
+        if self.verdict_store is not None:
+            QUEUE_DEPTH.labels('verdict_store').set_function(self.verdict_store.queue_depth)
+            try:
+                self.warm_verdict_cache()
+            except Exception as e:
+                print(f"Error loading stored verdicts: {str(e)}")
+
+    @property
+    def model(self):
+        return self._active.model
+
+    @property
+    def model_version(self):
+        return self._active.version
+
+    @property
+    def thresholds(self):
+        return self._active.thresholds
+
+    def reload_model(self, path=None):
+        """Load a checkpoint into a new model and swap it in without pausing scoring
+
+        The model is built off to the side; batches already in flight
+        finish on the model they started with, new ones use the new one.
+        """
+        path = path or self.model_path
+        checkpoint = load_checkpoint(path)
+        self._activate(checkpoint.build_model(self.engine, self.inference), checkpoint.thresholds)
+        self.model_path = path
+        print(f"Loaded model {self.model_version} from {path}")
+        return self.model_version
+
+    def warm_verdict_cache(self):
+        """Seed the verdict cache with stored scores from the current model, most recently seen first"""
+        active = self._active
+        rows = self.verdict_store.current_scores(self._stored_version(active), self.verdict_cache.max_size)
+        self.verdict_cache.put_many(((indicator, active.version), score) for indicator, score in rows)
+        print(f"Loaded {len(rows)} stored verdicts for model {active.version}")
+        return len(rows)
+
+    def _stored_version(self, active):
+        """Model version as persisted: the lexicon also decides scores, and can change between runs"""
+        return f'{active.version}-{lexicon().digest[:8]}'
+
+    def watch_model(self, interval=2.0):
+        """Hot-reload model_path whenever the checkpoint file is replaced"""
+        if self._watcher is None:
+            self._watcher = CheckpointWatcher(self.model_path, self.reload_model, interval).start()
+        return self._watcher
+
     def process_event(self, event):
         """Process an event using AI model"""
-        if event['type'] == 'ip_check':
-            threat_score = self.model.predict_threat(event['ip_address'])
-        else:
-            threat_score = self.model.predict_threat(event['domain'])
+        active = self._active
+        indicator = self._event_indicator(event)
+        threat_score = self._score_indicator(indicator, active)
+        behavior = self._behavior_verdict(event)
+        if behavior is not None and behavior[0] > threat_score:
+            threat_score = behavior[0]
+        bloom = next((bloom for bloom in self.blocklists if indicator in bloom), None)
+        if bloom is not None and bloom.score > threat_score:
+            threat_score = bloom.score
 
-        alert = self._generate_alert(threat_score)
+        alert = self._generate_alert(threat_score, active.thresholds)
+        if behavior is not None:
+            alert['behavior'] = behavior[1]
+        if bloom is not None:
+            alert['blocklist'] = bloom.name
         
         # Add event details to alert
         alert.update(event)
+        EVENTS.inc()
+        _SEVERITY_ALERTS[alert['severity']].inc()
         
-        # Show popup for medium and high threats
-        if alert['severity'] in ['MEDIUM', 'HIGH']:
-            self.alert_system.show_alert(alert)
+        # Hand the alert to the sinks (popups for medium and high threats)
+        self._emit([alert])
             
         return alert
 
-    def _generate_alert(self, threat_score):
+    def process_events(self, events):
+        """Process many events with batched model inference, preserving order"""
+        return list(self.iter_process_events(events))
+
+    def iter_process_events(self, events):
+        """Lazily yield alerts for an iterable of events, scoring batch_size at a time"""
+        for chunk in iter_chunks(events, self.batch_size):
+            batch = self.infer_batch(self.prepare_batch(chunk))
+            yield from self.finish_batch(batch)
+
+    def prepare_batch(self, events):
+        """Resolve known and cached verdicts for a chunk of events and extract features for the rest"""
+        started = time.perf_counter()
+        indicators = [self._event_indicator(event) for event in events]
+        active = self._active
+        version = active.version
+        lookup = self.indicator_index.lookup
+        scores = [lookup(indicator) for indicator in indicators]
+        unknown = [i for i, score in enumerate(scores) if score is None]
+        cached = self.verdict_cache.get_many([(indicators[i], version) for i in unknown])
+        for i, score in zip(unknown, cached):
+            scores[i] = score
+        missing = list(dict.fromkeys(
+            indicator for indicator, score in zip(indicators, scores) if score is None
+        ))
+        batch = ScoringBatch(events, indicators, scores, missing, active)
+        if self.blocklists:
+            batch.listed = self._blocklist_hits(indicators)
+        # In parallel mode the workers extract features themselves
+        if missing and self.workers <= 1:
+            batch.features = active.model.extract_features_batch(missing)
+        EVENTS.inc(len(events))
+        _EXTRACT_SECONDS.observe(time.perf_counter() - started)
+        return batch
+
+    def infer_batch(self, batch):
+        """Run the model over a prepared batch's features and fill in its scores"""
+        if batch.missing:
+            started = time.perf_counter()
+            if self.workers > 1:
+                scores = self._score_parallel(batch.active, batch.missing)
+            else:
+                scores = batch.active.model.predict_features(batch.features, batch_size=self.batch_size)
+            fresh = dict(zip(batch.missing, scores))
+            # Only model verdicts persist; known-bad and cached scores are not the model's to store
+            if self.verdict_store is not None:
+                self.verdict_store.record(batch.missing, scores, self._stored_version(batch.active),
+                                          batch.active.thresholds)
+            self.verdict_cache.put_many(((indicator, batch.version), score) for indicator, score in fresh.items())
+            batch.scores = [fresh[indicator] if score is None else score
+                            for indicator, score in zip(batch.indicators, batch.scores)]
+            batch.features = None
+            _INFER_SECONDS.observe(time.perf_counter() - started)
+        return batch
+
+    def finish_batch(self, batch):
+        """Turn a scored batch into alerts and hand them to the alert sinks"""
+        alerts = self.build_alerts(batch)
+        self._emit(alerts)
+        return alerts
+
+    def build_alerts(self, batch):
+        """Alerts for a scored batch, without handing them to any sink"""
+        started = time.perf_counter()
+        alerts = []
+        severities = {'HIGH': 0, 'MEDIUM': 0, 'LOW': 0}
+        thresholds = batch.active.thresholds
+        listed = batch.listed
+        for position, (event, threat_score) in enumerate(zip(batch.events, batch.scores)):
+            behavior = self._behavior_verdict(event)
+            if behavior is not None and behavior[0] > threat_score:
+                threat_score = behavior[0]
+            bloom = listed.get(position) if listed else None
+            if bloom is not None and bloom.score > threat_score:
+                threat_score = bloom.score
+            alert = self._generate_alert(threat_score, thresholds)
+            if behavior is not None:
+                alert['behavior'] = behavior[1]
+            if bloom is not None:
+                alert['blocklist'] = bloom.name
+            alert.update(event)
+            alerts.append(alert)
+            severities[alert['severity']] += 1
+        for severity, count in severities.items():
+            if count:
+                _SEVERITY_ALERTS[severity].inc(count)
+        _ALERT_SECONDS.observe(time.perf_counter() - started)
+        return alerts
+
+    def process_feed(self, path, format=None):
+        """Stream a JSONL/text feed (optionally gzipped) through the scorer in constant memory"""
+        return self.iter_process_events(iter_feed_events(path, format))
+
+    def _event_indicator(self, event):
+        """Return the normalized IP or domain an event asks about"""
+        ip = self._event_ip(event)
+        if ip is not None:
+            return normalize_indicator(ip)
+        if 'domain' not in event:
+            raise ValueError(f"Unsupported event type: {event['type']!r}")
+        return normalize_indicator(event['domain'])
+
+    def _event_ip(self, event):
+        """The IP an event is about: the checked IP, or a network event's sender"""
+        if event['type'] == 'ip_check':
+            return event['ip_address']
+        if event['type'] == 'network':
+            return event['source_ip']
+        return None
+
+    def _blocklist_hits(self, indicators):
+        """{position: filter} for indicators a blocklist filter probably lists; the model still scores them"""
+        hits = {}
+        for bloom in self.blocklists:
+            for position in np.flatnonzero(bloom.contains_many(indicators)):
+                hits.setdefault(int(position), bloom)
+        return hits
+
+    def _behavior_verdict(self, event):
+        """(score, reason) if the event's IP has been scanning or flooding recently"""
+        if not len(self.behavior):
+            return None
+        ip = self._event_ip(event)
+        return None if ip is None else self.behavior.verdict(ip)
+
+    def _score_indicator(self, indicator, active):
+        """Score one indicator, serving repeats from the verdict cache"""
+        known_score = self.indicator_index.lookup(indicator)
+        if known_score is not None:
+            return known_score
+        key = (indicator, active.version)
+        threat_score = self.verdict_cache.get(key)
+        if threat_score is None:
+            # Only the model call counts as inference, as in infer_batch
+            started = time.perf_counter()
+            threat_score = active.model.predict_threat(indicator)
+            _INFER_SECONDS.observe(time.perf_counter() - started)
+            self.verdict_cache.put(key, threat_score)
+        return threat_score
+
+    def _build_model(self, engine, inference):
+        """An untrained model; the numpy engine runs without importing torch"""
+        if engine == 'numpy':
+            if inference != 'float':
+                raise ValueError("The numpy engine only supports float inference")
+            from numpy_model import NumpyThreatModel
+            return NumpyThreatModel()
+        if engine != 'torch':
+            raise ValueError(f"Unknown inference engine: {engine}")
+        from model import ThreatDetectionModel
+        model = ThreatDetectionModel()
+        model.eval()
+        model.set_inference_mode(inference)
+        return model
+
+    def _activate(self, model, thresholds):
+        """Make model current with a single reference swap"""
+        model.register_load_state_dict_post_hook(self._on_weights_loaded)
+        self._active = ActiveModel(model, model.fingerprint(), dict(thresholds))
+        self.verdict_cache.clear()
+
+    def _on_weights_loaded(self, module, incompatible_keys):
+        """Drop cached verdicts whenever new weights are loaded into the model"""
+        if module is self.model:
+            self._active = ActiveModel(module, module.fingerprint(), self._active.thresholds)
+            self.verdict_cache.clear()
+            self.close_workers()
+
+    def _score_parallel(self, active, indicators):
+        """Score on the process pool, restarting it when the batch's model differs from the workers'"""
+        with self._scorer_lock:
+            if self._parallel_scorer is not None and self._parallel_version != active.version:
+                self._parallel_scorer.close()
+                self._parallel_scorer = None
+            if self._parallel_scorer is None:
+                from parallel_scoring import ParallelScorer
+                self._parallel_scorer = ParallelScorer(
+                    active.model.state_dict(), workers=self.workers, chunk_size=self.batch_size,
+                    engine=self.engine, inference=self.inference,
+                    feature_scaling=active.model.feature_scaling()
+                )
+                self._parallel_version = active.version
+            return self._parallel_scorer.score(indicators).tolist()
+
+    def _emit(self, alerts):
+        started = time.perf_counter()
+        for sink in self.sinks:
+            try:
+                sink.emit_many(alerts)
+            except Exception as e:
+                ERRORS.labels('alert_display').inc()
+                print(f"Error in alert sink {type(sink).__name__}: {str(e)}")
+        _DISPLAY_SECONDS.observe(time.perf_counter() - started)
+
+    def close(self):
+        """Stop watching the checkpoint, flush and close the alert sinks and verdict store, stop any workers"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        for sink in self.sinks:
+            sink.close()
+        self.close_workers()
+        for bloom in self.blocklists:
+            bloom.close()
+        if self.verdict_store is not None:
+            self.verdict_store.close()
+
+    def close_workers(self):
+        """Shut down the parallel scoring workers, if any are running"""
+        with self._scorer_lock:
+            if self._parallel_scorer is not None:
+                self._parallel_scorer.close()
+                self._parallel_scorer = None
+
+    def _generate_alert(self, threat_score, thresholds=None):
         """Generate alert based on AI prediction"""
-        if threat_score >= 0.8:
+        thresholds = thresholds or self._active.thresholds
+        if threat_score >= thresholds['HIGH']:
             severity = "HIGH"
             action = "Block and investigate immediately"
-        elif threat_score >= 0.5:
+        elif threat_score >= thresholds['MEDIUM']:
             severity = "MEDIUM"
             action = "Monitor closely and investigate"
         else:
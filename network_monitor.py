@@ -1,9 +1,141 @@
+import socket
+import time
+from collections import namedtuple
+from data_collector import DataCollector
+from pcap_reader import LINKTYPE_ETHERNET, PROTOCOL_NAMES, PcapReader, parse_packet
+
+# One aggregated 5-tuple flow; timestamps are epoch nanoseconds
+Flow = namedtuple('Flow', ['first_seen', 'last_seen', 'source_ip', 'dest_ip', 'source_port',
+                           'dest_port', 'protocol', 'packets', 'bytes'])
+
+
+def format_ip(version, address):
+    """Dotted/colon text for an integer address from parse_packet"""
+    if version == 4:
+        return socket.inet_ntop(socket.AF_INET, address.to_bytes(4, 'big'))
+    return socket.inet_ntop(socket.AF_INET6, address.to_bytes(16, 'big'))
+
+
+class FlowTable:
+    """Aggregates packets into directional 5-tuple flows
+
+    A flow is exported once no packet has been seen for idle_timeout
+    seconds of capture time, or when flush() is called.
+    """
+
+    def __init__(self, idle_timeout=60):
+        self.idle_timeout_ns = int(idle_timeout * 1e9)
+        self.flows = {}  # key -> [first_seen, last_seen, packets, bytes]
+        self._ip_text = {}
+
+    def __len__(self):
+        return len(self.flows)
+
+    def add(self, key, timestamp, length):
+        flow = self.flows.get(key)
+        if flow is None:
+            self.flows[key] = [timestamp, timestamp, 1, length]
+        else:
+            flow[1] = timestamp
+            flow[2] += 1
+            flow[3] += length
+
+    def expire(self, now):
+        """Remove and return flows idle since before now - idle_timeout"""
+        cutoff = now - self.idle_timeout_ns
+        idle = [key for key, flow in self.flows.items() if flow[1] < cutoff]
+        return [self._export(key, self.flows.pop(key)) for key in idle]
+
+    def flush(self):
+        """Remove and return every flow"""
+        flows = [self._export(key, flow) for key, flow in self.flows.items()]
+        self.flows = {}
+        return flows
+
+    def _export(self, key, flow):
+        version, src, dst, protocol, sport, dport = key
+        return Flow(flow[0], flow[1], self._text(version, src), self._text(version, dst),
+                    sport, dport, PROTOCOL_NAMES.get(protocol, str(protocol)), flow[2], flow[3])
+
+    def _text(self, version, address):
+        text = self._ip_text.get((version, address))
+        if text is None:
+            if len(self._ip_text) > 1000000:
+                self._ip_text.clear()
+            text = self._ip_text[(version, address)] = format_ip(version, address)
+        return text
+
+
 class NetworkMonitor:
-    def __init__(self):
-        self.packet_capture = pcap.pcap()
-        
-    def start_monitoring(self):
+    """Turns packets into flows and feeds them to a DataCollector in batches
+
+    replay() reads recorded pcap/pcapng files; start_monitoring() captures
+    live traffic when the optional pypcap package is installed.
+    """
+
+    def __init__(self, collector=None, idle_timeout=60, expire_every=65536):
+        self.collector = collector or DataCollector()
+        self.flow_table = FlowTable(idle_timeout)
+        self.expire_every = expire_every
+        self.packets = 0
+        self.skipped = 0
+        self.flows_exported = 0
+
+    def replay(self, path):
+        """Process a capture file; returns packet, byte, flow and timing counts"""
+        started = time.perf_counter()
+        packets = skipped = total_bytes = 0
+        add = self.flow_table.add
+        expire_every = self.expire_every
+        with PcapReader(path) as reader:
+            buf = reader.buffer
+            for timestamp, offset, caplen, length, linktype in reader.iter_records():
+                key = parse_packet(buf, offset, caplen, linktype)
+                packets += 1
+                if key is None:
+                    skipped += 1
+                    continue
+                add(key, timestamp, length)
+                total_bytes += length
+                if packets % expire_every == 0:
+                    self._export(self.flow_table.expire(timestamp))
+        self._export(self.flow_table.flush())
+        self.packets += packets
+        self.skipped += skipped
+        return {
+            'packets': packets,
+            'skipped': skipped,
+            'bytes': total_bytes,
+            'flows': self.flows_exported,
+            'seconds': time.perf_counter() - started,
+        }
+
+    def start_monitoring(self, interface=None):
         """Monitor network traffic in real-time"""
-        for timestamp, packet in self.packet_capture:
-            # Process packet
-            pass 
\ No newline at end of file
+        try:
+            import pcap  # Optional: pypcap
+        except ImportError:
+            print("Live capture needs the pypcap package; use replay() for capture files")
+            return
+        capture = pcap.pcap(name=interface, promisc=True, immediate=True)
+        linktype = capture.datalink() if hasattr(capture, 'datalink') else LINKTYPE_ETHERNET
+        try:
+            for timestamp, packet in capture:
+                timestamp_ns = int(timestamp * 1e9)
+                key = parse_packet(packet, 0, len(packet), linktype)
+                self.packets += 1
+                if key is None:
+                    self.skipped += 1
+                    continue
+                self.flow_table.add(key, timestamp_ns, len(packet))
+                if self.packets % self.expire_every == 0:
+                    self._export(self.flow_table.expire(timestamp_ns))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._export(self.flow_table.flush())
+
+    def _export(self, flows):
+        if flows:
+            self.collector.collect_flows(flows)
+            self.flows_exported += len(flows)
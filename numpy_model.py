@@ -0,0 +1,196 @@
+"""Torch-free inference for the ThreatDetectionModel MLP
+
+The network is small enough (10 -> 64 -> 32 -> 16 -> 1) that plain NumPy
+matrix products score it as fast as torch without its import time or
+memory footprint. Weights are exported from a trained model to .npz:
+
+    python numpy_model.py model.pth model.npz
+"""
+import hashlib
+import re
+import sys
+import numpy as np
+import features
+
+# Layer sizes of ThreatDetectionModel.network, used for untrained weights
+LAYER_SIZES = (features.NUM_FEATURES, 64, 32, 16, 1)
+
+_LINEAR_KEY = re.compile(r'^network\.(\d+)\.(weight|bias)$')
+
+
+def _as_array(value):
+    """float32 NumPy copy of a tensor or array"""
+    if hasattr(value, 'detach'):
+        value = value.detach().cpu().numpy()
+    return np.ascontiguousarray(value, dtype=np.float32)
+
+
+def export_npz(state_dict, path, feature_scaling=None, thresholds=None):
+    """Save the Linear layers of a ThreatDetectionModel state dict to a .npz path or file object"""
+    arrays = {key: _as_array(value) for key, value in state_dict.items() if _LINEAR_KEY.match(key)}
+    arrays['feature_version'] = np.array(features.FEATURE_VERSION)
+    if feature_scaling is not None:
+        arrays['scaler_mean'] = _as_array(feature_scaling[0])
+        arrays['scaler_scale'] = _as_array(feature_scaling[1])
+    if thresholds is not None:
+        arrays['thresholds'] = np.array([thresholds['HIGH'], thresholds['MEDIUM']])
+    np.savez(path, **arrays)
+
+
+class NumpyThreatModel:
+    """Eval-mode ThreatDetectionModel in NumPy: Linear+ReLU layers, sigmoid output
+
+    Dropout is a no-op at inference, so only the Linear weights are kept.
+    It offers the subset of the torch model's interface ThreatMonitor
+    uses, and its fingerprint matches the torch model with the same
+    weights so cached verdicts stay valid across engines.
+    """
+
+    def __init__(self, state_dict=None, seed=None):
+        self._hooks = []
+        self.feature_mean = None
+        self.feature_scale = None
+        if state_dict is None:
+            state_dict = self._random_state(seed)
+        self._set_state(state_dict)
+
+    @classmethod
+    def load(cls, path):
+        """Load weights (and feature scaling, if present) written by export_npz"""
+        with np.load(path) as data:
+            arrays = {key: data[key] for key in data.files}
+        model = cls(arrays)
+        if 'scaler_mean' in arrays:
+            model.set_feature_scaling(arrays['scaler_mean'], arrays['scaler_scale'])
+        return model
+
+    def save(self, path):
+        export_npz(self.state_dict(), path, self.feature_scaling())
+
+    def set_feature_scaling(self, mean, scale):
+        """Standardize features with a fitted scaler's mean_/scale_ before prediction (None to disable)"""
+        if mean is None:
+            self.feature_mean = self.feature_scale = None
+            return
+        self.feature_mean = _as_array(mean).copy()
+        self.feature_scale = _as_array(scale).copy()
+
+    def feature_scaling(self):
+        """(mean, scale) as float32 arrays, or None"""
+        if self.feature_mean is None:
+            return None
+        return self.feature_mean, self.feature_scale
+
+    def state_dict(self):
+        return dict(self._state)
+
+    def load_state_dict(self, state_dict):
+        self._set_state(state_dict)
+        for hook in self._hooks:
+            hook(self, None)
+
+    def register_load_state_dict_post_hook(self, hook):
+        self._hooks.append(hook)
+
+    def eval(self):
+        return self
+
+    def fingerprint(self):
+        """Short hash of the current weights, used as the model version"""
+        digest = hashlib.sha1()
+        for name, array in self._state.items():
+            digest.update(name.encode())
+            digest.update(array.tobytes())
+        if self.feature_mean is not None:
+            digest.update(b'scaler')
+            digest.update(self.feature_mean.tobytes())
+            digest.update(self.feature_scale.tobytes())
+        return digest.hexdigest()[:12]
+
+    def forward(self, x):
+        """Scores for an (N, 10) feature matrix as an (N,) float32 array"""
+        x = np.asarray(x, dtype=np.float32)
+        if self.feature_mean is not None:
+            x = (x - self.feature_mean) / self.feature_scale
+        last = len(self._layers) - 1
+        for i, (weight_t, bias) in enumerate(self._layers):
+            x = x @ weight_t
+            x += bias
+            if i < last:
+                np.maximum(x, 0, out=x)
+        with np.errstate(over='ignore'):
+            x = 1.0 / (1.0 + np.exp(-x))
+        return x.reshape(-1)
+
+    __call__ = forward
+
+    def extract_features(self, ip_or_domain):
+        return np.array(features.extract_features(ip_or_domain), dtype=np.float32)
+
+    def extract_features_batch(self, indicators):
+        return features.extract_features_batch(indicators)
+
+    def predict_threat(self, ip_or_domain):
+        """Predict threat level for IP or domain"""
+        return float(self.forward(self.extract_features(ip_or_domain)[None, :])[0])
+
+    def predict_threat_batch(self, indicators, batch_size=4096):
+        """Predict threat levels for many IPs/domains, one forward pass per chunk"""
+        indicators = list(indicators)
+        scores = []
+        for start in range(0, len(indicators), batch_size):
+            batch = self.extract_features_batch(indicators[start:start + batch_size])
+            scores.extend(self.predict_features(batch, batch_size=batch_size))
+        return scores
+
+    def predict_features(self, features, batch_size=4096):
+        """Score a precomputed (N, 10) feature matrix in chunks"""
+        scores = []
+        for start in range(0, len(features), batch_size):
+            scores.extend(self.forward(features[start:start + batch_size]).tolist())
+        return scores
+
+    def _set_state(self, state_dict):
+        linear = {}
+        for key, value in state_dict.items():
+            match = _LINEAR_KEY.match(key)
+            if match:
+                linear.setdefault(int(match.group(1)), {})[match.group(2)] = _as_array(value)
+        if not linear:
+            raise ValueError("state dict has no network Linear layers")
+        self._state = {}
+        self._layers = []
+        for index in sorted(linear):
+            layer = linear[index]
+            self._state[f'network.{index}.weight'] = layer['weight']
+            self._state[f'network.{index}.bias'] = layer['bias']
+            # Pre-transposed so forward() is a plain x @ W
+            self._layers.append((np.ascontiguousarray(layer['weight'].T), layer['bias']))
+
+    @staticmethod
+    def _random_state(seed):
+        """Untrained weights with torch's default Linear initialisation"""
+        rng = np.random.default_rng(seed)
+        state = {}
+        # Linear layers sit at these positions in the nn.Sequential
+        for index, fan_in, fan_out in zip((0, 3, 6, 8), LAYER_SIZES, LAYER_SIZES[1:]):
+            bound = 1.0 / np.sqrt(fan_in)
+            state[f'network.{index}.weight'] = rng.uniform(-bound, bound, (fan_out, fan_in))
+            state[f'network.{index}.bias'] = rng.uniform(-bound, bound, fan_out)
+        return state
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 2:
+        print("usage: python numpy_model.py MODEL.pth OUTPUT.npz")
+        return 1
+    from checkpoint import load_checkpoint
+    checkpoint = load_checkpoint(argv[0])
+    export_npz(checkpoint.state_dict, argv[1], checkpoint.feature_scaling, checkpoint.thresholds)
+    print(f"Exported {argv[0]} to {argv[1]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
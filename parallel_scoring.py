@@ -0,0 +1,110 @@
+import io
+import math
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+# Per-worker model, loaded once by _init_worker
+_worker_model = None
+
+
+def _init_worker(state_bytes, engine='torch', inference='float', feature_scaling=None, lexicon_terms=None):
+    """Load the model state dict (and the parent's lexicon) once per worker process"""
+    global _worker_model
+    if lexicon_terms is not None:
+        from features import load_lexicon
+        load_lexicon(lexicon_terms)
+    if engine == 'numpy':
+        from numpy_model import NumpyThreatModel
+        _worker_model = NumpyThreatModel.load(io.BytesIO(state_bytes))
+        return
+
+    import torch
+    from model import ThreatDetectionModel
+
+    torch.set_num_threads(1)
+    _worker_model = ThreatDetectionModel()
+    _worker_model.load_state_dict(torch.load(io.BytesIO(state_bytes), map_location='cpu'))
+    _worker_model.eval()
+    if feature_scaling is not None:
+        _worker_model.set_feature_scaling(*feature_scaling)
+    _worker_model.set_inference_mode(inference)
+
+
+def _score_chunk(shm_name, offset, indicators):
+    """Score one shard and write its scores straight into the shared result array"""
+    features = _worker_model.extract_features_batch(list(indicators))
+    scores = _worker_model.predict_features(features, batch_size=len(indicators))
+    if len(scores) != len(indicators):
+        raise RuntimeError(f"Worker scored {len(scores)} of {len(indicators)} indicators")
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        results = np.ndarray((offset + len(indicators),), dtype=np.float32, buffer=shm.buf)
+        results[offset:offset + len(indicators)] = scores
+        del results
+    finally:
+        shm.close()
+    return len(indicators)
+
+
+class ParallelScorer:
+    """Scores indicators across a process pool, each worker holding its own model
+
+    Indicators are split into contiguous shards; every worker writes its
+    float32 scores into a shared-memory array at the shard's offset, so
+    results come back in input order without pickling per-indicator
+    results.
+    """
+
+    def __init__(self, state_dict, workers=None, chunk_size=4096, min_chunk_size=256,
+                 engine='torch', inference='float', feature_scaling=None):
+        self.workers = workers or multiprocessing.cpu_count()
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        buffer = io.BytesIO()
+        if engine == 'numpy':
+            from numpy_model import export_npz
+            export_npz(state_dict, buffer, feature_scaling)
+        else:
+            import torch
+            torch.save(state_dict, buffer)
+        from features import lexicon
+        self._pool = ProcessPoolExecutor(
+            self.workers,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker,
+            initargs=(buffer.getvalue(), engine, inference, feature_scaling, lexicon().patterns)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def score(self, indicators):
+        """Return a float32 array of threat scores in the same order as indicators"""
+        indicators = list(indicators)
+        n = len(indicators)
+        if n == 0:
+            return np.zeros(0, dtype=np.float32)
+
+        shard = max(self.min_chunk_size, min(self.chunk_size, math.ceil(n / self.workers)))
+        shm = shared_memory.SharedMemory(create=True, size=n * 4)
+        try:
+            # Shards go as tuples: any separator could also occur inside an indicator
+            shards = [tuple(indicators[start:start + shard]) for start in range(0, n, shard)]
+            futures = [self._pool.submit(_score_chunk, shm.name, start, items)
+                       for start, items in zip(range(0, n, shard), shards)]
+            for future in futures:
+                future.result()
+            return np.ndarray((n,), dtype=np.float32, buffer=shm.buf).copy()
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def close(self):
+        """Shut down the worker processes"""
+        self._pool.shutdown(wait=True, cancel_futures=True)
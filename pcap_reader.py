@@ -0,0 +1,225 @@
+"""Memory-mapped pcap/pcapng reader with in-place header parsing
+
+Packets are never copied out of the capture: record headers and the
+Ethernet/IPv4/IPv6/TCP/UDP headers are decoded straight from the mapped
+file with precompiled struct.Struct.unpack_from calls.
+"""
+import mmap
+import struct
+
+# Link-layer header types (https://www.tcpdump.org/linktypes.html)
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_IPV4 = 228
+LINKTYPE_IPV6 = 229
+
+PROTOCOL_NAMES = {1: 'ICMP', 6: 'TCP', 17: 'UDP', 58: 'ICMPv6', 47: 'GRE', 50: 'ESP'}
+
+PCAP_MAGIC_US = 0xa1b2c3d4
+PCAP_MAGIC_NS = 0xa1b23c4d
+PCAPNG_SECTION = 0x0a0d0d0a
+PCAPNG_BYTE_ORDER = 0x1a2b3c4d
+
+ETHERTYPE_IPV4 = 0x0800
+ETHERTYPE_IPV6 = 0x86dd
+VLAN_ETHERTYPES = (0x8100, 0x88a8)
+
+# IPv6 extension headers that are skipped to reach the transport header
+_IPV6_EXTENSIONS = (0, 43, 60)
+
+_ETHERTYPE = struct.Struct('!H')
+_IPV4 = struct.Struct('!BxHxxxxxBxxII')  # version/IHL, total length, protocol, addresses
+_IPV6 = struct.Struct('!IHBxQQQQ')       # version, payload length, next header, addresses
+_PORTS = struct.Struct('!HH')
+_EXTENSION = struct.Struct('!BB')
+_NULL_FAMILY = struct.Struct('=I')
+
+
+class PcapFormatError(ValueError):
+    pass
+
+
+def parse_packet(buf, offset, caplen, linktype):
+    """Flow key (ip version, src, dst, protocol, sport, dport) of one packet, or None
+
+    Addresses are returned as integers. Non-IP frames, truncated headers
+    and fragments past the first return None or zero ports.
+    """
+    end = offset + caplen
+    if linktype == LINKTYPE_ETHERNET:
+        if caplen < 14:
+            return None
+        ethertype = _ETHERTYPE.unpack_from(buf, offset + 12)[0]
+        offset += 14
+        while ethertype in VLAN_ETHERTYPES and offset + 4 <= end:
+            ethertype = _ETHERTYPE.unpack_from(buf, offset + 2)[0]
+            offset += 4
+    elif linktype == LINKTYPE_RAW or linktype == LINKTYPE_IPV4 or linktype == LINKTYPE_IPV6:
+        if caplen < 1:
+            return None
+        ethertype = ETHERTYPE_IPV6 if buf[offset] >> 4 == 6 else ETHERTYPE_IPV4
+    elif linktype == LINKTYPE_LINUX_SLL:
+        if caplen < 16:
+            return None
+        ethertype = _ETHERTYPE.unpack_from(buf, offset + 14)[0]
+        offset += 16
+    elif linktype == LINKTYPE_NULL:
+        if caplen < 4:
+            return None
+        family = _NULL_FAMILY.unpack_from(buf, offset)[0]
+        ethertype = ETHERTYPE_IPV4 if family == 2 else ETHERTYPE_IPV6
+        offset += 4
+    else:
+        return None
+
+    if ethertype == ETHERTYPE_IPV4:
+        if offset + 20 > end:
+            return None
+        version_ihl, total_length, protocol, src, dst = _IPV4.unpack_from(buf, offset)
+        if version_ihl >> 4 != 4:
+            return None
+        fragment = _ETHERTYPE.unpack_from(buf, offset + 6)[0] & 0x1fff
+        offset += (version_ihl & 0x0f) * 4
+        version = 4
+    elif ethertype == ETHERTYPE_IPV6:
+        if offset + 40 > end:
+            return None
+        first, payload_length, protocol, src_high, src_low, dst_high, dst_low = _IPV6.unpack_from(buf, offset)
+        if first >> 28 != 6:
+            return None
+        src = (src_high << 64) | src_low
+        dst = (dst_high << 64) | dst_low
+        offset += 40
+        fragment = 0
+        while protocol in _IPV6_EXTENSIONS and offset + 2 <= end:
+            protocol, length = _EXTENSION.unpack_from(buf, offset)
+            offset += (length + 1) * 8
+        if protocol == 44:  # Fragment header
+            fragment = 1
+        version = 6
+    else:
+        return None
+
+    if (protocol == 6 or protocol == 17) and not fragment and offset + 4 <= end:
+        sport, dport = _PORTS.unpack_from(buf, offset)
+    else:
+        sport = dport = 0
+    return (version, src, dst, protocol, sport, dport)
+
+
+class PcapReader:
+    """Iterates the packets of a pcap or pcapng file through a read-only memory map
+
+    iter_records() yields (timestamp_ns, offset, caplen, wire_length,
+    linktype) with offset pointing into self.buffer; parse them with
+    parse_packet(reader.buffer, ...). Use as a context manager to release
+    the mapping.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise PcapFormatError(f"Empty capture file: {path}")
+        self.buffer = memoryview(self._mmap)
+        if len(self.buffer) < 24:
+            self.close()
+            raise PcapFormatError(f"Not a pcap/pcapng file: {path}")
+        magic = struct.unpack_from('<I', self.buffer, 0)[0]
+        if magic == PCAPNG_SECTION:
+            self.format = 'pcapng'
+        elif magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS) or \
+                struct.unpack_from('>I', self.buffer, 0)[0] in (PCAP_MAGIC_US, PCAP_MAGIC_NS):
+            self.format = 'pcap'
+        else:
+            self.close()
+            raise PcapFormatError(f"Not a pcap/pcapng file: {path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.buffer.release()
+        self._mmap.close()
+        self._file.close()
+
+    def iter_records(self):
+        if self.format == 'pcap':
+            return self._iter_pcap()
+        return self._iter_pcapng()
+
+    def _iter_pcap(self):
+        buf = self.buffer
+        size = len(buf)
+        magic = struct.unpack_from('<I', buf, 0)[0]
+        order = '<' if magic in (PCAP_MAGIC_US, PCAP_MAGIC_NS) else '>'
+        magic = struct.unpack_from(order + 'I', buf, 0)[0]
+        frac_ns = 1 if magic == PCAP_MAGIC_NS else 1000
+        linktype = struct.unpack_from(order + 'I', buf, 20)[0] & 0x0fffffff
+        record = struct.Struct(order + 'IIII').unpack_from
+        offset = 24
+        while offset + 16 <= size:
+            seconds, fraction, caplen, wire_length = record(buf, offset)
+            offset += 16
+            if offset + caplen > size:
+                break  # Truncated final record
+            yield seconds * 1000000000 + fraction * frac_ns, offset, caplen, wire_length, linktype
+            offset += caplen
+
+    def _iter_pcapng(self):
+        buf = self.buffer
+        size = len(buf)
+        offset = 0
+        order = '<'
+        block_header = struct.Struct('<II').unpack_from
+        packet_header = struct.Struct('<IIIII').unpack_from
+        interfaces = []  # (linktype, nanoseconds per timestamp unit)
+        while offset + 12 <= size:
+            block_type, block_length = block_header(buf, offset)
+            if block_type == PCAPNG_SECTION:
+                byte_order = struct.unpack_from('<I', buf, offset + 8)[0]
+                order = '<' if byte_order == PCAPNG_BYTE_ORDER else '>'
+                block_header = struct.Struct(order + 'II').unpack_from
+                packet_header = struct.Struct(order + 'IIIII').unpack_from
+                block_length = block_header(buf, offset)[1]
+                interfaces = []
+            if block_length < 12 or offset + block_length > size:
+                break
+            if block_type == 6:  # Enhanced Packet Block
+                interface, high, low, caplen, wire_length = packet_header(buf, offset + 8)
+                linktype, unit_ns = interfaces[interface] if interface < len(interfaces) else (LINKTYPE_ETHERNET, 1000)
+                yield int(((high << 32) | low) * unit_ns), offset + 28, caplen, wire_length, linktype
+            elif block_type == 3:  # Simple Packet Block: no timestamp
+                wire_length = struct.unpack_from(order + 'I', buf, offset + 8)[0]
+                caplen = min(wire_length, block_length - 16)
+                linktype = interfaces[0][0] if interfaces else LINKTYPE_ETHERNET
+                yield 0, offset + 12, caplen, wire_length, linktype
+            elif block_type == 1:  # Interface Description Block
+                linktype = struct.unpack_from(order + 'H', buf, offset + 8)[0]
+                interfaces.append((linktype, self._timestamp_unit(offset + 16, offset + block_length - 4, order)))
+            offset += block_length
+
+    def _timestamp_unit(self, offset, end, order):
+        """Nanoseconds per timestamp tick from an IDB's if_tsresol option (default microseconds)"""
+        buf = self.buffer
+        while offset + 4 <= end:
+            code, length = struct.unpack_from(order + 'HH', buf, offset)
+            if code == 0:
+                break
+            if code == 9 and length >= 1:
+                resolution = buf[offset + 4]
+                if resolution & 0x80:
+                    return 1e9 / (2 ** (resolution & 0x7f))
+                if resolution <= 9:
+                    return 10 ** (9 - resolution)  # Exact integer arithmetic for decimal units
+                return 1e9 / (10 ** resolution)
+            offset += 4 + (length + 3) // 4 * 4
+        return 1000
@@ -0,0 +1,235 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from feed_stream import iter_chunks
+from metrics import CYCLE_SECONDS, CYCLES, ERRORS, QUEUE_DEPTH, STAGE_SECONDS
+
+# Sentinel passed down the stages on graceful shutdown
+_STOP = object()
+
+
+class CycleEnd:
+    """Marker that follows the last chunk of a check cycle through every stage"""
+
+    def __init__(self, cycle, started, indicators):
+        self.cycle = cycle
+        self.started = started
+        self.indicators = indicators
+
+
+def print_alert(alert):
+    """Default alert handler: one console line per scored indicator"""
+    if 'ip_address' in alert:
+        print(f"IP: {alert['ip_address']} - {alert['severity']} ({alert['threat_score']:.3f})")
+    else:
+        print(f"Domain: {alert['domain']} - {alert['severity']} ({alert['threat_score']:.3f})")
+
+
+def print_cycle(cycle, stats):
+    """Default cycle handler: summary line once every chunk of a cycle is dispatched"""
+    print(f"Threat Check #{cycle} complete: {stats['alerts']} scored "
+          f"({stats['HIGH']} high, {stats['MEDIUM']} medium) in {stats['seconds']:.2f}s")
+
+
+class ScoringPipeline:
+    """Staged asyncio pipeline: feed source -> feature extraction -> inference -> alert dispatch
+
+    Stages are connected by bounded queues, so a slow stage makes the
+    ones upstream wait instead of buffering without limit. Feature
+    extraction, inference and dispatch run in their own single-thread
+    executors, letting consecutive chunks overlap across stages while
+    each stage still sees chunks in order. Cycles start on a fixed
+    schedule; a cycle that overruns its interval delays only the next
+    feed poll, not scoring already in flight.
+    """
+
+    def __init__(self, monitor, feed_loader, interval=60, chunk_size=None, queue_size=4,
+                 on_alert=print_alert, on_cycle=print_cycle, max_cycles=None, profiler=None):
+        self.monitor = monitor
+        self.feed_loader = feed_loader
+        self.interval = interval
+        self.chunk_size = chunk_size or monitor.batch_size
+        self.queue_size = queue_size
+        self.on_alert = on_alert
+        self.on_cycle = on_cycle
+        self.max_cycles = max_cycles
+        self.profiler = profiler  # profiling.CycleProfiler, armed on demand
+        self.backpressure_waits = 0
+        self.cycles_completed = 0
+        self.queues = []
+        self._loop = None
+        self._stopping = None
+        self._stop_requested = False
+        self._thread = None
+
+    async def run(self):
+        """Run every stage until stop() is called or this task is cancelled"""
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        if self._stop_requested:
+            self._stopping.set()
+        self.queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(3)]
+        for name, queue in zip(('extract', 'infer', 'dispatch'), self.queues):
+            QUEUE_DEPTH.labels(name).set_function(queue.qsize)
+        executors = [ThreadPoolExecutor(1, thread_name_prefix=name)
+                     for name in ('extract', 'infer', 'dispatch')]
+        tasks = [
+            asyncio.create_task(self._source(self.queues[0])),
+            asyncio.create_task(self._stage(self.queues[0], self.queues[1], executors[0],
+                                            self.monitor.prepare_batch, 'feature_extraction')),
+            asyncio.create_task(self._stage(self.queues[1], self.queues[2], executors[1],
+                                            self.monitor.infer_batch, 'inference')),
+            asyncio.create_task(self._dispatch(self.queues[2], executors[2])),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for executor in executors:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """Run the pipeline on its own event loop in a daemon thread"""
+        self._thread = threading.Thread(
+            target=asyncio.run, args=(self.run(),), name='scoring-pipeline', daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self, timeout=None):
+        """Stop polling feeds, let in-flight chunks drain, then join the pipeline thread"""
+        self._stop_requested = True
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def queue_depths(self):
+        """Current number of items waiting in front of each stage"""
+        return [queue.qsize() for queue in self.queues]
+
+    async def _put(self, queue, item):
+        if queue.full():
+            self.backpressure_waits += 1
+        await queue.put(item)
+
+    async def _source(self, outbox):
+        loop = asyncio.get_running_loop()
+        cycle = 0
+        next_run = loop.time()
+        while not self._stopping.is_set():
+            cycle += 1
+            started = time.perf_counter()
+            print(f"\n=== Threat Check #{cycle} ===")
+            print(f"Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+            if self.profiler is not None:
+                self.profiler.cycle_started(cycle)
+
+            events = []
+            try:
+                update = await loop.run_in_executor(None, self._call, self.feed_loader.load)
+                STAGE_SECONDS.labels('feed_load').observe(time.perf_counter() - started)
+                events = self._feed_events(update)
+                print(f"Checking {len(update.added_ips)} new IP addresses and "
+                      f"{len(update.added_domains)} new domains...")
+            except Exception as e:
+                ERRORS.labels('feed_load').inc()
+                print(f"Error during threat check: {str(e)}")
+
+            for chunk in iter_chunks(events, self.chunk_size):
+                await self._put(outbox, chunk)
+            await self._put(outbox, CycleEnd(cycle, started, len(events)))
+            if self.max_cycles is not None and cycle >= self.max_cycles:
+                break
+
+            next_run += self.interval
+            if next_run < loop.time():
+                next_run = loop.time()
+            try:
+                await asyncio.wait_for(self._stopping.wait(), next_run - loop.time())
+            except asyncio.TimeoutError:
+                pass
+        await outbox.put(_STOP)
+
+    def _feed_events(self, update):
+        timestamp = datetime.now()
+        events = [{
+            'type': 'ip_check',
+            'timestamp': timestamp,
+            'ip_address': ip,
+            'new_since_last_cycle': True
+        } for ip in update.added_ips]
+        events.extend({
+            'type': 'domain_check',
+            'timestamp': timestamp,
+            'domain': domain,
+            'new_since_last_cycle': True
+        } for domain in update.added_domains)
+        return events
+
+    async def _stage(self, inbox, outbox, executor, work, name):
+        loop = asyncio.get_running_loop()
+        while True:
+            item = await inbox.get()
+            if item is _STOP or isinstance(item, CycleEnd):
+                await outbox.put(item)
+                if item is _STOP:
+                    return
+                continue
+            try:
+                item = await loop.run_in_executor(executor, self._call, work, item)
+            except Exception as e:
+                ERRORS.labels(name).inc()
+                print(f"Error during threat check: {str(e)}")
+                continue
+            await self._put(outbox, item)
+
+    async def _dispatch(self, inbox, executor):
+        loop = asyncio.get_running_loop()
+        stats = _empty_stats()
+        while True:
+            item = await inbox.get()
+            if item is _STOP:
+                return
+            if isinstance(item, CycleEnd):
+                stats['seconds'] = time.perf_counter() - item.started
+                self.cycles_completed += 1
+                CYCLES.inc()
+                CYCLE_SECONDS.set(stats['seconds'])
+                if self.profiler is not None:
+                    await loop.run_in_executor(executor, self.profiler.cycle_finished, item.cycle)
+                if self.on_cycle:
+                    self.on_cycle(item.cycle, stats)
+                stats = _empty_stats()
+                continue
+            try:
+                severities = await loop.run_in_executor(executor, self._call, self._dispatch_batch, item)
+            except Exception as e:
+                ERRORS.labels('alert_generation').inc()
+                print(f"Error during threat check: {str(e)}")
+                continue
+            for severity in severities:
+                stats[severity] += 1
+            stats['alerts'] += len(severities)
+
+    def _call(self, work, *args):
+        """Run one stage's work, under the profiler while it is profiling"""
+        profiler = self.profiler
+        if profiler is not None and profiler.profiling:
+            return profiler.call(work, *args)
+        return work(*args)
+
+    def _dispatch_batch(self, batch):
+        alerts = self.monitor.finish_batch(batch)
+        if self.on_alert:
+            for alert in alerts:
+                self.on_alert(alert)
+        return [alert['severity'] for alert in alerts]
+
+
+def _empty_stats():
+    return {'alerts': 0, 'HIGH': 0, 'MEDIUM': 0, 'LOW': 0, 'seconds': 0.0}
@@ -0,0 +1,168 @@
+"""On-demand profiling of scoring cycles in a running monitor
+
+A request (SIGUSR1/SIGUSR2 or a tray menu command) arms the profiler;
+the pipeline picks it up at the start of the next check cycle:
+
+- cProfile: every stage call of the next N cycles runs under one shared
+  profiler, enabled on whichever thread executes the call, and the
+  result is written as a .pstats file (open with `python -m pstats FILE`).
+  Only one profiler can be active at a time (on 3.12+ cProfile is built
+  on sys.monitoring), so profiled stage calls take turns; a stage whose
+  profiler cannot be enabled runs unprofiled rather than failing.
+- tracemalloc: allocations are traced from the start of the next cycle
+  to its end and the snapshot difference is written as a text report.
+
+The top entries of either are printed to the log. Until a request
+arrives the pipeline only checks one attribute per batch.
+"""
+import cProfile
+import os
+import pstats
+import signal
+import threading
+import time
+import tracemalloc
+
+
+class CycleProfiler:
+    """Profiles the next cycles of a ScoringPipeline when asked to"""
+
+    def __init__(self, output_dir='profiles', cycles=1, top=15):
+        self.output_dir = output_dir
+        self.cycles = cycles
+        self.top = top
+        self.profiling = False     # Read by the pipeline for every batch
+        self.written = []
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()  # Held while self._profile is enabled
+        self._profile = None
+        self._profiled_calls = 0
+        self._pending_profile = 0
+        self._pending_snapshot = False
+        self._first_cycle = None
+        self._remaining = 0
+        self._memory_cycle = None
+        self._before = None
+
+    def request_profile(self, cycles=None):
+        """Profile the next cycles (default self.cycles) with cProfile"""
+        with self._lock:
+            self._pending_profile = cycles or self.cycles
+        print(f"Profiling requested for the next {self._pending_profile} cycle(s)")
+
+    def request_snapshot(self):
+        """Diff tracemalloc snapshots taken around the next cycle"""
+        with self._lock:
+            self._pending_snapshot = True
+        print("Memory snapshot requested for the next cycle")
+
+    def call(self, work, *args):
+        """Run work(*args) under the cycle's profiler, one profiled call at a time"""
+        with self._profile_lock:
+            profile = self._profile
+            if profile is not None:
+                try:
+                    profile.enable()
+                except Exception as e:  # E.g. another profiler or debugger is active
+                    print(f"Profiling unavailable, running unprofiled: {str(e)}")
+                    profile = self._profile = None
+                    self._profiled_calls = 0
+            if profile is not None:
+                self._profiled_calls += 1
+                try:
+                    return work(*args)
+                finally:
+                    profile.disable()
+        return work(*args)
+
+    def cycle_started(self, cycle):
+        """Called by the pipeline as each check cycle begins"""
+        with self._lock:
+            if self._pending_profile and not self.profiling:
+                self._remaining = self._pending_profile
+                self._pending_profile = 0
+                self._first_cycle = cycle
+                with self._profile_lock:
+                    self._profile = cProfile.Profile()
+                    self._profiled_calls = 0
+                self.profiling = True
+            if self._pending_snapshot and self._memory_cycle is None:
+                self._pending_snapshot = False
+                self._memory_cycle = cycle
+                tracemalloc.start()
+                self._before = tracemalloc.take_snapshot()
+
+    def cycle_finished(self, cycle):
+        """Called by the pipeline once every chunk of a cycle has been dispatched"""
+        finished = False
+        with self._lock:
+            if self.profiling and cycle >= self._first_cycle:
+                self._remaining -= 1
+                if self._remaining <= 0:
+                    self.profiling = False
+                    finished = True
+                    with self._profile_lock:
+                        profile, self._profile = self._profile, None
+                        calls = self._profiled_calls
+            memory_cycle = self._memory_cycle
+        if finished:
+            if not calls:
+                print(f"Profile of cycles {self._first_cycle}-{cycle}: no stage was profiled, nothing written")
+            else:
+                self._write_profile(pstats.Stats(profile), self._first_cycle, cycle)
+        if memory_cycle is not None and cycle >= memory_cycle:
+            after = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            before, self._before = self._before, None
+            self._memory_cycle = None
+            self._write_memory_diff(after.compare_to(before, 'lineno'), memory_cycle)
+
+    def _path(self, name):
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}")
+
+    def _write_profile(self, stats, first, last):
+        span = f'{first}' if first == last else f'{first}-{last}'
+        path = self._path(f'cycle-{span}') + '.pstats'
+        stats.dump_stats(path)
+        self.written.append(path)
+
+        stats.sort_stats('tottime')
+        total = stats.total_tt or 1.0
+        print(f"Profile of cycle {span} written to {path}; top {self.top} by own time:")
+        for func in stats.fcn_list[:self.top]:
+            calls, _, own, cumulative, _ = stats.stats[func]
+            print(f"  {own / total:6.1%} {own:8.3f}s own {cumulative:8.3f}s cum {calls:>8} calls  "
+                  f"{pstats.func_std_string(func)}")
+
+    def _write_memory_diff(self, differences, cycle):
+        path = self._path(f'memory-cycle-{cycle}') + '.txt'
+        growth = sum(stat.size_diff for stat in differences)
+        with open(path, 'w') as f:
+            f.write(f"Net allocation change over cycle {cycle}: {growth / 1e6:+.2f} MB\n")
+            for stat in differences[:100]:
+                f.write(f"{stat}\n")
+        self.written.append(path)
+
+        print(f"Memory diff of cycle {cycle} written to {path} ({growth / 1e6:+.2f} MB); "
+              f"top {min(self.top, 10)}:")
+        for stat in differences[:min(self.top, 10)]:
+            print(f"  {stat}")
+
+
+def install_signal_handlers(profiler, loop=None):
+    """SIGUSR1 profiles the next cycles, SIGUSR2 takes a memory snapshot (POSIX only)
+
+    With an asyncio loop the handlers run on it; otherwise they are
+    installed with signal.signal and must be called from the main thread.
+    Returns False where the signals do not exist, e.g. on Windows.
+    """
+    if not hasattr(signal, 'SIGUSR1'):
+        return False
+    handlers = {signal.SIGUSR1: profiler.request_profile, signal.SIGUSR2: profiler.request_snapshot}
+    for sig, handler in handlers.items():
+        if loop is not None:
+            loop.add_signal_handler(sig, handler)
+        else:
+            signal.signal(sig, lambda signum, frame, handler=handler: handler())
+    return True
@@ -0,0 +1,146 @@
+import threading
+import numpy as np
+
+# What to do when a full buffer receives another record
+OVERFLOW_POLICIES = ('overwrite', 'drop', 'error')
+
+
+class RingBuffer:
+    """Fixed-capacity, preallocated ring buffer over a NumPy structured array
+
+    overflow controls what happens once the buffer is full:
+    'overwrite' replaces the oldest record, 'drop' discards the new one
+    and 'error' raises BufferError.
+    """
+
+    def __init__(self, capacity, dtype, overflow='overwrite'):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
+        self.capacity = capacity
+        self.overflow = overflow
+        self.data = np.zeros(capacity, dtype=dtype)
+        self.overwritten = 0
+        self.dropped = 0
+        self._head = 0  # Next slot to write
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._size
+
+    def append(self, record):
+        """Store one record (a tuple in dtype field order); False if dropped"""
+        with self._lock:
+            if self._size == self.capacity and not self._make_room(1):
+                return False
+            self.data[self._head] = record
+            self._head = (self._head + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+            return True
+
+    def extend(self, records):
+        """Store a structured array of records; returns how many were kept"""
+        records = np.asarray(records, dtype=self.data.dtype)
+        with self._lock:
+            free = self.capacity - self._size
+            if len(records) > free:
+                if self.overflow == 'drop':
+                    self.dropped += len(records) - free
+                    records = records[:free]
+                elif self.overflow == 'error':
+                    raise BufferError("ring buffer is full")
+                else:
+                    self.overwritten += len(records) - free
+                    records = records[-self.capacity:]
+            count = len(records)
+            first = min(count, self.capacity - self._head)
+            self.data[self._head:self._head + first] = records[:first]
+            self.data[:count - first] = records[first:]
+            self._head = (self._head + count) % self.capacity
+            self._size = min(self._size + count, self.capacity)
+            return count
+
+    def views(self, n=None):
+        """Zero-copy views of the newest n records, oldest first, as up to two slices"""
+        with self._lock:
+            n = self._size if n is None else max(0, min(n, self._size))
+            start = (self._head - n) % self.capacity
+            if n == 0:
+                return []
+            if start + n <= self.capacity:
+                return [self.data[start:start + n]]
+            return [self.data[start:], self.data[:self._head]]
+
+    def latest(self, n=None):
+        """Newest n records, oldest first; a view unless they wrap around the end"""
+        parts = self.views(n)
+        if not parts:
+            return self.data[:0]
+        if len(parts) == 1:
+            return parts[0]
+        return np.concatenate(parts)
+
+    def clear(self):
+        with self._lock:
+            self._head = 0
+            self._size = 0
+
+    def _make_room(self, count):
+        if self.overflow == 'drop':
+            self.dropped += count
+            return False
+        if self.overflow == 'error':
+            raise BufferError("ring buffer is full")
+        self.overwritten += count
+        return True
+
+
+class StringTable:
+    """Interns repeated strings (IPs, protocols, users) to small integer ids"""
+
+    def __init__(self):
+        self._ids = {}
+        self._values = []
+        self._lookup = None
+
+    def __len__(self):
+        return len(self._values)
+
+    def intern(self, value):
+        """Return the id for value, assigning a new one if needed; None maps to -1"""
+        if value is None:
+            return -1
+        string_id = self._ids.get(value)
+        if string_id is None:
+            string_id = self._ids[value] = len(self._values)
+            self._values.append(value)
+            self._lookup = None
+        return string_id
+
+    def intern_many(self, values):
+        """Vector of ids for an iterable of values"""
+        return np.fromiter((self.intern(value) for value in values), dtype=np.int32)
+
+    def compact(self, live_ids):
+        """Forget every string whose id is not in live_ids and renumber the rest
+
+        Returns an int32 array mapping old ids to new ones (dropped ids map
+        to -1, and so does -1); apply it to every stored id.
+        """
+        live = np.unique(live_ids[live_ids >= 0])
+        # The trailing slot makes id -1 map to -1
+        remap = np.full(len(self._values) + 1, -1, dtype=np.int32)
+        remap[live] = np.arange(len(live), dtype=np.int32)
+        self._values = [self._values[i] for i in live]
+        self._ids = {value: string_id for string_id, value in enumerate(self._values)}
+        self._lookup = None
+        return remap
+
+    def resolve(self, ids):
+        """Object array of the strings for an array of ids (-1 becomes None)"""
+        if self._lookup is None or len(self._lookup) != len(self._values) + 1:
+            # The trailing None makes id -1 resolve to None
+            self._lookup = np.array(self._values + [None], dtype=object)
+        return self._lookup[ids]
@@ -0,0 +1,316 @@
+"""Local HTTP scoring service with dynamic micro-batching
+
+    python scoring_server.py [--port 8765] [--model model.pt] [--max-delay-ms 2] [--max-batch 256]
+
+Endpoints (127.0.0.1 only unless --host says otherwise):
+
+    GET  /score?indicator=evil.example.com    one verdict
+    POST /score  {"indicators": [...]}        {"results": [...]} in request order
+    GET  /stats                               request latency p50/p99 and batching counters
+    GET  /metrics                             Prometheus metrics
+    GET  /health
+
+Requests from concurrent connections are coalesced: the first waiting
+request opens a window of --max-delay-ms, and everything that arrives
+within it (or until --max-batch indicators are waiting) is scored with a
+single ThreatMonitor batch. Lookups are verdicts only; they reach the
+alert sinks only with --emit-alerts.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+from feed_stream import is_indicator, make_event
+from metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY
+
+# Largest bulk request accepted, in indicators
+MAX_BULK = 10000
+
+# Fields of an alert returned to clients
+RESULT_FIELDS = ('threat_score', 'severity', 'recommended_action', 'behavior', 'blocklist')
+
+REQUEST_SECONDS = REGISTRY.histogram(
+    'threat_request_seconds', 'Scoring request latency', ['kind'],
+    buckets=(0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 0.5, 1.0))
+BATCH_SIZE = REGISTRY.histogram(
+    'threat_microbatch_size', 'Indicators per coalesced scoring batch',
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096))
+
+
+class _Pending:
+    __slots__ = ('events', 'done', 'alerts', 'error')
+
+    def __init__(self, events):
+        self.events = events
+        self.done = threading.Event()
+        self.alerts = None
+        self.error = None
+
+
+class MicroBatcher:
+    """Coalesces concurrent score() calls into single model batches on one worker thread"""
+
+    def __init__(self, monitor, max_delay=0.002, max_items=256, emit_alerts=False):
+        self.monitor = monitor
+        self.max_delay = max_delay
+        self.max_items = max_items
+        self.emit_alerts = emit_alerts
+        self.batches = 0
+        self.items = 0
+        self._pending = []
+        self._pending_items = 0
+        self._closed = False
+        self._ready = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='micro-batcher', daemon=True)
+        self._thread.start()
+
+    def score(self, indicators):
+        """Alerts for indicators, scored together with whatever else arrives in the window"""
+        pending = _Pending([make_event(indicator) for indicator in indicators])
+        with self._ready:
+            if self._closed:
+                raise RuntimeError("Scoring server is shutting down")
+            self._pending.append(pending)
+            self._pending_items += len(pending.events)
+            self._ready.notify()
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.alerts
+
+    def close(self, timeout=5):
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+        self._thread.join(timeout)
+
+    def _take(self):
+        """Wait for a window's worth of requests; None once closed and drained"""
+        with self._ready:
+            while not self._pending:
+                if self._closed:
+                    return None
+                self._ready.wait()
+            deadline = time.monotonic() + self.max_delay
+            while self._pending_items < self.max_items and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._ready.wait(remaining)
+            # Whole requests up to max_items (at least one); the rest start the next window
+            count, items = 0, 0
+            while count < len(self._pending):
+                size = len(self._pending[count].events)
+                if count and items + size > self.max_items:
+                    break
+                items += size
+                count += 1
+            taken, self._pending = self._pending[:count], self._pending[count:]
+            self._pending_items -= items
+            return taken
+
+    def _run(self):
+        while True:
+            taken = self._take()
+            if taken is None:
+                return
+            events = [event for pending in taken for event in pending.events]
+            try:
+                alerts = self._score(events)
+            except Exception:
+                # One bad request must not fail the others it was coalesced with
+                for pending in taken:
+                    try:
+                        pending.alerts = self._score(pending.events)
+                    except Exception as e:
+                        pending.error = e
+                    pending.done.set()
+                continue
+            start = 0
+            for pending in taken:
+                pending.alerts = alerts[start:start + len(pending.events)]
+                start += len(pending.events)
+                pending.done.set()
+
+    def _score(self, events):
+        monitor = self.monitor
+        batch = monitor.infer_batch(monitor.prepare_batch(events))
+        alerts = monitor.finish_batch(batch) if self.emit_alerts else monitor.build_alerts(batch)
+        self.batches += 1
+        self.items += len(events)
+        BATCH_SIZE.observe(len(events))
+        return alerts
+
+
+class LatencyWindow:
+    """Latencies of the most recent requests, for percentiles"""
+
+    def __init__(self, size=10000):
+        self._samples = deque(maxlen=size)
+        self.count = 0
+
+    def record(self, seconds):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def percentiles(self, *fractions):
+        samples = sorted(self._samples)
+        if not samples:
+            return [0.0 for _ in fractions]
+        return [samples[min(len(samples) - 1, int(len(samples) * f))] for f in fractions]
+
+
+def _result(indicator, alert):
+    result = {'indicator': indicator}
+    result.update((field, alert[field]) for field in RESULT_FIELDS if field in alert)
+    return result
+
+
+class _ScoringHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, so clients can reuse connections
+    disable_nagle_algorithm = True  # Headers and body go out as separate writes
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path == '/score':
+            indicator = parse_qs(url.query).get('indicator', [''])[0].strip()
+            if not is_indicator(indicator):
+                return self._send_json(400, {'error': 'missing ?indicator='})
+            self._score('single', [indicator], lambda results: results[0])
+        elif url.path == '/stats':
+            self._send_json(200, self.server.scoring.stats())
+        elif url.path == '/metrics':
+            self._send(200, REGISTRY.render().encode('utf-8'), METRICS_CONTENT_TYPE)
+        elif url.path == '/health':
+            self._send_json(200, {'status': 'ok', 'model_version': self.server.scoring.monitor.model_version})
+        else:
+            self._send_json(404, {'error': 'not found'})
+
+    def do_POST(self):
+        if urlsplit(self.path).path != '/score':
+            return self._send_json(404, {'error': 'not found'})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            indicators = body['indicators'] if isinstance(body, dict) else body
+            if not isinstance(indicators, list) or not all(isinstance(i, str) for i in indicators):
+                raise ValueError
+        except (ValueError, KeyError):
+            return self._send_json(400, {'error': 'expected {"indicators": ["ip or domain", ...]}'})
+        indicators = [indicator.strip() for indicator in indicators]
+        if not all(map(is_indicator, indicators)):
+            return self._send_json(400, {'error': 'indicators must not be empty'})
+        if len(indicators) > MAX_BULK:
+            return self._send_json(413, {'error': f'at most {MAX_BULK} indicators per request'})
+        self._score('bulk', indicators, lambda results: {'results': results})
+
+    def _score(self, kind, indicators, shape):
+        started = time.perf_counter()
+        try:
+            alerts = self.server.scoring.batcher.score(indicators) if indicators else []
+        except Exception as e:
+            return self._send_json(500, {'error': str(e)})
+        self._send_json(200, shape([_result(i, a) for i, a in zip(indicators, alerts)]))
+        elapsed = time.perf_counter() - started
+        self.server.scoring.latency.record(elapsed)
+        REQUEST_SECONDS.labels(kind).observe(elapsed)
+
+    def _send_json(self, status, payload):
+        self._send(status, json.dumps(payload).encode('utf-8'), 'application/json')
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # One line per request would cost more than scoring it
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # The default backlog of 5 resets bursts of new connections
+
+
+class ScoringServer:
+    """HTTP front end for a ThreatMonitor; binds to localhost unless told otherwise"""
+
+    def __init__(self, monitor, host='127.0.0.1', port=8765, max_delay=0.002, max_items=256,
+                 emit_alerts=False):
+        self.monitor = monitor
+        self.host = host
+        self.port = port
+        self.batcher = MicroBatcher(monitor, max_delay, max_items, emit_alerts)
+        self.latency = LatencyWindow()
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        self._server = _Server((self.host, self.port), _ScoringHandler)
+        self._server.scoring = self
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='scoring-server',
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        self.batcher.close()
+
+    def stats(self):
+        p50, p99 = self.latency.percentiles(0.5, 0.99)
+        batches = self.batcher.batches
+        return {
+            'requests': self.latency.count,
+            'p50_ms': p50 * 1000,
+            'p99_ms': p99 * 1000,
+            'batches': batches,
+            'indicators': self.batcher.items,
+            'mean_batch_size': self.batcher.items / batches if batches else 0.0,
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP threat scoring service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--model', default=None, help='model checkpoint (or .npz export for --engine numpy)')
+    parser.add_argument('--engine', choices=('torch', 'numpy'), default='torch')
+    parser.add_argument('--inference', choices=('float', 'int8', 'traced'), default='float')
+    parser.add_argument('--max-delay-ms', type=float, default=2.0,
+                        help='how long the first waiting request holds the batch open')
+    parser.add_argument('--max-batch', type=int, default=256, help='score as soon as this many indicators wait')
+    parser.add_argument('--blocklist', action='append', default=[], help='Bloom filter from bloom_filter.py')
+    parser.add_argument('--verdict-db', default=None, help='SQLite verdict store shared with the monitor')
+    parser.add_argument('--emit-alerts', action='store_true', help='also send lookups to the alert sinks')
+    args = parser.parse_args(argv)
+
+    from monitor import ThreatMonitor
+    monitor = ThreatMonitor(model_path=args.model, headless=True, engine=args.engine,
+                            inference=args.inference, blocklists=args.blocklist,
+                            verdict_store=args.verdict_db)
+    server = ScoringServer(monitor, args.host, args.port, args.max_delay_ms / 1000, args.max_batch,
+                           args.emit_alerts).start()
+    print(f"Scoring on http://{args.host}:{server.port}/score", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        monitor.close()
+        print(json.dumps(server.stats()))
+
+
+if __name__ == '__main__':
+    main()
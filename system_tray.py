@@ -3,8 +3,9 @@ from PIL import Image
 import tkinter as tk
 
 class SystemTray:
-    def __init__(self, root):
+    def __init__(self, root, profiler=None):
         self.root = root
+        self.profiler = profiler
         self.create_icon()
         
     def create_icon(self):
@@ -20,12 +21,16 @@ class SystemTray:
         )
         
     def create_menu(self):
-        return pystray.Menu(
-            pystray.MenuItem(
-                "Exit",
-                self.stop_application
-            )
-        )
+        items = []
+        if self.profiler is not None:
+            # Captures are written by the pipeline at the end of the next cycle
+            items.append(pystray.MenuItem("Profile next cycle", lambda: self.profiler.request_profile()))
+            items.append(pystray.MenuItem("Memory snapshot", lambda: self.profiler.request_snapshot()))
+        items.append(pystray.MenuItem(
+            "Exit",
+            self.stop_application
+        ))
+        return pystray.Menu(*items)
         
     def stop_application(self):
         self.icon.stop()
@@ -0,0 +1,57 @@
+import os
+import random
+import tempfile
+import unittest
+import numpy as np
+import features
+from aho_corasick import AhoCorasick
+
+class TestAhoCorasick(unittest.TestCase):
+    def test_overlapping_matches_and_positions(self):
+        matcher = AhoCorasick(['he', 'she', 'his', 'hers'])
+        self.assertEqual(sorted(matcher.search('ushers')), [('he', 2), ('hers', 2), ('she', 1)])
+        self.assertEqual(matcher.count('ushers'), 3)
+        self.assertTrue(matcher.contains('USHERS'))
+        self.assertFalse(matcher.contains('hi tree'))
+
+    def test_agrees_with_substring_scan(self):
+        rng = random.Random(0)
+        terms = [''.join(rng.choice('abcde') for _ in range(rng.randint(1, 5))) for _ in range(300)]
+        matcher = AhoCorasick(terms)
+        texts = [''.join(rng.choice('abcdef.-') for _ in range(rng.randint(0, 40))) for _ in range(500)]
+        width = max(len(t) for t in texts)
+        matrix = np.zeros((len(texts), width), dtype=np.uint8)
+        for row, text in enumerate(texts):
+            expected = sum(text[i:].startswith(term) for term in matcher.patterns for i in range(len(text)))
+            self.assertEqual(matcher.count(text), expected)
+            self.assertEqual(len(matcher.search(text)), expected)
+            matrix[row, :len(text)] = np.frombuffer(text.encode(), dtype=np.uint8)
+        self.assertEqual(matcher.count_rows(matrix).tolist(), [matcher.count(t) for t in texts])
+
+    def test_lexicon_file(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'brands.txt')
+            with open(path, 'w') as f:
+                f.write('# brand lexicon\nPayPal\n\nmicrosoft  # vendor\npaypal\n')
+            matcher = AhoCorasick.from_file(path)
+        self.assertEqual(matcher.patterns, ['paypal', 'microsoft'])
+
+class TestLexiconFeatures(unittest.TestCase):
+    def tearDown(self):
+        features.load_lexicon()
+
+    def test_default_lexicon_matches_suspicious_words(self):
+        self.assertTrue(features.contains_suspicious_words('Secure-Login.example.com'))
+        self.assertFalse(features.contains_suspicious_words('example.com'))
+        self.assertEqual(features.suspicious_matches('free-prize.com'), [('free', 0), ('prize', 5)])
+
+    def test_loaded_lexicon_drives_batch_and_scalar_features(self):
+        features.load_lexicon(['paypal', 'micros0ft'])
+        domains = ['paypal-verify.com', 'micros0ft.net', 'free-login.com', 'PAYPAL.com']
+        batch = features.extract_features_batch(domains)
+        scalar = np.array([features.extract_features(d) for d in domains])
+        np.testing.assert_allclose(batch, scalar, rtol=1e-6)
+        self.assertEqual(batch[:, 5].tolist(), [1.0, 1.0, 0.0, 1.0])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from alert_aggregator import AlertAggregator, TokenBucket
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def alert(target, severity='HIGH', score=0.9):
+    return {'domain': target, 'severity': severity, 'threat_score': score,
+            'recommended_action': 'Block and investigate immediately'}
+
+class TestAlertAggregator(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.aggregator = AlertAggregator(
+            dedupe_window=60, digest_interval=30, digest_top=3,
+            rate_limits={'HIGH': (2, 0.0), 'MEDIUM': (1, 0.0)}, clock=self.clock
+        )
+
+    def test_first_high_alert_is_immediate(self):
+        first = alert('a.com')
+        self.assertEqual(self.aggregator.submit(first), [first])
+
+    def test_duplicates_are_suppressed_within_window(self):
+        self.aggregator.submit(alert('a.com', 'MEDIUM', 0.6))
+        self.assertEqual(self.aggregator.submit(alert('a.com', 'MEDIUM', 0.6)), [])
+        # A severity increase is not a duplicate
+        self.assertEqual(len(self.aggregator.submit(alert('a.com', 'HIGH', 0.9))), 1)
+        self.clock.now = 61
+        self.assertEqual(len(self.aggregator.submit(alert('a.com', 'HIGH', 0.9))), 1)
+        self.assertEqual(self.aggregator.stats()['suppressed'], 1)
+
+    def test_burst_rolls_into_digest(self):
+        shown = []
+        for i in range(12):
+            shown += self.aggregator.submit(alert(f'host{i}.com', score=0.8 + i / 100))
+        self.assertEqual(len(shown), 2)
+        self.assertEqual(self.aggregator.flush(), [])
+
+        self.clock.now = 30
+        digests = self.aggregator.flush()
+        self.assertEqual(len(digests), 1)
+        digest = digests[0]
+        self.assertEqual(digest['type'], 'digest')
+        self.assertEqual(digest['count'], 10)
+        self.assertEqual([a['domain'] for a in digest['top']], ['host11.com', 'host10.com', 'host9.com'])
+        self.assertTrue(digest['summary'].startswith('10 HIGH threats in last 30s, top 3: host11.com'))
+
+        stats = self.aggregator.stats()
+        self.assertEqual((stats['merged'], stats['digests'], stats['pending']), (10, 1, 0))
+
+    def test_flood_holds_only_the_top_alerts(self):
+        for i in range(10000):
+            self.aggregator.submit(alert(f'flood{i}.com', score=0.5 + (i % 100) / 1000))
+        held = self.aggregator._pending['HIGH']
+        self.assertEqual(len(held.top), 3)
+        self.assertEqual(self.aggregator.stats()['pending'], 9998)
+
+        digest, = self.aggregator.flush(force=True)
+        self.assertEqual(digest['count'], 9998)
+        # Equal scores keep the earliest alerts
+        self.assertEqual([a['domain'] for a in digest['top']], ['flood99.com', 'flood199.com', 'flood299.com'])
+        self.assertAlmostEqual(digest['threat_score'], 0.599)
+
+    def test_force_flush(self):
+        self.aggregator.submit(alert('m1.com', 'MEDIUM', 0.6))
+        self.aggregator.submit(alert('m2.com', 'MEDIUM', 0.7))
+        digests = self.aggregator.flush(force=True)
+        self.assertEqual([(d['severity'], d['count']) for d in digests], [('MEDIUM', 1)])
+
+class TestTokenBucket(unittest.TestCase):
+    def test_refill(self):
+        clock = FakeClock()
+        bucket = TokenBucket(burst=1, rate=0.5, clock=clock)
+        self.assertTrue(bucket.try_take())
+        self.assertFalse(bucket.try_take())
+        clock.now = 2
+        self.assertTrue(bucket.try_take())
+
+if __name__ == '__main__':
+    unittest.main()
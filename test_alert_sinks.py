@@ -0,0 +1,104 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from unittest import mock
+from alert_sinks import AlertSink, BackgroundSink, JsonlFileSink, SyslogSink, encode_alert
+from monitor import ThreatMonitor
+
+def alert(target, severity='HIGH', score=0.9):
+    return {'type': 'domain_check', 'domain': target, 'severity': severity, 'threat_score': score,
+            'timestamp': datetime(2024, 1, 2, 3, 4, 5)}
+
+class RecordingSink(AlertSink):
+    def __init__(self, min_severity='LOW'):
+        super(RecordingSink, self).__init__(min_severity)
+        self.alerts = []
+
+    def emit(self, alert):
+        self.alerts.append(alert)
+
+class BlockedSink(AlertSink):
+    def __init__(self):
+        super(BlockedSink, self).__init__()
+        self.release = threading.Event()
+        self.received = 0
+
+    def emit(self, alert):
+        self.release.wait()
+        self.received += 1
+
+class TestAlertSinks(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'alerts.jsonl')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_encode_serializes_datetimes(self):
+        decoded = json.loads(encode_alert(alert('a.com')))
+        self.assertEqual(decoded['timestamp'], '2024-01-02T03:04:05')
+
+    def test_jsonl_sink_buffers_until_threshold(self):
+        sink = JsonlFileSink(self.path, flush_bytes=10 ** 6, flush_interval=3600)
+        sink.emit_many([alert('a.com'), alert('b.com')])
+        self.assertEqual(os.path.getsize(self.path), 0)
+        sink.close()
+        with open(self.path) as f:
+            self.assertEqual([json.loads(line)['domain'] for line in f], ['a.com', 'b.com'])
+
+    def test_jsonl_sink_rotates_by_size(self):
+        sink = JsonlFileSink(self.path, max_bytes=300, backup_count=2, flush_bytes=1)
+        for i in range(20):
+            sink.emit(alert(f'host{i}.com'))
+        sink.close()
+        self.assertGreater(sink.rotations, 0)
+        self.assertTrue(os.path.exists(self.path + '.1'))
+        self.assertTrue(os.path.exists(self.path + '.2'))
+        self.assertFalse(os.path.exists(self.path + '.3'))
+        self.assertLessEqual(os.path.getsize(self.path), 300)
+
+    def test_syslog_sink_sends_datagrams(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(('127.0.0.1', 0))
+        receiver.settimeout(5)
+        sink = SyslogSink(receiver.getsockname())
+        sink.emit_many([alert('low.com', 'LOW', 0.1), alert('a.com')])
+        message = receiver.recv(65536).decode('utf-8')
+        sink.close()
+        receiver.close()
+        self.assertTrue(message.startswith('<10>threat-detection: '))
+        self.assertIn('"domain":"a.com"', message)
+
+    def test_background_sink_never_blocks_on_slow_sink(self):
+        slow = BlockedSink()
+        background = BackgroundSink(slow, queue_size=10, batch_size=1)
+        started = time.perf_counter()
+        background.emit_many([alert(f'host{i}.com') for i in range(100)])
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertGreater(background.dropped, 0)
+        slow.release.set()
+        background.close()
+        self.assertEqual(slow.received + background.dropped, 100)
+
+    @mock.patch('monitor.AlertSystem')
+    def test_monitor_emits_to_all_sinks(self, mock_alert_system):
+        recorder = RecordingSink()
+        monitor = ThreatMonitor(sinks=[recorder])
+        alerts = monitor.process_events([
+            {'type': 'domain_check', 'timestamp': datetime.now(), 'domain': 'malware-site.com'},
+            {'type': 'ip_check', 'timestamp': datetime.now(), 'ip_address': '8.8.4.4'},
+        ])
+        self.assertEqual(recorder.alerts, alerts)
+        # Popups still only see medium and high alerts
+        shown = [call.args[0] for call in monitor.alert_system.show_alert.call_args_list]
+        self.assertEqual(shown, [a for a in alerts if a['severity'] in ('MEDIUM', 'HIGH')])
+        monitor.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest import mock
+from model import ThreatDetectionModel
+from monitor import ThreatMonitor
+
+INDICATORS = [
+    "45.227.253.214",
+    "malware-site.com",
+    "192.168.1.100",
+    "phishing-attempt.net",
+    "10.0.0.5",
+    "xkcdqwrtzp-free-login.biz",
+]
+
+class TestBatchScoring(unittest.TestCase):
+    def setUp(self):
+        """Build a monitor without opening any tkinter windows"""
+        patcher = mock.patch('monitor.AlertSystem')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.monitor = ThreatMonitor(batch_size=4)
+
+    def test_batch_matches_single(self):
+        """Batched predictions should match one-at-a-time predictions"""
+        model = self.monitor.model
+        batch = model.predict_threat_batch(INDICATORS, batch_size=4)
+        self.assertEqual(len(batch), len(INDICATORS))
+        for indicator, score in zip(INDICATORS, batch):
+            self.assertAlmostEqual(score, model.predict_threat(indicator), places=5)
+
+    def test_batch_empty(self):
+        """An empty batch scores to an empty list"""
+        self.assertEqual(ThreatDetectionModel().predict_threat_batch([]), [])
+
+    def test_process_events_order(self):
+        """process_events should return the same alerts as process_event, in order"""
+        events = []
+        for indicator in INDICATORS:
+            if self.monitor.model._is_ip(indicator):
+                events.append({'type': 'ip_check', 'ip_address': indicator})
+            else:
+                events.append({'type': 'domain_check', 'domain': indicator})
+
+        batch_alerts = self.monitor.process_events(events)
+        single_alerts = [self.monitor.process_event(event) for event in events]
+
+        self.assertEqual(len(batch_alerts), len(events))
+        for batch_alert, single_alert in zip(batch_alerts, single_alerts):
+            self.assertEqual(batch_alert.get('ip_address'), single_alert.get('ip_address'))
+            self.assertEqual(batch_alert.get('domain'), single_alert.get('domain'))
+            self.assertAlmostEqual(batch_alert['threat_score'], single_alert['threat_score'], places=5)
+
+if __name__ == '__main__':
+    unittest.main()
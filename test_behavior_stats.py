@@ -0,0 +1,85 @@
+import unittest
+from unittest import mock
+from behavior_stats import BehaviorStats, FLOOD_SCORE, SCAN_SCORE
+from monitor import ThreatMonitor
+
+SECOND = 10 ** 9
+START = 1700000000 * SECOND
+
+class TestBehaviorStats(unittest.TestCase):
+    def setUp(self):
+        self.stats = BehaviorStats(bucket_seconds=10, n_buckets=6, max_sources=1000)
+
+    def test_distinct_destination_estimate(self):
+        for i in range(5000):
+            self.stats.update('10.0.0.1', f'192.168.{i // 256}.{i % 256}', 80, 'TCP', 60, START + i * 1000)
+        summary = self.stats.summary('10.0.0.1')
+        self.assertAlmostEqual(summary['distinct_destinations'], 5000, delta=5000 * 0.3)
+        self.assertEqual(summary['packets'], 5000)
+        self.assertEqual(summary['protocol_mix']['TCP'], 1.0)
+
+    def test_port_scan_verdict(self):
+        for port in range(1, 1001):
+            self.stats.update('10.0.0.66', '10.0.0.5', port, 'TCP', 60, START + port * 10 ** 6)
+        score, reason = self.stats.verdict('10.0.0.66')
+        self.assertEqual(score, SCAN_SCORE)
+        self.assertIn('port scan', reason)
+
+    def test_flood_verdict_and_normal_traffic(self):
+        # 200k packets from one source to one endpoint within ten seconds
+        for i in range(2000):
+            self.stats.update('10.0.0.77', '10.0.0.5', 80, 'UDP', 100 * 512, START + i * 5 * 10 ** 6, packets=100)
+        self.assertEqual(self.stats.verdict('10.0.0.77')[0], FLOOD_SCORE)
+
+        for i in range(50):
+            self.stats.update('10.0.0.8', '10.0.0.5', 443, 'TCP', 1500, START + i * SECOND)
+        self.assertIsNone(self.stats.verdict('10.0.0.8'))
+        self.assertIsNone(self.stats.verdict('10.9.9.9'))
+
+    def test_window_slides_and_idle_sources_are_evicted(self):
+        for port in range(1, 500):
+            self.stats.update('10.0.0.66', '10.0.0.5', port, 'TCP', 60, START)
+        self.assertIsNotNone(self.stats.verdict('10.0.0.66'))
+        # Two minutes later the scan has left the 60s window
+        self.stats.update('10.0.0.8', '10.0.0.5', 443, 'TCP', 60, START + 120 * SECOND)
+        self.assertIsNone(self.stats.summary('10.0.0.66'))
+        self.stats.evict_idle()
+        self.assertNotIn('10.0.0.66', self.stats)
+        self.assertEqual(len(self.stats), 1)
+
+    def test_late_records_do_not_wipe_newer_buckets(self):
+        for port in range(1, 500):
+            self.stats.update('10.0.0.66', '10.0.0.5', port, 'TCP', 60, START + 100 * SECOND)
+        self.assertEqual(self.stats.verdict('10.0.0.66')[0], SCAN_SCORE)
+        # T+40s shares a ring slot with T+100s; flows arrive in insertion order, not time order
+        self.stats.update('10.0.0.66', '10.0.0.5', 22, 'TCP', 60, START + 40 * SECOND)
+        # Older than the whole window
+        self.stats.update('10.0.0.99', '10.0.0.5', 22, 'TCP', 60, START)
+        self.assertEqual(self.stats.verdict('10.0.0.66')[0], SCAN_SCORE)
+        self.assertEqual(self.stats.summary('10.0.0.66')['packets'], 499)
+        self.assertNotIn('10.0.0.99', self.stats)
+        self.assertEqual(self.stats.late, 2)
+
+        # A late record for a bucket still inside the window is kept
+        self.stats.update('10.0.0.66', '10.0.0.5', 22, 'TCP', 60, START + 90 * SECOND)
+        self.assertEqual(self.stats.summary('10.0.0.66')['packets'], 500)
+
+    def test_source_count_is_bounded(self):
+        for i in range(3000):
+            self.stats.update(f'10.1.{i // 256}.{i % 256}', '10.0.0.5', 80, 'TCP', 60, START)
+        self.assertEqual(len(self.stats), 1000)
+        self.assertEqual(self.stats.evicted, 2000)
+
+    @mock.patch('monitor.AlertSystem')
+    def test_monitor_raises_scanning_ip(self, mock_alert_system):
+        monitor = ThreatMonitor()
+        for port in range(1, 300):
+            monitor.collector.collect_network_data('8.8.4.4', f'10.0.{port}.1', 60, 'TCP')
+        event = {'type': 'ip_check', 'ip_address': '8.8.4.4'}
+        alert = monitor.process_events([event])[0]
+        self.assertEqual(alert['severity'], 'HIGH')
+        self.assertIn('port scan', alert['behavior'])
+        self.assertEqual(monitor.process_event(event)['severity'], 'HIGH')
+
+if __name__ == '__main__':
+    unittest.main()
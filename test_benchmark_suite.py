@@ -0,0 +1,32 @@
+import unittest
+from benchmarks.suite import CASES, compare, run_suite
+from benchmarks.synthetic import synthetic_events, synthetic_indicators
+
+class TestBenchmarkSuite(unittest.TestCase):
+    def test_synthetic_data_is_reproducible(self):
+        self.assertEqual(synthetic_indicators(500, seed=3), synthetic_indicators(500, seed=3))
+        kinds = {event['type'] for event in synthetic_events(500)}
+        self.assertEqual(kinds, {'ip_check', 'domain_check'})
+
+    def test_every_case_reports_all_metrics(self):
+        results = run_suite(scales=[200], samples=50, repeat=1, log=None)
+        self.assertEqual(set(results), set(CASES))
+        for scales in results.values():
+            result = scales['200']
+            self.assertGreater(result['throughput'], 0)
+            self.assertLessEqual(result['p50_us'], result['p99_us'])
+            self.assertGreaterEqual(result['peak_mb'], 0)
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        base = {'throughput': 1000.0, 'p50_us': 10.0, 'p99_us': 20.0, 'peak_mb': 50.0}
+        baseline = {'results': {'extract_features': {'1000': base}}}
+        within = dict(base, throughput=800.0, p99_us=35.0, peak_mb=60.0)
+        self.assertEqual(compare({'extract_features': {'1000': within}}, baseline), [])
+        worse = dict(base, throughput=700.0, p99_us=45.0, peak_mb=70.0)
+        regressions = compare({'extract_features': {'1000': worse}}, baseline)
+        self.assertEqual(len(regressions), 3)
+        # Scales without a baseline are not judged
+        self.assertEqual(compare({'extract_features': {'5': worse}}, baseline), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from bloom_filter import (BloomFilter, build_filter, count_missing, main, measure_false_positive_rate,
+                          optimal_parameters)
+from monitor import ThreatMonitor
+
+class TestBloomFilter(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.entries = [f'host{i}.blocked.example' for i in range(20000)]
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write_blocklist(self, name, lines):
+        path = os.path.join(self.directory, name)
+        opener = gzip.open if name.endswith('.gz') else open
+        with opener(path, 'wt') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+    def test_parameters_follow_target_rate(self):
+        bits, hashes = optimal_parameters(1000000, 0.001)
+        self.assertAlmostEqual(bits / 1000000, 14.38, places=1)
+        self.assertEqual(hashes, 10)
+        self.assertEqual(bits % 64, 0)
+        with self.assertRaises(ValueError):
+            optimal_parameters(10, 0)
+
+    def test_no_false_negatives_and_single_matches_batch(self):
+        bloom = BloomFilter.create(len(self.entries), 0.01)
+        bloom.add_many(self.entries)
+        self.assertTrue(bloom.contains_many(self.entries).all())
+        self.assertIn('HOST7.Blocked.Example.', bloom)
+        probes = [f'other{i}.example.org' for i in range(5000)]
+        batch = bloom.contains_many(probes)
+        self.assertEqual([probe in bloom for probe in probes], list(batch))
+
+    def test_false_positive_rate_near_target(self):
+        bloom = BloomFilter.create(len(self.entries), 0.01)
+        bloom.add_many(self.entries)
+        self.assertAlmostEqual(bloom.expected_fpr(), 0.01, places=3)
+        self.assertLess(measure_false_positive_rate(bloom, 100000), 0.015)
+
+    def test_build_and_mmap_open(self):
+        source = self.write_blocklist('list.txt.gz', ['# vendor feed'] + self.entries + ['10.0.0.0/8', '1.2.3.4 0.7'])
+        path = os.path.join(self.directory, 'list.bloom')
+        with mock.patch('builtins.print'):
+            built = build_filter([source], path, fpr=0.001, score=0.6)
+        self.assertEqual(len(built), len(self.entries) + 1)
+        bloom = BloomFilter.open(path)
+        try:
+            self.assertEqual((bloom.count, bloom.hashes, bloom.score), (built.count, built.hashes, 0.6))
+            self.assertIn('1.2.3.4', bloom)
+            self.assertNotIn('10.0.0.0/8', bloom)
+            self.assertEqual(count_missing(bloom, [source]), 0)
+            with self.assertRaises(ValueError):
+                bloom.add('new.example')  # Mapped read-only
+        finally:
+            bloom.close()
+        self.assertEqual(sorted(os.listdir(self.directory)), ['list.bloom', 'list.txt.gz'])
+
+    def test_open_rejects_other_files(self):
+        path = self.write_blocklist('not-a-filter.bloom', ['x' * 100])
+        with self.assertRaises(ValueError):
+            BloomFilter.open(path)
+
+    def test_cli_build_and_verify(self):
+        source = self.write_blocklist('list.txt', self.entries)
+        path = os.path.join(self.directory, 'list.bloom')
+        with mock.patch('builtins.print'):
+            self.assertEqual(main(['build', source, '-o', path, '--fpr', '0.01']), 0)
+            self.assertEqual(main(['verify', path, '--probes', '50000', '--source', source]), 0)
+            self.assertEqual(main(['info', path]), 0)
+
+    @mock.patch('monitor.AlertSystem')
+    def test_monitor_raises_listed_indicators(self, mock_alert_system):
+        source = self.write_blocklist('list.txt', self.entries)
+        path = os.path.join(self.directory, 'list.bloom')
+        with mock.patch('builtins.print'):
+            build_filter([source], path, fpr=0.001, score=0.5)
+        monitor = ThreatMonitor(blocklists=[path])
+        try:
+            events = [{'type': 'domain_check', 'domain': 'host3.blocked.example'},
+                      {'type': 'domain_check', 'domain': 'unlisted.example.com'}]
+            with mock.patch.object(monitor.model, 'predict_features', return_value=[0.1, 0.1]):
+                listed, unlisted = monitor.process_events(events)
+            self.assertEqual(listed['blocklist'], 'list.bloom')
+            self.assertEqual(listed['severity'], 'MEDIUM')
+            self.assertNotIn('blocklist', unlisted)
+            self.assertEqual(unlisted['severity'], 'LOW')
+
+            with mock.patch.object(monitor, '_score_indicator', return_value=0.1):
+                single = monitor.process_event(events[0])
+            self.assertEqual((single['blocklist'], single['threat_score']), ('list.bloom', 0.5))
+        finally:
+            monitor.close()
+
+if __name__ == '__main__':
+    unittest.main()
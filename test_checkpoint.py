@@ -0,0 +1,93 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import torch
+import features
+from checkpoint import CheckpointWatcher, load_checkpoint, save_checkpoint
+from model import ThreatDetectionModel
+from monitor import ThreatMonitor
+from numpy_model import NumpyThreatModel
+from test_features import random_indicators
+
+def trained_model(seed):
+    torch.manual_seed(seed)
+    model = ThreatDetectionModel()
+    model.eval()
+    model.set_feature_scaling(np.arange(features.NUM_FEATURES) * 0.1, np.full(features.NUM_FEATURES, 2.0))
+    return model
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'model.pt')
+        self.model = trained_model(0)
+        self.indicators = random_indicators(500)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_round_trip_keeps_weights_scaling_and_thresholds(self):
+        save_checkpoint(self.model, self.path, thresholds={'HIGH': 0.9})
+        checkpoint = load_checkpoint(self.path)
+        self.assertEqual(checkpoint.thresholds, {'HIGH': 0.9, 'MEDIUM': 0.5})
+        self.assertEqual(checkpoint.feature_version, features.FEATURE_VERSION)
+        loaded = checkpoint.build_model()
+        self.assertEqual(loaded.fingerprint(), self.model.fingerprint())
+        self.assertEqual(loaded.predict_threat_batch(self.indicators),
+                         self.model.predict_threat_batch(self.indicators))
+
+    def test_scaling_parity_with_numpy_export(self):
+        path = os.path.join(self.tmp.name, 'model.npz')
+        self.model.export_numpy(path)
+        numpy_model = load_checkpoint(path).build_model(engine='numpy')
+        self.assertEqual(numpy_model.fingerprint(), self.model.fingerprint())
+        np.testing.assert_allclose(numpy_model.predict_threat_batch(self.indicators),
+                                   self.model.predict_threat_batch(self.indicators), atol=1e-6)
+
+    def test_legacy_state_dict_loads_on_cpu(self):
+        plain = ThreatDetectionModel()
+        torch.save(plain.state_dict(), self.path)
+        with mock.patch('monitor.AlertSystem'):
+            monitor = ThreatMonitor(model_path=self.path)
+        self.assertEqual(monitor.model_version, plain.fingerprint())
+
+    def test_feature_version_mismatch_is_rejected(self):
+        save_checkpoint(self.model, self.path)
+        with mock.patch('checkpoint.FEATURE_VERSION', features.FEATURE_VERSION + 1):
+            with self.assertRaises(ValueError):
+                load_checkpoint(self.path)
+
+    @mock.patch('monitor.AlertSystem')
+    def test_reload_swaps_without_mixing_in_flight_batches(self, mock_alert_system):
+        save_checkpoint(self.model, self.path)
+        monitor = ThreatMonitor(model_path=self.path)
+        old_version = monitor.model_version
+        events = [{'type': 'domain_check', 'domain': indicator} for indicator in self.indicators[:50]]
+        batch = monitor.prepare_batch(events)
+
+        save_checkpoint(trained_model(1), self.path, thresholds={'HIGH': 0.95, 'MEDIUM': 0.6})
+        new_version = monitor.reload_model()
+        self.assertNotEqual(new_version, old_version)
+
+        # The batch prepared before the swap finishes entirely on the old model
+        alerts = monitor.finish_batch(monitor.infer_batch(batch))
+        expected = self.model.predict_threat_batch(batch.indicators)
+        self.assertEqual([alert['threat_score'] for alert in alerts], expected)
+        self.assertEqual(batch.version, old_version)
+        self.assertEqual(monitor.thresholds['HIGH'], 0.95)
+
+    @mock.patch('monitor.AlertSystem')
+    def test_watcher_reloads_replaced_checkpoint(self, mock_alert_system):
+        save_checkpoint(self.model, self.path)
+        monitor = ThreatMonitor(model_path=self.path)
+        watcher = CheckpointWatcher(self.path, monitor.reload_model, interval=3600)
+        self.assertFalse(watcher.poll())
+        replacement = trained_model(2)
+        save_checkpoint(replacement, self.path)
+        self.assertTrue(watcher.poll())
+        self.assertEqual(monitor.model_version, replacement.fingerprint())
+
+if __name__ == '__main__':
+    unittest.main()
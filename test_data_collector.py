@@ -0,0 +1,104 @@
+import unittest
+import numpy as np
+from data_collector import DataCollector
+from ring_buffer import RingBuffer, StringTable
+
+DTYPE = np.dtype([('value', 'i8')])
+
+def values(buffer, n=None):
+    return buffer.latest(n)['value'].tolist()
+
+class TestRingBuffer(unittest.TestCase):
+    def test_overwrite_keeps_newest(self):
+        buffer = RingBuffer(3, DTYPE)
+        for i in range(5):
+            buffer.append((i,))
+        self.assertEqual(values(buffer), [2, 3, 4])
+        self.assertEqual(values(buffer, 2), [3, 4])
+        self.assertEqual(buffer.overwritten, 2)
+
+    def test_drop_and_error_policies(self):
+        dropping = RingBuffer(2, DTYPE, overflow='drop')
+        for i in range(4):
+            dropping.append((i,))
+        self.assertEqual(values(dropping), [0, 1])
+        self.assertEqual(dropping.dropped, 2)
+
+        strict = RingBuffer(1, DTYPE, overflow='error')
+        strict.append((0,))
+        with self.assertRaises(BufferError):
+            strict.append((1,))
+        with self.assertRaises(ValueError):
+            RingBuffer(1, DTYPE, overflow='grow')
+
+    def test_extend_wraps_around(self):
+        buffer = RingBuffer(4, DTYPE)
+        buffer.extend(np.array([(0,), (1,), (2,)], dtype=DTYPE))
+        buffer.extend(np.array([(3,), (4,), (5,)], dtype=DTYPE))
+        self.assertEqual(values(buffer), [2, 3, 4, 5])
+        buffer.extend(np.array([(i,) for i in range(10)], dtype=DTYPE))
+        self.assertEqual(values(buffer), [6, 7, 8, 9])
+
+    def test_latest_is_a_view_when_contiguous(self):
+        buffer = RingBuffer(4, DTYPE)
+        for i in range(3):
+            buffer.append((i,))
+        self.assertTrue(np.shares_memory(buffer.latest(), buffer.data))
+        self.assertEqual(len(buffer.views()), 1)
+        buffer.append((3,))
+        buffer.append((4,))
+        self.assertEqual([part['value'].tolist() for part in buffer.views()], [[1, 2, 3], [4]])
+
+    def test_string_table(self):
+        table = StringTable()
+        ids = table.intern_many(['TCP', 'UDP', 'TCP'])
+        self.assertEqual(ids.tolist(), [0, 1, 0])
+        self.assertEqual(table.resolve(np.array([1, -1])).tolist(), ['UDP', None])
+
+    def test_string_table_compact(self):
+        table = StringTable()
+        ids = table.intern_many(['a', 'b', 'c', 'd'])
+        remap = table.compact(np.array([3, -1, 1, 3]))
+        self.assertEqual(remap[ids].tolist(), [-1, 0, -1, 1])
+        self.assertEqual(remap[-1], -1)
+        self.assertEqual(table.resolve(np.array([0, 1])).tolist(), ['b', 'd'])
+        self.assertEqual(table.intern('d'), 1)
+        self.assertEqual(table.intern('a'), 2)
+
+class TestDataCollector(unittest.TestCase):
+    def test_recent_data_frame(self):
+        collector = DataCollector(capacity=3)
+        collector.collect_network_data('192.168.1.1', '10.0.0.5', 1500, 'TCP')
+        collector.collect_log_data('admin', 'login', '/admin')
+        collector.collect_network_data('192.168.1.2', '10.0.0.6', 60, 'UDP')
+        collector.collect_network_data('192.168.1.3', '10.0.0.7', 40, 'TCP')
+
+        frame = collector.get_recent_data(10)
+        self.assertEqual(len(frame), 3)
+        self.assertEqual(frame['type'].tolist(), ['log', 'network', 'network'])
+        self.assertEqual(frame['source_ip'].tolist()[1:], ['192.168.1.2', '192.168.1.3'])
+        self.assertEqual(frame['user'].tolist()[0], 'admin')
+        self.assertTrue(np.isnan(frame['packet_size'].tolist()[0]))
+
+        frame = collector.get_recent_data(2)
+        self.assertEqual(list(frame.columns),
+                         ['timestamp', 'source_ip', 'dest_ip', 'packet_size', 'protocol', 'type'])
+        self.assertEqual(frame['packet_size'].tolist(), [60, 40])
+
+    def test_string_table_stays_bounded(self):
+        collector = DataCollector(capacity=50)
+        for i in range(5000):
+            collector.collect_network_data(f'10.{i // 256 % 256}.{i % 256}.1', '192.168.0.1', 60, 'TCP')
+            if i % 7 == 0:
+                collector.collect_log_data(f'user{i}', 'login', f'/home/{i}')
+        self.assertLessEqual(len(collector.strings), collector.string_limit)
+        self.assertGreater(collector.compactions, 0)
+
+        frame = collector.get_recent_data(50)
+        self.assertEqual(frame['source_ip'].tolist()[-1], '10.19.135.1')
+        self.assertEqual(frame['dest_ip'].dropna().unique().tolist(), ['192.168.0.1'])
+        self.assertEqual(frame['user'].dropna().tolist()[-1], 'user4998')
+        self.assertEqual(frame['resource'].dropna().tolist()[-1], '/home/4998')
+
+if __name__ == '__main__':
+    unittest.main()
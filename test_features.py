@@ -0,0 +1,70 @@
+import random
+import string
+import unittest
+import numpy as np
+import features
+
+EDGE_CASES = [
+    "45.227.253.214",
+    "192.168.1.100",
+    "10.0.0.5",
+    "0.0.0.0",
+    "255.255.255.255",
+    "1.2.3.256",        # Out of range octet, treated as a domain
+    "1..2.3",           # Empty octet, treated as a domain
+    "001.002.003.004",  # Leading zeros still parse as an IP
+    "0001.2.3.4",       # Longer than a canonical dotted quad
+    " 1.2.3.4",         # int() tolerates whitespace
+    "malware-site.com",
+    "Secure-LOGIN.bank.example",
+    "xkcdqwrtzp_free.biz",
+    "a",
+    "b.c.d.e",
+    "münchen.de",       # Non-ASCII falls back to the scalar path
+    "2001:db8::1",
+]
+
+def random_indicators(count, seed=1234):
+    """Generate a mix of random IPs and domain-like strings"""
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + '-_.'
+    indicators = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            indicators.append('.'.join(str(rng.randint(0, 255)) for _ in range(4)))
+        else:
+            indicators.append(''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 60))))
+    return indicators
+
+class TestFeatureEngine(unittest.TestCase):
+    def assert_matches_scalar(self, indicators, chunk_size=4096):
+        batch = features.extract_features_batch(indicators, chunk_size=chunk_size)
+        self.assertEqual(batch.shape, (len(indicators), features.NUM_FEATURES))
+        self.assertEqual(batch.dtype, np.float32)
+        for indicator, row in zip(indicators, batch):
+            expected = np.array(features.extract_features(indicator), dtype=np.float32)
+            np.testing.assert_allclose(row, expected, rtol=1e-5, atol=1e-5, err_msg=indicator)
+
+    def test_edge_cases_match_scalar(self):
+        """Columnar extraction should agree with the scalar path on edge cases"""
+        self.assert_matches_scalar(EDGE_CASES)
+
+    def test_random_indicators_match_scalar(self):
+        """Columnar extraction should agree with the scalar path across chunks"""
+        self.assert_matches_scalar(random_indicators(2000), chunk_size=512)
+
+    def test_ip_classification(self):
+        """Feature rows should follow the same IP/domain split as is_ip"""
+        batch = features.extract_features_batch(["1.2.3.256", "1.2.3.4"])
+        self.assertEqual(batch[0][0], len("1.2.3.256"))
+        self.assertAlmostEqual(batch[1][0], 2.5)
+
+    def test_empty_string_raises_like_scalar(self):
+        """Empty strings should fail the same way as the scalar path"""
+        with self.assertRaises(ZeroDivisionError):
+            features.extract_features("")
+        with self.assertRaises(ZeroDivisionError):
+            features.extract_features_batch(["ok.com", ""])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import gzip
+import os
+import tempfile
+import unittest
+from unittest import mock
+import contextlib
+import io
+from feed_stream import iter_chunks, iter_feed_events, make_event
+from monitor import ThreatMonitor
+
+class TestFeedStream(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def path(self, name):
+        return os.path.join(self.tmpdir.name, name)
+
+    def test_gzipped_text_feed(self):
+        path = self.path('feed.txt.gz')
+        with gzip.open(path, 'wt') as f:
+            f.write("# comment\n45.227.253.214\n\nmalware-site.com  # trailing\n")
+        self.assertEqual(list(iter_feed_events(path)), [
+            {'type': 'ip_check', 'ip_address': '45.227.253.214'},
+            {'type': 'domain_check', 'domain': 'malware-site.com'},
+        ])
+
+    def test_jsonl_feed(self):
+        path = self.path('feed.jsonl')
+        with open(path, 'w') as f:
+            f.write('"10.0.0.5"\n{"domain": "evil.com"}\nnot json\n{"indicator": "bad.net"}\n')
+        self.assertEqual(list(iter_feed_events(path)), [
+            {'type': 'ip_check', 'ip_address': '10.0.0.5'},
+            {'type': 'domain_check', 'domain': 'evil.com'},
+            {'type': 'domain_check', 'domain': 'bad.net'},
+        ])
+
+    def test_records_without_an_indicator_are_skipped(self):
+        text = self.path('feed.txt')
+        with open(text, 'w') as f:
+            f.write('.\n...  # dots only\nevil.com\n')
+        jsonl = self.path('feed.jsonl')
+        with open(jsonl, 'w') as f:
+            f.write('""\n"."\n42\n{"indicator": 42}\n{"ip": null}\n{"domain": ""}\n'
+                    '{"indicator": ["a.com"]}\n{"ip": "10.0.0.5"}\n')
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            self.assertEqual(list(iter_feed_events(text)), [{'type': 'domain_check', 'domain': 'evil.com'}])
+            self.assertEqual(list(iter_feed_events(jsonl)), [{'type': 'ip_check', 'ip_address': '10.0.0.5'}])
+        self.assertEqual(log.getvalue().count('Skipping feed'), 9)
+        for value in ('', '.', ' . ', None, 42):
+            with self.assertRaises(ValueError):
+                make_event(value)
+
+    def test_monitor_scores_around_invalid_records(self):
+        path = self.path('feed.jsonl')
+        with open(path, 'w') as f:
+            f.write('"good.example.com"\n"."\n{"indicator": 42}\n{"ip": "10.0.0.9"}\n')
+        monitor = ThreatMonitor(headless=True)
+        self.addCleanup(monitor.close)
+        with contextlib.redirect_stdout(io.StringIO()):
+            alerts = list(monitor.process_feed(path))
+        self.assertEqual([a.get('domain', a.get('ip_address')) for a in alerts], ['good.example.com', '10.0.0.9'])
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            list(iter_feed_events(self.path('feed.xml')))
+
+    def test_iter_chunks(self):
+        self.assertEqual(list(iter_chunks(range(5), 2)), [[0, 1], [2, 3], [4]])
+
+    def test_monitor_process_feed(self):
+        """process_feed should score a feed lazily in batch_size chunks"""
+        path = self.path('feed.txt')
+        with open(path, 'w') as f:
+            f.write('\n'.join(f'10.0.0.{i}' for i in range(10)))
+        with mock.patch('monitor.AlertSystem'):
+            monitor = ThreatMonitor(batch_size=4)
+        with mock.patch.object(monitor.model, 'predict_features',
+                               side_effect=lambda features, batch_size: [0.1] * len(features)) as predict:
+            alerts = list(monitor.process_feed(path))
+        self.assertEqual([len(call.args[0]) for call in predict.call_args_list], [4, 4, 2])
+        self.assertEqual([a['ip_address'] for a in alerts], [f'10.0.0.{i}' for i in range(10)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,29 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+import headless
+from benchmarks.startup import time_to_first_verdict
+
+class TestHeadless(unittest.TestCase):
+    def test_first_verdict_skips_gui_and_heavy_imports(self):
+        """The headless path must not import tkinter, pystray, PIL, pandas or sklearn"""
+        elapsed, result = time_to_first_verdict()
+        self.assertEqual(result['loaded'], [])
+        self.assertIn(result['severity'], ['LOW', 'MEDIUM', 'HIGH'])
+
+    def test_single_cycle(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            feed = os.path.join(tmpdir, 'threat_intel.json')
+            with open(feed, 'w') as f:
+                json.dump({'malicious_ips': ['45.227.253.214'], 'malicious_domains': ['example.org']}, f)
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                headless.main(['--once', '--feed', feed, '--interval', '0'])
+        self.assertIn('[HIGH] 45.227.253.214', output.getvalue())
+        self.assertIn('Threat Check #1 complete: 2 scored', output.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import ipaddress
+import random
+import unittest
+from unittest import mock
+from indicator_index import CidrTrie, DomainSuffixTrie, IndicatorIndex
+from monitor import ThreatMonitor
+
+class TestCidrTrie(unittest.TestCase):
+    def test_longest_prefix_wins(self):
+        index = IndicatorIndex()
+        index.update({'10.0.0.0/8': 0.5, '10.1.0.0/16': 0.7, '10.1.2.3': 0.99})
+        self.assertEqual(index.lookup('10.200.0.1'), 0.5)
+        self.assertEqual(index.lookup('10.1.9.9'), 0.7)
+        self.assertEqual(index.lookup('10.1.2.3'), 0.99)
+        self.assertIsNone(index.lookup('11.0.0.1'))
+        self.assertEqual(len(index), 3)
+
+    def test_ipv6(self):
+        index = IndicatorIndex()
+        index.add('2001:db8:bad::/48', 0.85)
+        self.assertEqual(index.lookup('2001:db8:bad::1'), 0.85)
+        self.assertIsNone(index.lookup('2001:db8:beef::1'))
+
+    def test_matches_brute_force(self):
+        """Random nested prefixes agree with a linear longest-prefix scan"""
+        rng = random.Random(7)
+        trie = CidrTrie(32)
+        networks = []
+        for _ in range(300):
+            network = ipaddress.ip_network(
+                (rng.choice([0x0A000000, 0xC0A80000, rng.getrandbits(32)]) | rng.getrandbits(12),
+                 rng.randint(4, 32)), strict=False)
+            score = rng.random()
+            networks = [(n, s) for n, s in networks if n != network] + [(network, score)]
+            trie.insert(int(network.network_address), network.prefixlen, score)
+        for _ in range(2000):
+            address = ipaddress.ip_address(rng.choice([0x0A000000, 0xC0A80000, 0]) | rng.getrandbits(16))
+            matches = [(n.prefixlen, s) for n, s in networks if address in n]
+            expected = max(matches)[1] if matches else None
+            self.assertEqual(trie.lookup(int(address)), expected)
+
+class TestDomainSuffixTrie(unittest.TestCase):
+    def test_subdomains_match_parent(self):
+        trie = DomainSuffixTrie()
+        trie.insert('botnet-cc.net', 0.9)
+        trie.insert('cdn.botnet-cc.net', 0.6)
+        self.assertEqual(trie.lookup('botnet-cc.net'), 0.9)
+        self.assertEqual(trie.lookup('evil.sub.botnet-cc.net'), 0.9)
+        self.assertEqual(trie.lookup('x.cdn.botnet-cc.net'), 0.6)
+        self.assertIsNone(trie.lookup('notbotnet-cc.net'))
+        self.assertIsNone(trie.lookup('net'))
+
+class TestMonitorIndex(unittest.TestCase):
+    def test_known_indicators_skip_the_model(self):
+        with mock.patch('monitor.AlertSystem'):
+            monitor = ThreatMonitor()
+        with mock.patch.object(monitor.model, 'predict_threat') as predict:
+            alert = monitor.process_event({'type': 'domain_check', 'domain': 'evil.sub.botnet-cc.net'})
+            predict.assert_not_called()
+        self.assertEqual(alert['threat_score'], 0.9)
+        self.assertEqual(alert['severity'], 'HIGH')
+
+if __name__ == '__main__':
+    unittest.main()
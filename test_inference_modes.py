@@ -0,0 +1,55 @@
+import unittest
+from unittest import mock
+import numpy as np
+from model import ThreatDetectionModel
+from monitor import ThreatMonitor
+from test_features import EDGE_CASES, random_indicators
+
+class TestInferenceModes(unittest.TestCase):
+    def setUp(self):
+        self.model = ThreatDetectionModel()
+        self.model.eval()
+        self.indicators = random_indicators(1000) + EDGE_CASES
+        self.expected = self.model.predict_threat_batch(self.indicators)
+
+    def test_traced_matches_float(self):
+        self.model.set_inference_mode('traced')
+        np.testing.assert_allclose(self.model.predict_threat_batch(self.indicators), self.expected, atol=1e-5)
+        self.assertAlmostEqual(self.model.predict_threat(self.indicators[0]), self.expected[0], places=5)
+
+    def test_int8_stays_close_to_float(self):
+        self.model.set_inference_mode('int8')
+        scores = self.model.predict_threat_batch(self.indicators)
+        self.assertLess(np.abs(np.array(scores) - self.expected).max(), 0.25)
+
+    def test_optimized_copy_is_not_part_of_state(self):
+        keys = list(self.model.state_dict())
+        fingerprint = self.model.fingerprint()
+        self.model.set_inference_mode('int8')
+        self.assertEqual(list(self.model.state_dict()), keys)
+        self.assertEqual(self.model.fingerprint(), fingerprint + '-int8')
+
+    def test_reloading_weights_rebuilds_optimized_copy(self):
+        self.model.set_inference_mode('traced')
+        other = ThreatDetectionModel()
+        other.eval()
+        self.model.load_state_dict(other.state_dict())
+        np.testing.assert_allclose(self.model.predict_threat_batch(self.indicators),
+                                   other.predict_threat_batch(self.indicators), atol=1e-5)
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.model.set_inference_mode('fp16')
+
+    @mock.patch('monitor.AlertSystem')
+    def test_monitor_inference_option(self, mock_alert_system):
+        monitor = ThreatMonitor(inference='int8')
+        self.assertEqual(monitor.model.inference_mode, 'int8')
+        self.assertTrue(monitor.model_version.endswith('-int8'))
+        alert = monitor.process_event({'type': 'domain_check', 'domain': 'example-unknown.org'})
+        self.assertIn(alert['severity'], ['LOW', 'MEDIUM', 'HIGH'])
+        with self.assertRaises(ValueError):
+            ThreatMonitor(engine='numpy', inference='int8')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import urllib.error
+import urllib.request
+from unittest import mock
+import metrics
+from metrics import MetricsServer, Registry
+from monitor import ThreatMonitor
+
+class TestMetrics(unittest.TestCase):
+    def setUp(self):
+        self.registry = Registry()
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = self.registry.histogram('stage_seconds', 'Stage time', ['stage'], buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.labels('inference').observe(value)
+        text = self.registry.render()
+        self.assertIn('# TYPE stage_seconds histogram', text)
+        self.assertIn('stage_seconds_bucket{stage="inference",le="0.1"} 2', text)
+        self.assertIn('stage_seconds_bucket{stage="inference",le="1.0"} 3', text)
+        self.assertIn('stage_seconds_bucket{stage="inference",le="+Inf"} 4', text)
+        self.assertIn('stage_seconds_count{stage="inference"} 4', text)
+        self.assertIn('stage_seconds_sum{stage="inference"} 3.65', text)
+
+    def test_counters_and_gauges(self):
+        events = self.registry.counter('events_total', 'Events')
+        events.inc()
+        events.inc(41)
+        with self.assertRaises(ValueError):
+            events.inc(-1)
+        depth = self.registry.gauge('queue_depth', 'Queue depth', ['queue'])
+        items = [1, 2, 3]
+        depth.labels('alerts').set_function(lambda: len(items))
+        depth.labels('sink').set(7)
+        text = self.registry.render()
+        self.assertIn('events_total 42', text)
+        self.assertIn('queue_depth{queue="alerts"} 3', text)
+        self.assertIn('queue_depth{queue="sink"} 7', text)
+        self.assertIs(self.registry.counter('events_total', 'Events'), events)
+        with self.assertRaises(ValueError):
+            self.registry.gauge('events_total', 'Events')
+
+    def test_server_serves_metrics_on_localhost(self):
+        self.registry.counter('scrapes_total', 'Scrapes').inc()
+        server = MetricsServer(self.registry, port=0).start()
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{server.port}/metrics') as response:
+                self.assertIn('text/plain', response.headers['Content-Type'])
+                self.assertIn('scrapes_total 1', response.read().decode())
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen(f'http://127.0.0.1:{server.port}/other')
+        finally:
+            server.stop()
+
+    @mock.patch('monitor.AlertSystem')
+    def test_monitor_records_stages_and_severities(self, mock_alert_system):
+        monitor = ThreatMonitor()
+        inference = metrics.STAGE_SECONDS.labels('inference')
+        before_events, before_batches = metrics.EVENTS.labels().value, inference.counts[:]
+        events = [{'type': 'domain_check', 'domain': f'host{i}.example.com'} for i in range(10)]
+        alerts = monitor.process_events(events)
+        self.assertEqual(metrics.EVENTS.labels().value - before_events, 10)
+        self.assertEqual(sum(inference.counts) - sum(before_batches), 1)
+        severity = alerts[0]['severity']
+        self.assertIn(f'threat_alerts_total{{severity="{severity}"}}', metrics.REGISTRY.render())
+        monitor.close()
+
+    @mock.patch('monitor.AlertSystem')
+    def test_single_event_inference_excludes_cache_hits(self, mock_alert_system):
+        monitor = ThreatMonitor()
+        self.addCleanup(monitor.close)
+        inference = metrics.STAGE_SECONDS.labels('inference')
+        event = {'type': 'domain_check', 'domain': 'single.example.com'}
+        before = sum(inference.counts)
+        monitor.process_event(event)
+        monitor.process_event(dict(event))
+        monitor.process_event({'type': 'domain_check', 'domain': 'phishing-attempt.net'})
+        self.assertEqual(sum(inference.counts) - before, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import struct
+import tempfile
+import unittest
+from benchmarks.pcap_replay import write_synthetic_capture
+from data_collector import DataCollector, TYPE_NETWORK
+from network_monitor import FlowTable, NetworkMonitor
+from pcap_reader import LINKTYPE_ETHERNET, PcapFormatError, PcapReader, parse_packet
+
+def ipv4_frame(src, dst, sport, dport, protocol=6, vlan=False):
+    transport = struct.pack('!HH', sport, dport) + b'\0' * 16
+    ip = struct.pack('!BBHHHBBH4s4s', 0x45, 0, 20 + len(transport), 0, 0, 64, protocol, 0,
+                     bytes(map(int, src.split('.'))), bytes(map(int, dst.split('.'))))
+    tag = struct.pack('!HH', 0x8100, 7) if vlan else b''
+    return b'\x02' * 12 + tag + struct.pack('!H', 0x0800) + ip + transport
+
+def write_pcap(path, frames, start=1700000000):
+    with open(path, 'wb') as f:
+        f.write(struct.pack('<IHHiIII', 0xa1b2c3d4, 2, 4, 0, 0, 65535, 1))
+        for i, frame in enumerate(frames):
+            f.write(struct.pack('<IIII', start + i, 0, len(frame), len(frame)) + frame)
+
+class TestNetworkMonitor(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parse_ipv4_with_vlan(self):
+        frame = ipv4_frame('10.0.0.1', '192.168.1.5', 40000, 443, vlan=True)
+        version, src, dst, protocol, sport, dport = parse_packet(frame, 0, len(frame), LINKTYPE_ETHERNET)
+        self.assertEqual((version, protocol, sport, dport), (4, 6, 40000, 443))
+        self.assertEqual(src, 0x0a000001)
+
+    def test_truncated_and_non_ip_frames_are_skipped(self):
+        frame = ipv4_frame('10.0.0.1', '10.0.0.2', 1, 2)
+        self.assertIsNone(parse_packet(frame, 0, 20, LINKTYPE_ETHERNET))
+        arp = b'\x02' * 12 + struct.pack('!H', 0x0806) + b'\0' * 28
+        self.assertIsNone(parse_packet(arp, 0, len(arp), LINKTYPE_ETHERNET))
+
+    def test_replay_aggregates_flows_into_collector(self):
+        path = os.path.join(self.tmp.name, 'small.pcap')
+        frames = [ipv4_frame('10.0.0.1', '10.0.0.2', 5000, 80)] * 3 + \
+                 [ipv4_frame('10.0.0.3', '10.0.0.2', 5001, 53, protocol=17)]
+        write_pcap(path, frames)
+        collector = DataCollector(capacity=10)
+        stats = NetworkMonitor(collector).replay(path)
+        self.assertEqual((stats['packets'], stats['flows'], stats['skipped']), (4, 2, 0))
+
+        records = collector.get_recent_records(10)
+        self.assertTrue((records['type'] == TYPE_NETWORK).all())
+        by_port = {int(r['dest_port']): r for r in records}
+        self.assertEqual(int(by_port[80]['packets']), 3)
+        self.assertEqual(int(by_port[80]['packet_size']), 3 * len(frames[0]))
+        self.assertEqual(collector.strings.resolve(by_port[53]['protocol']), 'UDP')
+        self.assertEqual(collector.strings.resolve(by_port[53]['source_ip']), '10.0.0.3')
+
+    def test_pcap_and_pcapng_give_the_same_flows(self):
+        results = []
+        for format in ('pcap', 'pcapng'):
+            path = os.path.join(self.tmp.name, f'synthetic.{format}')
+            write_synthetic_capture(path, packets=5000, flows=200, format=format, ipv6_fraction=0.3)
+            collector = DataCollector(capacity=1000)
+            stats = NetworkMonitor(collector).replay(path)
+            records = collector.get_recent_records(1000)
+            results.append((stats['packets'], stats['bytes'], len(records), int(records['packets'].sum())))
+        self.assertEqual(results[0], results[1])
+        self.assertEqual(results[0][0], 5000)
+        self.assertEqual(results[0][3], 5000)
+
+    def test_idle_flows_expire(self):
+        table = FlowTable(idle_timeout=10)
+        table.add((4, 1, 2, 6, 1000, 80), 0, 100)
+        table.add((4, 1, 3, 6, 1000, 80), 20 * 10 ** 9, 100)
+        expired = table.expire(25 * 10 ** 9)
+        self.assertEqual([flow.dest_ip for flow in expired], ['0.0.0.2'])
+        self.assertEqual(len(table), 1)
+
+    def test_rejects_non_capture_files(self):
+        path = os.path.join(self.tmp.name, 'not.pcap')
+        with open(path, 'wb') as f:
+            f.write(b'x' * 64)
+        with self.assertRaises(PcapFormatError):
+            PcapReader(path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from benchmarks.startup import time_to_first_verdict
+from model import ThreatDetectionModel
+from monitor import ThreatMonitor
+from numpy_model import NumpyThreatModel
+from test_features import EDGE_CASES, random_indicators
+
+class TestNumpyModel(unittest.TestCase):
+    def setUp(self):
+        self.torch_model = ThreatDetectionModel()
+        self.torch_model.eval()
+        self.numpy_model = NumpyThreatModel(self.torch_model.state_dict())
+        self.indicators = random_indicators(2000) + EDGE_CASES
+
+    def test_batch_parity_with_torch(self):
+        expected = self.torch_model.predict_threat_batch(self.indicators, batch_size=512)
+        actual = self.numpy_model.predict_threat_batch(self.indicators, batch_size=512)
+        np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+    def test_single_parity_with_torch(self):
+        for indicator in self.indicators[:50] + EDGE_CASES:
+            self.assertAlmostEqual(self.numpy_model.predict_threat(indicator),
+                                   self.torch_model.predict_threat(indicator), places=6)
+
+    def test_npz_export_round_trip(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'model.npz')
+            self.torch_model.export_numpy(path)
+            loaded = NumpyThreatModel.load(path)
+        self.assertEqual(loaded.fingerprint(), self.torch_model.fingerprint())
+        np.testing.assert_array_equal(loaded.predict_threat_batch(self.indicators),
+                                      self.numpy_model.predict_threat_batch(self.indicators))
+
+    @mock.patch('monitor.AlertSystem')
+    def test_monitor_numpy_engine(self, mock_alert_system):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'model.npz')
+            self.torch_model.export_numpy(path)
+            monitor = ThreatMonitor(model_path=path, engine='numpy')
+        events = [{'type': 'domain_check', 'domain': 'example-unknown.org'},
+                  {'type': 'ip_check', 'ip_address': '8.8.4.4'}]
+        alerts = monitor.process_events(events)
+        expected = self.torch_model.predict_threat_batch(['example-unknown.org', '8.8.4.4'])
+        np.testing.assert_allclose([alert['threat_score'] for alert in alerts], expected, atol=1e-6)
+        self.assertEqual(monitor.model_version, self.torch_model.fingerprint())
+
+    def test_numpy_engine_does_not_import_torch(self):
+        elapsed, result = time_to_first_verdict(engine='numpy')
+        self.assertEqual(result['loaded'], [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from unittest import mock
+import numpy as np
+from model import ThreatDetectionModel
+from monitor import ThreatMonitor
+from parallel_scoring import ParallelScorer
+from test_features import random_indicators
+
+class TestParallelScoring(unittest.TestCase):
+    def test_matches_in_process_scores_in_order(self):
+        model = ThreatDetectionModel()
+        model.eval()
+        indicators = random_indicators(1000, seed=99)
+        expected = np.array(model.predict_threat_batch(indicators), dtype=np.float32)
+        with ParallelScorer(model.state_dict(), workers=2, chunk_size=300, min_chunk_size=100) as scorer:
+            first = scorer.score(indicators)
+            second = scorer.score(indicators)
+            self.assertEqual(len(scorer.score([])), 0)
+        np.testing.assert_allclose(first, expected, rtol=1e-5, atol=1e-6)
+        np.testing.assert_array_equal(first, second)
+
+    def test_indicators_containing_nul_keep_their_slots(self):
+        model = ThreatDetectionModel()
+        model.eval()
+        indicators = random_indicators(602, seed=7)
+        indicators[10] = 'b\0c.com'
+        expected = np.array(model.predict_threat_batch(indicators), dtype=np.float32)
+        with ParallelScorer(model.state_dict(), workers=2, chunk_size=300, min_chunk_size=100) as scorer:
+            scores = scorer.score(indicators)
+        self.assertEqual(len(scores), 602)
+        np.testing.assert_allclose(scores, expected, rtol=1e-5, atol=1e-6)
+
+    def test_monitor_parallel_mode(self):
+        with mock.patch('monitor.AlertSystem'):
+            monitor = ThreatMonitor(workers=2, cache_size=0)
+        self.addCleanup(monitor.close_workers)
+        events = [{'type': 'domain_check', 'domain': domain}
+                  for domain in random_indicators(50, seed=5) if not monitor.model._is_ip(domain)]
+        parallel = monitor.process_events(events)
+        monitor.workers = 1
+        serial = monitor.process_events(events)
+        for a, b in zip(parallel, serial):
+            self.assertEqual(a['domain'], b['domain'])
+            self.assertAlmostEqual(a['threat_score'], b['threat_score'], places=5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import asyncio
+import time
+import unittest
+from unittest import mock
+from monitor import ThreatMonitor
+from pipeline import ScoringPipeline
+from threat_feeds import FeedUpdate
+
+class StaticLoader:
+    """Feed loader that reports the same indicators as new on its first load only"""
+
+    def __init__(self, ips, domains):
+        self.ips = ips
+        self.domains = domains
+        self.loads = 0
+
+    def load(self):
+        self.loads += 1
+        if self.loads == 1:
+            return FeedUpdate(self.ips, self.domains, added_ips=self.ips,
+                              added_domains=self.domains, changed=True)
+        return FeedUpdate(self.ips, self.domains)
+
+class TestScoringPipeline(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = mock.patch('monitor.AlertSystem')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.monitor = ThreatMonitor(batch_size=3)
+        self.ips = [f'10.1.0.{i}' for i in range(7)]
+        self.domains = ['malware-site.com', 'example.org']
+        self.alerts = []
+        self.cycles = []
+
+    def make_pipeline(self, **kwargs):
+        return ScoringPipeline(
+            self.monitor, StaticLoader(self.ips, self.domains), interval=0.05,
+            on_alert=self.alerts.append,
+            on_cycle=lambda cycle, stats: self.cycles.append((cycle, dict(stats))),
+            **kwargs
+        )
+
+    async def wait_for_cycles(self, pipeline, count, timeout=10):
+        deadline = time.monotonic() + timeout
+        while pipeline.cycles_completed < count:
+            self.assertLess(time.monotonic(), deadline, "pipeline did not complete cycles")
+            await asyncio.sleep(0.01)
+
+    async def test_alerts_in_feed_order(self):
+        pipeline = self.make_pipeline()
+        task = asyncio.create_task(pipeline.run())
+        await self.wait_for_cycles(pipeline, 2)
+        pipeline.stop()
+        await asyncio.wait_for(task, 5)
+
+        targets = [a.get('ip_address') or a.get('domain') for a in self.alerts]
+        self.assertEqual(targets, self.ips + self.domains)
+        self.assertEqual(self.cycles[0][1]['alerts'], 9)
+        self.assertEqual(self.cycles[1][1]['alerts'], 0)
+        self.assertGreaterEqual(self.cycles[0][1]['HIGH'], 1)
+
+    async def test_backpressure_with_slow_dispatch(self):
+        """A slow alert handler makes upstream stages wait on the bounded queues"""
+        def slow_alert(alert):
+            time.sleep(0.01)
+            self.alerts.append(alert)
+
+        pipeline = self.make_pipeline(queue_size=1, chunk_size=1)
+        pipeline.on_alert = slow_alert
+        task = asyncio.create_task(pipeline.run())
+        await self.wait_for_cycles(pipeline, 1)
+        pipeline.stop()
+        await asyncio.wait_for(task, 5)
+        self.assertEqual(len(self.alerts), 9)
+        self.assertGreater(pipeline.backpressure_waits, 0)
+
+    async def test_cancellation(self):
+        pipeline = self.make_pipeline()
+        task = asyncio.create_task(pipeline.run())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 5)
+
+class TestPipelineThread(unittest.TestCase):
+    def test_start_and_stop_in_thread(self):
+        with mock.patch('monitor.AlertSystem'):
+            monitor = ThreatMonitor()
+        alerts = []
+        pipeline = ScoringPipeline(monitor, StaticLoader(['10.0.0.1'], []), interval=0.05,
+                                   on_alert=alerts.append, on_cycle=None)
+        thread = pipeline.start()
+        deadline = time.monotonic() + 10
+        while not alerts and time.monotonic() < deadline:
+            time.sleep(0.01)
+        pipeline.stop(timeout=5)
+        self.assertFalse(thread.is_alive())
+        self.assertEqual(len(alerts), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import contextlib
+import cProfile
+import io
+import os
+import pstats
+import signal
+import tempfile
+import time
+import unittest
+from unittest import mock
+from monitor import ThreatMonitor
+from pipeline import ScoringPipeline
+from profiling import CycleProfiler, install_signal_handlers
+from test_pipeline import StaticLoader
+
+class ExclusiveProfile(cProfile.Profile):
+    """cProfile as on Python 3.12+: enabling a second profiler raises ValueError"""
+    active = 0
+
+    def enable(self, *args, **kwargs):
+        if ExclusiveProfile.active:
+            raise ValueError("Another profiling tool is already active")
+        ExclusiveProfile.active += 1
+        super().enable(*args, **kwargs)
+
+    def disable(self):
+        super().disable()
+        ExclusiveProfile.active -= 1
+
+class FailingProfile(cProfile.Profile):
+    def enable(self, *args, **kwargs):
+        raise ValueError("Another profiling tool is already active")
+
+class TestCycleProfiler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        patcher = mock.patch('monitor.AlertSystem')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.monitor = ThreatMonitor(batch_size=3)
+        self.profiler = CycleProfiler(self.tmp.name, top=5)
+
+    async def run_cycles(self, count):
+        ips = [f'10.2.0.{i}' for i in range(7)]
+        pipeline = ScoringPipeline(self.monitor, StaticLoader(ips, ['example.org']), interval=0.05,
+                                   on_alert=None, on_cycle=None, max_cycles=count, profiler=self.profiler)
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            await asyncio.wait_for(pipeline.run(), 10)
+        return log.getvalue()
+
+    async def test_idle_profiler_writes_nothing(self):
+        await self.run_cycles(2)
+        self.assertFalse(self.profiler.profiling)
+        self.assertEqual(self.profiler.written, [])
+
+    async def test_profile_of_the_next_cycle(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.profiler.request_profile()
+        log = await self.run_cycles(2)
+        self.assertEqual(len(self.profiler.written), 1)
+        path = self.profiler.written[0]
+        self.assertTrue(path.endswith('.pstats'))
+        functions = {name for _, _, name in pstats.Stats(path).stats}
+        self.assertIn('prepare_batch', functions)
+        self.assertIn('infer_batch', functions)
+        self.assertIn('top 5 by own time', log)
+        self.assertFalse(self.profiler.profiling)
+
+    async def profile_concurrent_stages(self):
+        """Indicators scored while every stage runs profiled, each chunk slow enough to overlap"""
+        for name in ('prepare_batch', 'infer_batch', 'finish_batch'):
+            stage = getattr(self.monitor, name)
+            setattr(self.monitor, name, lambda *args, stage=stage: (time.sleep(0.005), stage(*args))[1])
+        ips = [f'10.3.0.{i}' for i in range(60)]
+        scored = []
+        pipeline = ScoringPipeline(self.monitor, StaticLoader(ips, []), interval=0.05,
+                                   on_alert=lambda alert: scored.append(alert['ip_address']),
+                                   on_cycle=None, max_cycles=2, profiler=self.profiler)
+        with contextlib.redirect_stdout(io.StringIO()) as log:
+            self.profiler.request_profile(2)
+            await asyncio.wait_for(pipeline.run(), 10)
+        self.assertEqual(sorted(scored), sorted(ips))
+        return log.getvalue()
+
+    async def test_concurrent_stages_share_one_profiler(self):
+        with mock.patch('profiling.cProfile.Profile', ExclusiveProfile):
+            log = await self.profile_concurrent_stages()
+        self.assertNotIn('Error during threat check', log)
+        path, = self.profiler.written
+        self.assertIn('infer_batch', {name for _, _, name in pstats.Stats(path).stats})
+
+    async def test_unavailable_profiler_runs_stages_unprofiled(self):
+        with mock.patch('profiling.cProfile.Profile', FailingProfile):
+            log = await self.profile_concurrent_stages()
+        self.assertIn('Profiling unavailable', log)
+        self.assertIn('nothing written', log)
+        self.assertEqual(self.profiler.written, [])
+
+    async def test_memory_snapshot_diff(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.profiler.request_snapshot()
+        log = await self.run_cycles(1)
+        path, = self.profiler.written
+        self.assertTrue(os.path.basename(path).startswith('memory-cycle-1'))
+        with open(path) as f:
+            self.assertIn('Net allocation change over cycle 1', f.readline())
+        self.assertIn('Memory diff of cycle 1', log)
+
+    @unittest.skipUnless(hasattr(signal, 'SIGUSR1'), 'POSIX signals')
+    async def test_signal_arms_the_profiler(self):
+        loop = asyncio.get_running_loop()
+        self.assertTrue(install_signal_handlers(self.profiler, loop))
+        self.addCleanup(loop.remove_signal_handler, signal.SIGUSR1)
+        self.addCleanup(loop.remove_signal_handler, signal.SIGUSR2)
+        with contextlib.redirect_stdout(io.StringIO()):
+            os.kill(os.getpid(), signal.SIGUSR1)
+            deadline = time.monotonic() + 5
+            while not self.profiler._pending_profile and time.monotonic() < deadline:
+                await asyncio.sleep(0.01)
+        self.assertEqual(self.profiler._pending_profile, 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import http.client
+import json
+import threading
+import unittest
+from scoring_server import MAX_BULK, MicroBatcher, ScoringServer
+from monitor import ThreatMonitor
+
+class TestScoringServer(unittest.TestCase):
+    def setUp(self):
+        self.monitor = ThreatMonitor(headless=True)
+        self.server = ScoringServer(self.monitor, port=0, max_delay=0.05).start()
+
+    def tearDown(self):
+        self.server.stop()
+        self.monitor.close()
+
+    def request(self, method, path, body=None):
+        connection = http.client.HTTPConnection('127.0.0.1', self.server.port)
+        try:
+            if body is not None:
+                body = json.dumps(body)
+            connection.request(method, path, body, {'Content-Type': 'application/json'})
+            response = connection.getresponse()
+            return response.status, json.loads(response.read())
+        finally:
+            connection.close()
+
+    def test_single_lookup(self):
+        status, result = self.request('GET', '/score?indicator=login-verify.example.com')
+        self.assertEqual(status, 200)
+        self.assertEqual(result['indicator'], 'login-verify.example.com')
+        self.assertIn(result['severity'], ('HIGH', 'MEDIUM', 'LOW'))
+        self.assertTrue(0.0 <= result['threat_score'] <= 1.0)
+
+    def test_bulk_lookup_keeps_request_order(self):
+        indicators = ['10.0.0.1', 'example.com', 'secure-bank-login.example.net']
+        status, body = self.request('POST', '/score', {'indicators': indicators})
+        self.assertEqual(status, 200)
+        self.assertEqual([r['indicator'] for r in body['results']], indicators)
+
+    def test_bad_requests(self):
+        self.assertEqual(self.request('GET', '/score')[0], 400)
+        self.assertEqual(self.request('POST', '/score', {'indicators': [1, 2]})[0], 400)
+        self.assertEqual(self.request('POST', '/score', {'indicators': ['example.com', '   ']})[0], 400)
+        self.assertEqual(self.request('POST', '/score', {'indicators': ['']})[0], 400)
+        self.assertEqual(self.request('POST', '/score', {'indicators': ['.']})[0], 400)
+        self.assertEqual(self.request('POST', '/score', {'indicators': ['a.com'] * (MAX_BULK + 1)})[0], 413)
+        self.assertEqual(self.request('GET', '/other')[0], 404)
+
+    def test_concurrent_requests_share_batches(self):
+        statuses = []
+        def lookup(n):
+            statuses.append(self.request('GET', f'/score?indicator=host{n}.example.com')[0])
+        threads = [threading.Thread(target=lookup, args=(n,)) for n in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(statuses, [200] * 16)
+        status, stats = self.request('GET', '/stats')
+        self.assertEqual(stats['requests'], 16)
+        self.assertEqual(stats['indicators'], 16)
+        self.assertLess(stats['batches'], 16)
+        self.assertGreater(stats['mean_batch_size'], 1.0)
+        self.assertGreaterEqual(stats['p99_ms'], stats['p50_ms'])
+
+class TestMicroBatcher(unittest.TestCase):
+    def test_batches_stop_at_max_items(self):
+        monitor = ThreatMonitor(headless=True)
+        batcher = MicroBatcher(monitor, max_delay=0.05, max_items=1)
+        try:
+            results = []
+            threads = [threading.Thread(target=lambda n=n: results.append(batcher.score([f'h{n}.example.com'])))
+                       for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual([len(r) for r in results], [1, 1, 1, 1])
+            self.assertEqual(batcher.batches, 4)
+        finally:
+            batcher.close()
+            monitor.close()
+        with self.assertRaises(RuntimeError):
+            batcher.score(['late.example.com'])
+
+    def test_failing_request_does_not_fail_its_window(self):
+        monitor = ThreatMonitor(headless=True)
+        prepare_batch = monitor.prepare_batch
+        def poisoned(events):
+            if any(event.get('domain') == 'poison.example' for event in events):
+                raise ValueError("cannot score poison.example")
+            return prepare_batch(events)
+        monitor.prepare_batch = poisoned
+        batcher = MicroBatcher(monitor, max_delay=0.2)
+        results = {}
+        def score(name, indicators):
+            try:
+                results[name] = batcher.score(indicators)
+            except Exception as e:
+                results[name] = e
+        try:
+            threads = [threading.Thread(target=score, args=('good', ['example.com', '1.2.3.4'])),
+                       threading.Thread(target=score, args=('bad', ['poison.example']))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            batcher.close()
+            monitor.close()
+        self.assertEqual([alert['domain' if 'domain' in alert else 'ip_address'] for alert in results['good']],
+                         ['example.com', '1.2.3.4'])
+        self.assertIsInstance(results['bad'], Exception)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,25 +1,34 @@
 import unittest
+from unittest import mock
 from monitor import ThreatMonitor
 from data_collector import DataCollector
-from model import ThreatDetector
+from model import ThreatDetectionModel
 import torch
 import numpy as np
 
 class TestThreatDetection(unittest.TestCase):
     def setUp(self):
         """Set up test fixtures before each test method"""
-        self.monitor = ThreatMonitor()
+        self.monitor = ThreatMonitor(headless=True)
         self.collector = DataCollector()
 
+    def tearDown(self):
+        self.monitor.close()
+
+    def process_with_score(self, event, score):
+        """Process an event with the model's prediction fixed at score"""
+        self.monitor.verdict_cache.clear()
+        with mock.patch.object(self.monitor.model, 'predict_threat', return_value=score):
+            return self.monitor.process_event(event)
+
     def test_network_event_processing(self):
         """Test processing of network events"""
-        network_event = {
-            'type': 'network',
-            'source_ip': '192.168.1.100',
-            'dest_ip': '10.0.0.5',
-            'packet_size': 1500,
-            'protocol': 'TCP'
-        }
+        network_event = self.collector.collect_network_data(
+            source_ip='192.168.1.100',
+            dest_ip='10.0.0.5',
+            packet_size=1500,
+            protocol='TCP'
+        )
         
         alert = self.monitor.process_event(network_event)
         
@@ -33,7 +42,7 @@ class TestThreatDetection(unittest.TestCase):
         self.assertTrue(0 <= alert['threat_score'] <= 1)
 
     def test_log_event_processing(self):
-        """Test processing of log events"""
+        """Test that log events, which carry no IP or domain, are rejected"""
         log_event = {
             'type': 'log',
             'user': 'admin',
@@ -41,12 +50,18 @@ class TestThreatDetection(unittest.TestCase):
             'resource': '/admin/dashboard'
         }
         
-        alert = self.monitor.process_event(log_event)
+        with self.assertRaises(ValueError):
+            self.monitor.process_event(log_event)
+
+    def test_domain_event_processing(self):
+        """Test processing of domain checks"""
+        alert = self.monitor.process_event({'type': 'domain_check', 'domain': 'Secure-Login.example.com'})
         
         # Test alert structure
         self.assertIn('severity', alert)
         self.assertIn('threat_score', alert)
         self.assertIn('recommended_action', alert)
+        self.assertEqual(alert['domain'], 'Secure-Login.example.com')
 
     def test_data_collector(self):
         """Test data collection functionality"""
@@ -73,9 +88,6 @@ class TestThreatDetection(unittest.TestCase):
 
     def test_threat_levels(self):
         """Test different threat levels and corresponding actions"""
-        # Mock the predict method to return known threat scores
-        original_predict = self.monitor.model.predict
-        
         # Create a complete network event
         network_event = {
             'type': 'network',
@@ -85,29 +97,21 @@ class TestThreatDetection(unittest.TestCase):
             'protocol': 'TCP'
         }
         
-        try:
-            # Test HIGH severity
-            self.monitor.model.predict = lambda x: 0.9
-            alert_high = self.monitor.process_event(network_event)
-            self.assertEqual(alert_high['severity'], 'HIGH')
-            
-            # Test MEDIUM severity
-            self.monitor.model.predict = lambda x: 0.6
-            alert_medium = self.monitor.process_event(network_event)
-            self.assertEqual(alert_medium['severity'], 'MEDIUM')
-            
-            # Test LOW severity
-            self.monitor.model.predict = lambda x: 0.3
-            alert_low = self.monitor.process_event(network_event)
-            self.assertEqual(alert_low['severity'], 'LOW')
-        
-        finally:
-            # Restore original predict method
-            self.monitor.model.predict = original_predict
+        # Test HIGH severity
+        alert_high = self.process_with_score(network_event, 0.9)
+        self.assertEqual(alert_high['severity'], 'HIGH')
+        
+        # Test MEDIUM severity
+        alert_medium = self.process_with_score(network_event, 0.6)
+        self.assertEqual(alert_medium['severity'], 'MEDIUM')
+        
+        # Test LOW severity
+        alert_low = self.process_with_score(network_event, 0.3)
+        self.assertEqual(alert_low['severity'], 'LOW')
 
     def test_model_structure(self):
         """Test the neural network model structure"""
-        model = ThreatDetector(input_size=10)
+        model = ThreatDetectionModel(input_size=10)
         
         # Test input layer
         self.assertEqual(
@@ -134,33 +138,26 @@ class TestThreatDetection(unittest.TestCase):
             'protocol': 'TCP'
         }
         
-        original_predict = self.monitor.model.predict
-        try:
-            # Test HIGH severity action
-            self.monitor.model.predict = lambda x: 0.9
-            alert_high = self.monitor.process_event(network_event)
-            self.assertEqual(
-                alert_high['recommended_action'],
-                "Block IP and investigate immediately"
-            )
-            
-            # Test MEDIUM severity action
-            self.monitor.model.predict = lambda x: 0.6
-            alert_medium = self.monitor.process_event(network_event)
-            self.assertEqual(
-                alert_medium['recommended_action'],
-                "Monitor closely and investigate"
-            )
-            
-            # Test LOW severity action
-            self.monitor.model.predict = lambda x: 0.3
-            alert_low = self.monitor.process_event(network_event)
-            self.assertEqual(
-                alert_low['recommended_action'],
-                "Log for future reference"
-            )
-        finally:
-            self.monitor.model.predict = original_predict
+        # Test HIGH severity action
+        alert_high = self.process_with_score(network_event, 0.9)
+        self.assertEqual(
+            alert_high['recommended_action'],
+            "Block and investigate immediately"
+        )
+        
+        # Test MEDIUM severity action
+        alert_medium = self.process_with_score(network_event, 0.6)
+        self.assertEqual(
+            alert_medium['recommended_action'],
+            "Monitor closely and investigate"
+        )
+        
+        # Test LOW severity action
+        alert_low = self.process_with_score(network_event, 0.3)
+        self.assertEqual(
+            alert_low['recommended_action'],
+            "Log for future reference"
+        )
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
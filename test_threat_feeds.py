@@ -0,0 +1,72 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from threat_feeds import ThreatFeedLoader, DEFAULT_IPS, DEFAULT_DOMAINS
+
+class TestThreatFeedLoader(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = os.path.join(self.tmpdir.name, 'threat_intel.json')
+
+    def write_feed(self, ips, domains, mtime=None):
+        with open(self.path, 'w') as f:
+            json.dump({'malicious_ips': ips, 'malicious_domains': domains}, f)
+        if mtime is not None:
+            os.utime(self.path, ns=(mtime, mtime))
+
+    def test_first_load_reports_everything_added(self):
+        self.write_feed(['1.2.3.4', '5.6.7.8'], ['evil.com'])
+        update = ThreatFeedLoader(self.path).load()
+        self.assertTrue(update.changed)
+        self.assertEqual(update.added_ips, ['1.2.3.4', '5.6.7.8'])
+        self.assertEqual(update.added_domains, ['evil.com'])
+        self.assertEqual(update.removed_ips, [])
+
+    def test_unchanged_file_is_not_reread(self):
+        """An unchanged stat signature skips opening the file"""
+        self.write_feed(['1.2.3.4'], ['evil.com'])
+        loader = ThreatFeedLoader(self.path)
+        loader.load()
+        with mock.patch('builtins.open') as mocked_open:
+            update = loader.load()
+            mocked_open.assert_not_called()
+        self.assertFalse(update.changed)
+        self.assertEqual(update.ips, ['1.2.3.4'])
+        self.assertEqual(update.added_ips, [])
+
+    def test_touched_file_with_same_content_is_not_reparsed(self):
+        self.write_feed(['1.2.3.4'], ['evil.com'], mtime=10**18)
+        loader = ThreatFeedLoader(self.path)
+        loader.load()
+        os.utime(self.path, ns=(2 * 10**18, 2 * 10**18))
+        with mock.patch('json.loads') as loads:
+            update = loader.load()
+            loads.assert_not_called()
+        self.assertFalse(update.changed)
+
+    def test_deltas_between_versions(self):
+        self.write_feed(['1.2.3.4', '5.6.7.8'], ['evil.com', 'bad.net'], mtime=10**18)
+        loader = ThreatFeedLoader(self.path)
+        loader.load()
+        self.write_feed(['5.6.7.8', '9.9.9.9'], ['evil.com', 'worse.org'], mtime=2 * 10**18)
+        update = loader.load()
+        self.assertTrue(update.changed)
+        self.assertEqual(update.added_ips, ['9.9.9.9'])
+        self.assertEqual(update.removed_ips, ['1.2.3.4'])
+        self.assertEqual(update.added_domains, ['worse.org'])
+        self.assertEqual(update.removed_domains, ['bad.net'])
+        self.assertEqual(update.ips, ['5.6.7.8', '9.9.9.9'])
+
+    def test_missing_file_uses_defaults_once(self):
+        loader = ThreatFeedLoader(self.path)
+        first = loader.load()
+        second = loader.load()
+        self.assertEqual(first.added_ips, DEFAULT_IPS)
+        self.assertEqual(first.added_domains, DEFAULT_DOMAINS)
+        self.assertFalse(second.changed)
+
+if __name__ == '__main__':
+    unittest.main()
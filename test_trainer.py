@@ -0,0 +1,86 @@
+import os
+import random
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+import trainer
+from checkpoint import load_checkpoint
+from trainer import ThreatModelTrainer, classification_metrics, iter_labelled
+
+def labelled_dataset(count, seed=0):
+    """Benign dictionary domains vs. suspicious-word, consonant-heavy ones"""
+    rng = random.Random(seed)
+    words = ['mail', 'shop', 'news', 'cloud', 'home', 'blog', 'docs']
+    rows = []
+    for i in range(count):
+        if i % 2:
+            name = rng.choice(['free', 'win', 'login', 'bank']) + '-' + \
+                ''.join(rng.choice('bcdfghjklmnpqrstvwxz') for _ in range(rng.randint(6, 12)))
+            rows.append((name + '.xyz', 1))
+        else:
+            rows.append((rng.choice(words) + '.' + rng.choice(words) + '.com', 0))
+    return rows
+
+class TestTrainer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'train.csv')
+        with open(self.path, 'w') as f:
+            f.write('indicator,label\n')
+            f.writelines(f'{indicator},{label}\n' for indicator, label in labelled_dataset(4000))
+        self.trainer = ThreatModelTrainer(cache_dir=os.path.join(self.tmp.name, 'cache'),
+                                          batch_size=256, epochs=5, patience=2, num_workers=0)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reads_csv_and_skips_header(self):
+        rows = list(iter_labelled(self.path))
+        self.assertEqual(len(rows), 4000)
+        self.assertEqual(rows[1][1], 1.0)
+
+    def test_normalizes_indicators_and_skips_rows_without_one(self):
+        path = os.path.join(self.tmp.name, 'mixed.jsonl')
+        with open(path, 'w') as f:
+            f.write('{"indicator": " Login-Bank.XYZ. ", "label": 1}\n')
+            f.write('{"label": 0}\n')
+            f.write('{"indicator": null, "label": 1}\n')
+            f.write('{"domain": "Mail.Example.COM", "label": 0}\n')
+        self.assertEqual(list(iter_labelled(path)), [('login-bank.xyz', 1.0), ('mail.example.com', 0.0)])
+
+    def test_training_hashes_dataset_once(self):
+        with mock.patch('trainer.dataset_digest', wraps=trainer.dataset_digest) as digest:
+            self.trainer.train(self.path, checkpoint_path=os.path.join(self.tmp.name, 'model.pt'))
+        digest.assert_called_once_with(self.path)
+
+    def test_feature_cache_skips_extraction_on_rerun(self):
+        features, labels = self.trainer.prepare_data(self.path)
+        self.assertEqual(features.shape, (4000, 10))
+        self.assertIsInstance(features, np.memmap)
+        with mock.patch('trainer.extract_features_batch') as extract:
+            again, _ = self.trainer.prepare_data(self.path)
+        extract.assert_not_called()
+        np.testing.assert_array_equal(again, features)
+        self.assertEqual((self.trainer.cache.hits, self.trainer.cache.misses), (1, 1))
+
+    def test_training_learns_and_saves_checkpoint(self):
+        checkpoint_path = os.path.join(self.tmp.name, 'model.pt')
+        history = self.trainer.train(self.path, checkpoint_path=checkpoint_path)
+        self.assertGreater(history[-1]['accuracy'], 0.95)
+        self.assertLess(history[-1]['loss'], history[0]['train_loss'])
+
+        model = load_checkpoint(checkpoint_path).build_model()
+        self.assertIsNotNone(model.feature_scaling())
+        self.assertGreater(model.predict_threat('login-xkcdqwrtz.xyz'), 0.5)
+        self.assertLess(model.predict_threat('mail.news.com'), 0.5)
+
+    def test_metrics(self):
+        metrics = classification_metrics([0.9, 0.8, 0.3, 0.1], [1, 0, 1, 0])
+        self.assertEqual(metrics['accuracy'], 0.5)
+        self.assertEqual(metrics['precision'], 0.5)
+        self.assertEqual(metrics['recall'], 0.5)
+        self.assertAlmostEqual(metrics['auc'], 0.75)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from unittest import mock
+from monitor import ThreatMonitor
+from model import ThreatDetectionModel
+from verdict_cache import VerdictCache, normalize_indicator
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+class TestVerdictCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        """The least recently used entry is evicted once the cache is full"""
+        cache = VerdictCache(max_size=2, ttl=60)
+        cache.put('a', 0.1)
+        cache.put('b', 0.2)
+        cache.get('a')
+        cache.put('c', 0.3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 0.1)
+        self.assertEqual(cache.get('c'), 0.3)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_ttl_expiry(self):
+        """Entries older than the TTL count as misses"""
+        clock = FakeClock()
+        cache = VerdictCache(max_size=10, ttl=30, clock=clock)
+        cache.put('a', 0.5)
+        clock.now = 29
+        self.assertEqual(cache.get('a'), 0.5)
+        clock.now = 30
+        self.assertIsNone(cache.get('a'))
+        stats = cache.stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['expirations']), (1, 1, 1))
+        self.assertEqual(len(cache), 0)
+
+    def test_normalize_indicator(self):
+        self.assertEqual(normalize_indicator(' Malware-Site.COM. '), 'malware-site.com')
+
+class TestMonitorVerdictCache(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch('monitor.AlertSystem')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.monitor = ThreatMonitor()
+
+    def test_repeat_events_hit_cache(self):
+        """Repeated single and batched lookups are served from the cache"""
+        event = {'type': 'domain_check', 'domain': 'example-unknown.org'}
+        first = self.monitor.process_event(event)
+        with mock.patch.object(self.monitor.model, 'predict_threat') as predict, \
+                mock.patch.object(self.monitor.model, 'predict_features') as predict_batch:
+            second = self.monitor.process_event(dict(event, domain='Example-Unknown.ORG'))
+            batch = self.monitor.process_events([event, event])
+            predict.assert_not_called()
+            predict_batch.assert_not_called()
+        self.assertEqual(first['threat_score'], second['threat_score'])
+        self.assertEqual([a['threat_score'] for a in batch], [first['threat_score']] * 2)
+        self.assertEqual(self.monitor.verdict_cache.hits, 3)
+
+    def test_reload_invalidates_cache(self):
+        """Loading new weights changes the model version and clears verdicts"""
+        self.monitor.process_event({'type': 'ip_check', 'ip_address': '8.8.4.4'})
+        old_version = self.monitor.model_version
+        self.assertEqual(len(self.monitor.verdict_cache), 1)
+
+        self.monitor.model.load_state_dict(ThreatDetectionModel().state_dict())
+
+        self.assertNotEqual(self.monitor.model_version, old_version)
+        self.assertEqual(len(self.monitor.verdict_cache), 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import queue
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from checkpoint import DEFAULT_THRESHOLDS
+from monitor import ThreatMonitor
+from verdict_store import LAST_SEEN_RESOLUTION, VerdictStore
+
+class TestVerdictStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'verdicts.db')
+        self.store = VerdictStore(self.path, flush_interval=60)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.directory)
+
+    def test_upserts_keep_first_seen_and_record_changes(self):
+        self.store.record(['a.example', 'b.example'], [0.2, 0.9], 'v1', DEFAULT_THRESHOLDS, seen=100.0)
+        self.store.record(['a.example'], [0.2], 'v1', DEFAULT_THRESHOLDS, seen=150.0)  # Within the resolution
+        self.store.record(['a.example'], [0.2], 'v1', DEFAULT_THRESHOLDS, seen=101.0 + LAST_SEEN_RESOLUTION)
+        self.assertTrue(self.store.flush())
+        self.store.record(['a.example'], [0.6], 'v2', DEFAULT_THRESHOLDS, seen=1000.0)
+        self.store.flush()
+
+        a = self.store.get('a.example')
+        self.assertEqual((a['model_version'], a['score'], a['severity']), ('v2', 0.6, 'MEDIUM'))
+        self.assertEqual((a['first_seen'], a['last_seen']), (100.0, 1000.0))
+        self.assertEqual(self.store.get('b.example')['last_seen'], 100.0)
+        self.assertEqual(self.store.get('b.example')['severity'], 'HIGH')
+        self.assertIsNone(self.store.get('c.example'))
+        self.assertEqual(len(self.store), 2)
+
+        history = self.store.history('a.example')
+        self.assertEqual([(h['model_version'], h['score'], h['scored_at']) for h in history],
+                         [('v1', 0.2, 100.0), ('v2', 0.6, 1000.0)])
+        self.assertEqual(len(self.store.history('a.example', start=500.0)), 1)
+
+    def test_time_range_and_version_queries(self):
+        self.store.record([f'h{i}.example' for i in range(10)], [i / 10 for i in range(10)], 'v1',
+                          DEFAULT_THRESHOLDS, seen=1000.0)
+        self.store.record(['late.example'], [0.95], 'v2', DEFAULT_THRESHOLDS, seen=2000.0)
+        self.store.flush()
+        self.assertEqual([v['indicator'] for v in self.store.seen_between(1500.0)], ['late.example'])
+        self.assertEqual(len(self.store.seen_between(0, 1500.0)), 10)
+        self.assertEqual(len(self.store.seen_between(0, min_severity='HIGH')), 3)
+        self.assertEqual(len(self.store.current_scores('v1')), 10)
+        self.assertEqual(self.store.current_scores('v2'), [('late.example', 0.95)])
+
+    def test_close_commits_pending_rows(self):
+        self.store.record(['a.example'], [0.3], 'v1', DEFAULT_THRESHOLDS)
+        self.store.close()
+        reopened = VerdictStore(self.path)
+        try:
+            self.assertEqual(reopened.get('a.example')['score'], 0.3)
+        finally:
+            reopened.close()
+
+    def test_record_drops_when_queue_full(self):
+        full = queue.Queue(maxsize=1)
+        full.put((['queued.example'], [0.1], 'v1', DEFAULT_THRESHOLDS, 1.0))
+        # The writer is waiting on the original queue for another flush_interval
+        with mock.patch.object(self.store, '_queue', full):
+            self.store.record(['a.example'], [0.1], 'v1', DEFAULT_THRESHOLDS)
+        self.assertEqual(self.store.dropped, 1)
+
+class TestMonitorVerdictStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'verdicts.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    @mock.patch('monitor.AlertSystem')
+    def test_restart_skips_rescoring(self, mock_alert_system):
+        events = [{'type': 'domain_check', 'domain': f'host{i}.example.com'} for i in range(50)]
+        with mock.patch('builtins.print'):
+            monitor = ThreatMonitor(verdict_store=self.path)
+        first = [alert['threat_score'] for alert in monitor.process_events(events)]
+        state = monitor.model.state_dict()
+        monitor.close()
+
+        with mock.patch('builtins.print'):
+            restarted = ThreatMonitor(verdict_store=self.path)
+        try:
+            restarted.model.load_state_dict(state)  # Same weights, same version
+            with mock.patch('builtins.print'):
+                self.assertEqual(restarted.warm_verdict_cache(), 50)
+            with mock.patch.object(restarted.model, 'predict_features') as predict:
+                again = [alert['threat_score'] for alert in restarted.process_events(events)]
+            predict.assert_not_called()
+            self.assertEqual(again, first)
+            stored = restarted.verdict_store.get('host0.example.com')
+            self.assertTrue(stored['model_version'].startswith(restarted.model_version))
+        finally:
+            restarted.close()
+
+    @mock.patch('monitor.AlertSystem')
+    def test_only_model_scores_are_stored(self, mock_alert_system):
+        with mock.patch('builtins.print'):
+            monitor = ThreatMonitor(verdict_store=self.path)
+        try:
+            events = [{'type': 'domain_check', 'domain': 'phishing-attempt.net'},
+                      {'type': 'domain_check', 'domain': 'model-scored.example.com'}]
+            monitor.process_events(events)
+            monitor.process_events(events)  # Second pass is served from the cache
+            monitor.process_event({'type': 'domain_check', 'domain': 'single.example.com'})
+            monitor.verdict_store.flush()
+            self.assertIsNone(monitor.verdict_store.get('phishing-attempt.net'))
+            self.assertIsNone(monitor.verdict_store.get('single.example.com'))
+            self.assertEqual(len(monitor.verdict_store.history('model-scored.example.com')), 1)
+        finally:
+            monitor.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+
+DEFAULT_FEED_PATH = 'threat_intel.json'
+
+# Used when no feed file can be loaded
+DEFAULT_IPS = [
+    "45.227.253.214",
+    "192.168.1.100",
+    "31.192.45.78"
+]
+DEFAULT_DOMAINS = [
+    "malware-site.com",
+    "phishing-attempt.net",
+    "suspicious-domain.org"
+]
+
+
+class FeedUpdate:
+    """Result of one feed reload: the full lists plus what changed"""
+
+    def __init__(self, ips, domains, added_ips=(), removed_ips=(),
+                 added_domains=(), removed_domains=(), changed=False):
+        self.ips = ips
+        self.domains = domains
+        self.added_ips = list(added_ips)
+        self.removed_ips = list(removed_ips)
+        self.added_domains = list(added_domains)
+        self.removed_domains = list(removed_domains)
+        self.changed = changed
+
+    def __repr__(self):
+        return (f"FeedUpdate(changed={self.changed}, "
+                f"ips=+{len(self.added_ips)}/-{len(self.removed_ips)}, "
+                f"domains=+{len(self.added_domains)}/-{len(self.removed_domains)})")
+
+
+class ThreatFeedLoader:
+    """Change-aware loader for a threat_intel.json style feed file
+
+    The file is skipped entirely while its stat signature is unchanged,
+    and only re-parsed when its content hash differs from the last load.
+    """
+
+    def __init__(self, path=DEFAULT_FEED_PATH):
+        self.path = path
+        self.ips = []
+        self.domains = []
+        self._signature = None
+        self._digest = None
+        self._loaded = False
+
+    def load(self):
+        """Reload the feed if it changed and report added/removed indicators"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            if not self._loaded:
+                return self._replace(DEFAULT_IPS, DEFAULT_DOMAINS)
+            return self._unchanged()
+
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if self._loaded and signature == self._signature:
+            return self._unchanged()
+
+        try:
+            with open(self.path, 'rb') as f:
+                content = f.read()
+            digest = hashlib.sha256(content).digest()
+            if self._loaded and digest == self._digest:
+                self._signature = signature
+                return self._unchanged()
+            data = json.loads(content)
+        except Exception as e:
+            print(f"Error loading threat feeds: {str(e)}")
+            if not self._loaded:
+                return self._replace(DEFAULT_IPS, DEFAULT_DOMAINS)
+            return self._unchanged()
+
+        self._signature = signature
+        self._digest = digest
+        return self._replace(data.get('malicious_ips', []), data.get('malicious_domains', []))
+
+    def _unchanged(self):
+        return FeedUpdate(self.ips, self.domains)
+
+    def _replace(self, ips, domains):
+        ips = list(dict.fromkeys(ips))
+        domains = list(dict.fromkeys(domains))
+        old_ips, old_domains = set(self.ips), set(self.domains)
+        new_ips, new_domains = set(ips), set(domains)
+        update = FeedUpdate(
+            ips,
+            domains,
+            added_ips=[ip for ip in ips if ip not in old_ips],
+            removed_ips=[ip for ip in self.ips if ip not in new_ips],
+            added_domains=[domain for domain in domains if domain not in old_domains],
+            removed_domains=[domain for domain in self.domains if domain not in new_domains],
+            changed=True
+        )
+        self.ips, self.domains = ips, domains
+        self._loaded = True
+        return update
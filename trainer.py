@@ -1,16 +1,364 @@
+"""Training for ThreatDetectionModel on large labelled indicator sets
+
+Datasets are CSV lines of `indicator,label` (an optional header is
+skipped) or JSON Lines objects with an "indicator"/"ip"/"domain" key and
+a "label", optionally gzipped. Labels are 1/0 or malicious/benign.
+
+    python trainer.py labelled.csv.gz --out model.pt [--epochs 20] [--workers 2]
+
+Features are extracted once, vectorized, into .npy files under the cache
+directory keyed by the dataset's content hash, FEATURE_VERSION and the
+suspicious-term lexicon; later runs memory-map them and skip extraction
+entirely.
+"""
+import argparse
+import copy
+import hashlib
+import json
+import os
+import time
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import BatchSampler, DataLoader, Dataset, RandomSampler, SequentialSampler
+from checkpoint import DEFAULT_THRESHOLDS, save_checkpoint
+from feed_stream import open_feed
+from features import FEATURE_VERSION, NUM_FEATURES, extract_features_batch, lexicon, load_lexicon
+from model import ThreatDetectionModel
+from verdict_cache import normalize_indicator
+
+DEFAULT_CACHE_DIR = '.feature_cache'
+
+# Part of the cache key; 2: indicators normalized as they are at serving time
+CACHE_FORMAT = 2
+
+LABELS = {'1': 1.0, '0': 0.0, 'malicious': 1.0, 'benign': 0.0, 'true': 1.0, 'false': 0.0}
+
+
+def iter_labelled(path):
+    """Yield (indicator, label) pairs from a labelled CSV or JSONL dataset
+
+    Indicators are normalized exactly as ThreatMonitor normalizes them
+    before scoring, so training sees the same features as serving.
+    """
+    with open_feed(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                record = json.loads(line)
+                indicator = record.get('indicator') or record.get('ip') or record.get('domain')
+                label = str(record.get('label')).lower()
+            else:
+                indicator, _, label = line.rpartition(',')
+                label = label.strip().lower()
+            if label not in LABELS or not isinstance(indicator, str):
+                continue  # Header, unlabelled row or record without an indicator
+            indicator = normalize_indicator(indicator)
+            if indicator:
+                yield indicator, LABELS[label]
+
+
+def dataset_digest(dataset):
+    """Content hash of a dataset path or an (indicators, labels) pair"""
+    digest = hashlib.sha256()
+    if isinstance(dataset, str):
+        with open(dataset, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    else:
+        indicators, labels = dataset
+        digest.update('\0'.join(indicators).encode('utf-8'))
+        digest.update(np.asarray(labels, dtype=np.float32).tobytes())
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Feature and label matrices stored as .npy files, loaded memory-mapped"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, chunk_size=65536):
+        self.cache_dir = cache_dir
+        self.chunk_size = chunk_size
+        self.hits = 0
+        self.misses = 0
+
+    def paths(self, dataset):
+        key = f"{dataset_digest(dataset)[:24]}-v{FEATURE_VERSION}-{lexicon().digest[:8]}-c{CACHE_FORMAT}"
+        base = os.path.join(self.cache_dir, key)
+        return base + '.features.npy', base + '.labels.npy'
+
+    def load(self, dataset, paths=None):
+        """(features, labels) memmaps for a dataset, extracting features on a cache miss
+
+        Pass paths from self.paths(dataset) when the caller needs them too;
+        computing them hashes the whole dataset.
+        """
+        features_path, labels_path = paths or self.paths(dataset)
+        if os.path.exists(features_path) and os.path.exists(labels_path):
+            self.hits += 1
+        else:
+            self.misses += 1
+            self._build(dataset, features_path, labels_path)
+        return np.load(features_path, mmap_mode='r'), np.load(labels_path, mmap_mode='r')
+
+    def _build(self, dataset, features_path, labels_path):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        if isinstance(dataset, str):
+            count = sum(1 for _ in iter_labelled(dataset))
+            rows = iter_labelled(dataset)
+        else:
+            count = len(dataset[0])
+            rows = ((normalize_indicator(indicator), label) for indicator, label in zip(*dataset))
+
+        # Written under temporary names and renamed, so an interrupted build is never reused
+        tmp_features, tmp_labels = features_path + '.tmp.npy', labels_path + '.tmp.npy'
+        features = np.lib.format.open_memmap(tmp_features, 'w+', np.float32, (count, NUM_FEATURES))
+        labels = np.lib.format.open_memmap(tmp_labels, 'w+', np.float32, (count,))
+        start = 0
+        while start < count:
+            chunk = [row for _, row in zip(range(self.chunk_size), rows)]
+            end = start + len(chunk)
+            features[start:end] = extract_features_batch([indicator for indicator, _ in chunk])
+            labels[start:end] = [label for _, label in chunk]
+            start = end
+        features.flush()
+        labels.flush()
+        del features, labels
+        os.replace(tmp_features, features_path)
+        os.replace(tmp_labels, labels_path)
+
+
+class FeatureBatches(Dataset):
+    """Whole standardized batches from memory-mapped .npy files
+
+    Indexed by a list of row numbers (fed by a BatchSampler) so each
+    DataLoader item is one fancy-indexing read instead of per-row Python
+    calls. Workers open their own memory maps rather than receiving
+    pickled copies of the arrays.
+    """
+
+    def __init__(self, features_path, labels_path, mean, scale):
+        self.features_path = features_path
+        self.labels_path = labels_path
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self._arrays = None
+
+    def __len__(self):
+        return len(self._open()[1])
+
+    def __getitem__(self, rows):
+        features, labels = self._open()
+        rows = np.sort(np.asarray(rows))
+        x = (features[rows] - self.mean) / self.scale
+        return torch.from_numpy(x), torch.from_numpy(np.array(labels[rows]))
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_arrays'] = None
+        return state
+
+    def _open(self):
+        if self._arrays is None:
+            self._arrays = (np.load(self.features_path, mmap_mode='r'),
+                            np.load(self.labels_path, mmap_mode='r'))
+        return self._arrays
+
+
+class IndexSubset(Dataset):
+    """Rows of a FeatureBatches dataset restricted to a fixed index array"""
+
+    def __init__(self, dataset, indices):
+        self.dataset = dataset
+        self.indices = indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def __getitem__(self, rows):
+        return self.dataset[self.indices[rows]]
+
+
+def fit_scaler(features, indices, chunk_size=1 << 20):
+    """Per-feature mean and standard deviation over the given rows, like StandardScaler"""
+    total = np.zeros(features.shape[1])
+    squares = np.zeros(features.shape[1])
+    for start in range(0, len(indices), chunk_size):
+        chunk = features[np.sort(indices[start:start + chunk_size])].astype(np.float64)
+        total += chunk.sum(axis=0)
+        squares += np.square(chunk).sum(axis=0)
+    mean = total / max(len(indices), 1)
+    scale = np.sqrt(np.maximum(squares / max(len(indices), 1) - mean ** 2, 0))
+    scale[scale == 0] = 1.0  # Constant features pass through unscaled
+    return mean.astype(np.float32), scale.astype(np.float32)
+
+
+def classification_metrics(scores, labels, threshold=DEFAULT_THRESHOLDS['MEDIUM']):
+    """Accuracy, precision, recall, F1 at threshold and ROC AUC"""
+    scores = np.asarray(scores, dtype=np.float64)
+    labels = np.asarray(labels) >= 0.5
+    predicted = scores >= threshold
+    tp = int(np.sum(predicted & labels))
+    fp = int(np.sum(predicted & ~labels))
+    fn = int(np.sum(~predicted & labels))
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / (tp + fn) if tp + fn else 0.0
+    positives = int(labels.sum())
+    negatives = len(labels) - positives
+    auc = float('nan')
+    if positives and negatives:
+        # Mann-Whitney U from score ranks (ties broken arbitrarily)
+        ranks = np.empty(len(scores))
+        ranks[np.argsort(scores, kind='mergesort')] = np.arange(1, len(scores) + 1)
+        auc = (ranks[labels].sum() - positives * (positives + 1) / 2) / (positives * negatives)
+    return {
+        'accuracy': float(np.mean(predicted == labels)) if len(labels) else 0.0,
+        'precision': precision,
+        'recall': recall,
+        'f1': 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        'auc': auc,
+    }
+
+
 class ThreatModelTrainer:
-    def __init__(self):
+    """Trains ThreatDetectionModel with early stopping on a held-out split"""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, batch_size=2048, epochs=20, patience=3,
+                 learning_rate=1e-3, val_fraction=0.1, num_workers=2, seed=0):
         self.model = ThreatDetectionModel()
-        self.training_data = []
-        
-    def train(self, dataset):
-        X_train, y_train = self.prepare_data(dataset)
-        self.model.train_model(X_train, y_train)
-        
+        self.cache = FeatureCache(cache_dir)
+        self.batch_size = batch_size
+        self.epochs = epochs
+        self.patience = patience
+        self.learning_rate = learning_rate
+        self.val_fraction = val_fraction
+        self.num_workers = num_workers
+        self.seed = seed
+        self.history = []
+
+    def prepare_data(self, dataset, paths=None):
+        """Memory-mapped (features, labels) for a dataset path or (indicators, labels) pair"""
+        return self.cache.load(dataset, paths)
+
+    def train(self, dataset, checkpoint_path=None):
+        """Fit the scaler and the network, keeping the weights with the best validation loss"""
+        features_path, labels_path = paths = self.cache.paths(dataset)
+        features, labels = self.prepare_data(dataset, paths)
+        rng = np.random.default_rng(self.seed)
+        order = rng.permutation(len(labels))
+        val_size = int(len(order) * self.val_fraction)
+        val_rows, train_rows = order[:val_size], order[val_size:]
+
+        mean, scale = fit_scaler(features, train_rows)
+        self.model.set_feature_scaling(mean, scale)
+        batches = FeatureBatches(features_path, labels_path, mean, scale)
+        train_loader = self._loader(IndexSubset(batches, train_rows), shuffle=True)
+        val_loader = self._loader(IndexSubset(batches, val_rows), shuffle=False) if val_size else None
+
+        torch.manual_seed(self.seed)
+        optimizer = optim.Adam(self.model.parameters(), lr=self.learning_rate)
+        criterion = nn.BCELoss()
+        best_loss, best_state, stale = float('inf'), None, 0
+        self.history = []
+        for epoch in range(1, self.epochs + 1):
+            started = time.perf_counter()
+            self.model.train()
+            train_loss = 0.0
+            for x, y in train_loader:
+                optimizer.zero_grad()
+                loss = criterion(self.model(x).view(-1), y)
+                loss.backward()
+                optimizer.step()
+                train_loss += loss.item() * len(y)
+            train_loss /= max(len(train_rows), 1)
+
+            metrics = self._evaluate(val_loader) if val_loader else {'loss': train_loss}
+            metrics.update(epoch=epoch, train_loss=train_loss, seconds=time.perf_counter() - started)
+            self.history.append(metrics)
+            print(f"Epoch {epoch}: train loss {train_loss:.4f}, val loss {metrics['loss']:.4f}, "
+                  f"accuracy {metrics.get('accuracy', float('nan')):.3f}, "
+                  f"AUC {metrics.get('auc', float('nan')):.3f} ({metrics['seconds']:.1f}s)")
+
+            if metrics['loss'] < best_loss:
+                best_loss, best_state, stale = metrics['loss'], copy.deepcopy(self.model.state_dict()), 0
+                if checkpoint_path:
+                    self.model.eval()
+                    self.save_model(checkpoint_path)
+            else:
+                stale += 1
+                if stale >= self.patience:
+                    print(f"Early stopping: no improvement for {self.patience} epochs")
+                    break
+
+        if best_state is not None:
+            self.model.load_state_dict(best_state)
+        self.model.eval()
+        return self.history
+
     def validate(self, test_data):
-        """Validate model performance"""
-        pass
-        
+        """Loss and classification metrics on a held-out dataset"""
+        features_path, labels_path = paths = self.cache.paths(test_data)
+        features, labels = self.prepare_data(test_data, paths)
+        mean, scale = self.model.feature_scaling() or (np.zeros(NUM_FEATURES), np.ones(NUM_FEATURES))
+        batches = FeatureBatches(features_path, labels_path, mean, scale)
+        return self._evaluate(self._loader(IndexSubset(batches, np.arange(len(labels))), shuffle=False))
+
     def save_model(self, path):
-        """Save trained model"""
-        pass 
\ No newline at end of file
+        """Save a checkpoint with the weights, scaler and feature version"""
+        save_checkpoint(self.model, path)
+
+    def _loader(self, dataset, shuffle):
+        sampler = RandomSampler(dataset) if shuffle else SequentialSampler(dataset)
+        return DataLoader(
+            dataset,
+            batch_size=None,  # The BatchSampler below already yields whole batches
+            sampler=BatchSampler(sampler, self.batch_size, drop_last=False),
+            num_workers=self.num_workers,
+            persistent_workers=self.num_workers > 0,
+        )
+
+    def _evaluate(self, loader):
+        self.model.eval()
+        criterion = nn.BCELoss(reduction='sum')
+        total_loss, scores, labels = 0.0, [], []
+        with torch.inference_mode():
+            for x, y in loader:
+                predictions = self.model(x).view(-1)
+                total_loss += criterion(predictions, y).item()
+                scores.append(predictions.numpy())
+                labels.append(y.numpy())
+        scores = np.concatenate(scores) if scores else np.zeros(0)
+        labels = np.concatenate(labels) if labels else np.zeros(0)
+        metrics = classification_metrics(scores, labels)
+        metrics['loss'] = total_loss / max(len(labels), 1)
+        return metrics
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the threat detection model")
+    parser.add_argument('dataset', help='labelled CSV or JSONL file (optionally gzipped)')
+    parser.add_argument('--out', default='model.pt', help='checkpoint to write')
+    parser.add_argument('--epochs', type=int, default=20)
+    parser.add_argument('--patience', type=int, default=3)
+    parser.add_argument('--batch-size', type=int, default=2048)
+    parser.add_argument('--lr', type=float, default=1e-3)
+    parser.add_argument('--workers', type=int, default=2, help='DataLoader worker processes')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR)
+    parser.add_argument('--lexicon', default=None, help='suspicious-term lexicon file, one term per line')
+    args = parser.parse_args(argv)
+    if args.lexicon:
+        load_lexicon(args.lexicon)
+
+    trainer = ThreatModelTrainer(cache_dir=args.cache_dir, batch_size=args.batch_size,
+                                 epochs=args.epochs, patience=args.patience,
+                                 learning_rate=args.lr, num_workers=args.workers)
+    started = time.perf_counter()
+    trainer.train(args.dataset, checkpoint_path=args.out)
+    print(f"Feature cache: {trainer.cache.hits} hits, {trainer.cache.misses} misses")
+    print(f"Saved {args.out} after {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
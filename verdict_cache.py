@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+def normalize_indicator(indicator):
+    """Canonical form of an IP or domain used for caching and scoring"""
+    return indicator.strip().lower().rstrip('.')
+
+
+class VerdictCache:
+    """Bounded LRU cache of threat scores with per-entry TTL"""
+
+    def __init__(self, max_size=100000, ttl=3600, clock=time.monotonic):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()  # key -> (score, expires_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached score for key, or None on a miss"""
+        with self._lock:
+            return self._get(key, self.clock())
+
+    def get_many(self, keys):
+        """Look up many keys at once, returning None for each miss"""
+        with self._lock:
+            now = self.clock()
+            return [self._get(key, now) for key in keys]
+
+    def put(self, key, score):
+        """Store a score, evicting the least recently used entry if full"""
+        with self._lock:
+            self._put(key, score, self.clock())
+
+    def put_many(self, items):
+        """Store many (key, score) pairs at once"""
+        with self._lock:
+            now = self.clock()
+            for key, score in items:
+                self._put(key, score, now)
+
+    def clear(self):
+        """Drop every cached verdict"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Return cache counters"""
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def _get(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        score, expires_at = entry
+        if expires_at <= now:
+            del self._entries[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return score
+
+    def _put(self, key, score, now):
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (score, now + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
@@ -0,0 +1,273 @@
+"""Persistent verdict store in SQLite (WAL mode) with a background batched writer
+
+Keeps the latest verdict per indicator (model version, score, severity,
+first and last seen) and, through triggers, a history row whenever an
+indicator's score, severity or model version changes. ThreatMonitor
+seeds its verdict cache from here at startup, so indicators already
+scored by the current model are not scored again after a restart.
+
+Only model verdicts are stored: ThreatMonitor records the indicators a
+batch actually ran through the model, never known-bad index hits or
+verdict cache hits, so first/last seen are the first and latest times
+the model scored an indicator.
+
+The scoring path only queues one tuple per batch. A writer thread
+upserts everything queued in one transaction per flush_interval (or
+batch_size indicators). Rows are fed to executemany from C iterators
+and severities are computed in SQL, so the writer runs no Python code
+per row and contends little for the GIL with scoring.
+
+    python verdict_store.py history evil.example.com
+    python verdict_store.py recent --hours 24
+    python verdict_store.py stats
+"""
+import argparse
+import queue
+import sqlite3
+import threading
+import time
+from itertools import repeat
+from metrics import ERRORS
+
+DEFAULT_PATH = 'verdicts.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS verdicts (
+    indicator TEXT PRIMARY KEY,
+    model_version TEXT NOT NULL,
+    score REAL NOT NULL,
+    severity TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    last_seen REAL NOT NULL
+);
+-- Also serves the startup warm-up, which scans it newest first; every
+-- extra index on verdicts costs two B-tree updates per upsert
+CREATE INDEX IF NOT EXISTS verdicts_last_seen ON verdicts (last_seen);
+
+CREATE TABLE IF NOT EXISTS verdict_history (
+    indicator TEXT NOT NULL,
+    model_version TEXT NOT NULL,
+    score REAL NOT NULL,
+    severity TEXT NOT NULL,
+    scored_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS verdict_history_indicator ON verdict_history (indicator, scored_at);
+
+CREATE TRIGGER IF NOT EXISTS verdicts_history_insert AFTER INSERT ON verdicts BEGIN
+    INSERT INTO verdict_history VALUES (new.indicator, new.model_version, new.score, new.severity, new.last_seen);
+END;
+CREATE TRIGGER IF NOT EXISTS verdicts_history_update AFTER UPDATE ON verdicts
+WHEN old.model_version != new.model_version OR old.score != new.score OR old.severity != new.severity BEGIN
+    INSERT INTO verdict_history VALUES (new.indicator, new.model_version, new.score, new.severity, new.last_seen);
+END;
+"""
+
+UPSERT = """
+INSERT INTO verdicts (indicator, model_version, score, severity, first_seen, last_seen)
+VALUES (?1, ?2, ?3, CASE WHEN ?3 >= ?4 THEN 'HIGH' WHEN ?3 >= ?5 THEN 'MEDIUM' ELSE 'LOW' END, ?6, ?6)
+ON CONFLICT (indicator) DO UPDATE SET
+    model_version = excluded.model_version,
+    score = excluded.score,
+    severity = excluded.severity,
+    first_seen = MIN(first_seen, excluded.first_seen),
+    last_seen = MAX(last_seen, excluded.last_seen)
+WHERE excluded.score != score OR excluded.model_version != model_version
+    OR excluded.last_seen > last_seen + ?7
+"""
+
+# Seconds; an unchanged verdict seen again sooner is not rewritten, so
+# last_seen lags by at most this much and repeat sightings cost no I/O
+LAST_SEEN_RESOLUTION = 300
+
+_TICK = object()  # Flush interval elapsed with nothing queued
+
+_COLUMNS = ('indicator', 'model_version', 'score', 'severity', 'first_seen', 'last_seen')
+_HISTORY_COLUMNS = ('indicator', 'model_version', 'score', 'severity', 'scored_at')
+
+
+class VerdictStore:
+    """SQLite-backed verdict history; record() never blocks the caller
+
+    When the queue is full a batch is dropped and counted rather than
+    stalling scoring, as with BackgroundSink.
+    """
+
+    def __init__(self, path=DEFAULT_PATH, flush_interval=1.0, batch_size=50000, queue_size=1000):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.errors = 0
+        self.written = 0
+        connection = self._connect()
+        try:
+            connection.executescript(SCHEMA)
+        finally:
+            connection.close()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='verdict-store', daemon=True)
+        self._thread.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')  # WAL stays consistent; a crash loses the last flush
+        connection.execute('PRAGMA cache_size=-65536')  # 64 MB keeps the upper index pages resident
+        return connection
+
+    def record(self, indicators, scores, model_version, thresholds, seen=None):
+        """Queue one scored batch (parallel lists of indicators and scores)"""
+        try:
+            self._queue.put_nowait((indicators, scores, model_version, thresholds, seen or time.time()))
+        except queue.Full:
+            self.dropped += 1
+
+    def queue_depth(self):
+        return self._queue.qsize()
+
+    def flush(self, timeout=30):
+        """Wait until everything recorded so far is committed"""
+        if self._closed:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def close(self, timeout=30):
+        """Commit everything queued and stop the writer"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self):
+        connection = self._connect()
+        pending, pending_rows = [], 0
+        flush_at = None
+        while True:
+            timeout = self.flush_interval if flush_at is None else max(0.0, flush_at - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = _TICK
+            if isinstance(item, tuple):
+                pending.append(item)
+                pending_rows += len(item[0])
+                if flush_at is None:
+                    flush_at = time.monotonic() + self.flush_interval
+                if pending_rows < self.batch_size and time.monotonic() < flush_at:
+                    continue
+            self._write(connection, pending, pending_rows)
+            pending, pending_rows, flush_at = [], 0, None
+            if item is None:
+                connection.close()
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+
+    def _write(self, connection, pending, rows):
+        if not pending:
+            return
+        try:
+            with connection:
+                for indicators, scores, model_version, thresholds, seen in pending:
+                    connection.executemany(UPSERT, zip(
+                        indicators, repeat(model_version), map(float, scores),
+                        repeat(thresholds['HIGH']), repeat(thresholds['MEDIUM']), repeat(seen),
+                        repeat(LAST_SEEN_RESOLUTION)
+                    ))
+            self.written += rows
+        except sqlite3.Error as e:
+            self.errors += 1
+            ERRORS.labels('verdict_store').inc()
+            print(f"Error writing {rows} verdicts to {self.path}: {str(e)}")
+
+    def _query(self, sql, parameters=()):
+        connection = sqlite3.connect(self.path, timeout=30)
+        try:
+            return connection.execute(sql, parameters).fetchall()
+        finally:
+            connection.close()
+
+    def __len__(self):
+        return self._query('SELECT COUNT(*) FROM verdicts')[0][0]
+
+    def get(self, indicator):
+        """Latest verdict for an indicator as a dict, or None"""
+        rows = self._query(f'SELECT {", ".join(_COLUMNS)} FROM verdicts WHERE indicator = ?', (indicator,))
+        return dict(zip(_COLUMNS, rows[0])) if rows else None
+
+    def history(self, indicator, start=None, end=None):
+        """Every change to an indicator's verdict, oldest first, optionally within [start, end]"""
+        rows = self._query(
+            f'SELECT {", ".join(_HISTORY_COLUMNS)} FROM verdict_history '
+            'WHERE indicator = ? AND scored_at >= ? AND scored_at <= ? ORDER BY scored_at, rowid',
+            (indicator, start if start is not None else float('-inf'), end if end is not None else float('inf'))
+        )
+        return [dict(zip(_HISTORY_COLUMNS, row)) for row in rows]
+
+    def seen_between(self, start, end=None, limit=1000, min_severity=None):
+        """Verdicts last seen within [start, end], newest first"""
+        severities = {None: ('LOW', 'MEDIUM', 'HIGH'), 'LOW': ('LOW', 'MEDIUM', 'HIGH'),
+                      'MEDIUM': ('MEDIUM', 'HIGH'), 'HIGH': ('HIGH',)}[min_severity]
+        rows = self._query(
+            f'SELECT {", ".join(_COLUMNS)} FROM verdicts WHERE last_seen >= ? AND last_seen <= ? '
+            f'AND severity IN ({", ".join("?" * len(severities))}) ORDER BY last_seen DESC LIMIT ?',
+            (start, end if end is not None else float('inf')) + severities + (limit,)
+        )
+        return [dict(zip(_COLUMNS, row)) for row in rows]
+
+    def current_scores(self, model_version, limit=None):
+        """(indicator, score) pairs last scored by model_version, least recently seen first"""
+        rows = self._query(
+            'SELECT indicator, score FROM verdicts WHERE model_version = ? ORDER BY last_seen DESC LIMIT ?',
+            (model_version, -1 if limit is None else limit)
+        )
+        rows.reverse()
+        return rows
+
+
+def _print_rows(rows, columns):
+    for row in rows:
+        print('  '.join(time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(row[c])) if c.endswith(('_seen', '_at'))
+                        else f'{row[c]:.3f}' if c == 'score' else str(row[c]) for c in columns))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Query the persistent verdict store")
+    parser.add_argument('--db', default=DEFAULT_PATH)
+    commands = parser.add_subparsers(dest='command', required=True)
+    history = commands.add_parser('history', help="how an indicator's verdict changed over time")
+    history.add_argument('indicator')
+    recent = commands.add_parser('recent', help='indicators seen in the last hours')
+    recent.add_argument('--hours', type=float, default=24)
+    recent.add_argument('--limit', type=int, default=50)
+    recent.add_argument('--min-severity', choices=('LOW', 'MEDIUM', 'HIGH'), default=None)
+    commands.add_parser('stats', help='row counts per model version and severity')
+    args = parser.parse_args(argv)
+
+    store = VerdictStore(args.db)
+    try:
+        if args.command == 'history':
+            from verdict_cache import normalize_indicator
+            rows = store.history(normalize_indicator(args.indicator))
+            if not rows:
+                print(f"No verdicts for {args.indicator}")
+            _print_rows(rows, ('scored_at', 'model_version', 'score', 'severity'))
+        elif args.command == 'recent':
+            rows = store.seen_between(time.time() - args.hours * 3600, limit=args.limit,
+                                      min_severity=args.min_severity)
+            _print_rows(rows, ('last_seen', 'severity', 'score', 'model_version', 'indicator'))
+        else:
+            print(f"{len(store)} indicators")
+            for version, severity, count in store._query(
+                    'SELECT model_version, severity, COUNT(*) FROM verdicts GROUP BY 1, 2 ORDER BY 1, 2'):
+                print(f"  {version}  {severity:<6} {count}")
+    finally:
+        store.close()
+
+
+if __name__ == '__main__':
+    main()